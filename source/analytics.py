@@ -0,0 +1,207 @@
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from snapshot import EPOCH_ORDINAL
+from streaks import longest_by_period, streak_stats
+
+
+# The numbers behind every analytics front-end (charts.run_dashboard,
+# visual.run_dashboard, the Streamlit dashboard), computed once from a (day,
+# title) rollup and returned as typed results. Nothing here draws. Results are
+# memoised per dataset version, so a redraw or a Streamlit rerun on unchanged
+# data costs a dictionary lookup; arrays in results are read-only because they
+# are shared between callers.
+MEMO_SIZE = 256
+TREND_DAYS = 14
+WEEK_DAYS = 7
+
+_memo = OrderedDict()
+_memo_lock = threading.RLock()
+
+
+class Dataset:
+    # A rollup frame as snapshot.with_days returns it (day_ord, day, title,
+    # minutes, sessions, hsum, hcount) and the key of its version. The key must
+    # change whenever the rows do; without one, a hash of the rows is used.
+
+    def __init__(self, frame: pd.DataFrame, key=None):
+        self.frame = frame
+        self.key = content_key(frame) if key is None else key
+
+    def __len__(self):
+        return len(self.frame)
+
+
+class TitleTotals(NamedTuple):
+    titles: tuple             # most minutes first
+    minutes: np.ndarray
+    avg_hardness: np.ndarray  # NaN where no hardness was logged
+
+    @property
+    def total(self) -> int:
+        return int(self.minutes.sum())
+
+
+class DailyTotals(NamedTuple):
+    days: pd.DatetimeIndex    # every day of the range, including empty ones
+    minutes: np.ndarray
+
+
+class DailyStack(NamedTuple):
+    days: pd.DatetimeIndex
+    titles: tuple
+    minutes: np.ndarray       # days x titles
+
+
+class Streaks(NamedTuple):
+    current: int
+    longest: int
+
+
+class Overview(NamedTuple):
+    # What the six-panel dashboards show, anchored on the latest logged day.
+    latest_day: pd.Timestamp
+    week_start: pd.Timestamp
+    trend_start: pd.Timestamp
+    today: TitleTotals
+    week: TitleTotals
+    trend: DailyTotals
+    stack: DailyStack
+    streaks: Streaks
+    titles: tuple             # colour order: the week's titles, else today's
+
+
+def content_key(frame: pd.DataFrame) -> str:
+    # Hash of the rollup rows in a fixed order, not file order.
+    cols = [c for c in ("day_ord", "title", "minutes", "sessions", "hsum", "hcount") if c in frame.columns]
+    rows = frame[cols].sort_values(cols[:2], kind="stable").reset_index(drop=True)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(pd.util.hash_pandas_object(rows, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def memoised(fn):
+    # Caches fn(dataset, *args) under (dataset.key, fn, args), keeping the
+    # MEMO_SIZE most recently used results.
+    @functools.wraps(fn)
+    def wrapper(ds: Dataset, *args):
+        key = (ds.key, fn.__name__, args)
+        with _memo_lock:
+            if key in _memo:
+                _memo.move_to_end(key)
+                return _memo[key]
+            result = fn(ds, *args)
+            _memo[key] = result
+            if len(_memo) > MEMO_SIZE:
+                _memo.popitem(last=False)
+            return result
+    return wrapper
+
+
+def clear_memo():
+    with _memo_lock:
+        _memo.clear()
+
+
+def _frozen(a) -> np.ndarray:
+    a = np.array(a)
+    a.flags.writeable = False
+    return a
+
+
+def _days(first: int, last: int) -> pd.DatetimeIndex:
+    return pd.to_datetime(np.arange(first, last + 1) - EPOCH_ORDINAL, unit="D")
+
+
+def _between(df: pd.DataFrame, first: int, last: int) -> pd.DataFrame:
+    return df[(df["day_ord"] >= first) & (df["day_ord"] <= last)]
+
+
+@memoised
+def title_totals(ds: Dataset, first: int = None, last: int = None) -> TitleTotals:
+    # Minutes and average hardness per title over day ordinals first..last
+    # (inclusive; None means unbounded).
+    df = ds.frame
+    if first is not None or last is not None:
+        df = _between(df, -np.inf if first is None else first, np.inf if last is None else last)
+    grouped = df.groupby("title", as_index=False).agg(
+        total_duration=("minutes", "sum"), hsum=("hsum", "sum"), hcount=("hcount", "sum"))
+    grouped["avg_hardness"] = grouped["hsum"] / grouped["hcount"].where(grouped["hcount"] > 0)
+    grouped = grouped.sort_values("total_duration", ascending=False)
+    return TitleTotals(tuple(grouped["title"]), _frozen(grouped["total_duration"].to_numpy()),
+                       _frozen(grouped["avg_hardness"].to_numpy(dtype=float)))
+
+
+@memoised
+def daily_totals(ds: Dataset, first: int, last: int) -> DailyTotals:
+    totals = _between(ds.frame, first, last).groupby("day_ord")["minutes"].sum()
+    totals = totals.reindex(range(first, last + 1), fill_value=0)
+    return DailyTotals(_days(first, last), _frozen(totals.to_numpy()))
+
+
+@memoised
+def daily_stack(ds: Dataset, first: int, last: int, order: tuple = ()) -> DailyStack:
+    # Minutes per day and title; titles follow order, then the rest by name.
+    rank = {t: i for i, t in enumerate(order)}
+    pivot = _between(ds.frame, first, last).pivot_table(
+        index="day_ord", columns="title", values="minutes", aggfunc="sum").fillna(0)
+    pivot = pivot.reindex(range(first, last + 1), fill_value=0)
+    titles = sorted(pivot.columns.tolist(), key=lambda t: rank.get(t, 999))
+    return DailyStack(_days(first, last), tuple(titles), _frozen(pivot[titles].to_numpy(dtype=float)))
+
+
+@memoised
+def streaks(ds: Dataset, anchor: int = None) -> Streaks:
+    return Streaks(*streak_stats(ds.frame["day_ord"], anchor))
+
+
+@memoised
+def longest_streak_in(ds: Dataset, first: date, end: date) -> int:
+    # Longest streak inside [first, end).
+    return int(longest_by_period(ds.frame["day_ord"], [first.toordinal(), end.toordinal()])[0])
+
+
+@memoised
+def month_totals(ds: Dataset, year: int, month: int) -> DailyTotals:
+    first = date(year, month, 1).toordinal()
+    end = date(year + (month == 12), month % 12 + 1, 1).toordinal()
+    return daily_totals(ds, first, end - 1)
+
+
+@memoised
+def weekday_totals(ds: Dataset) -> np.ndarray:
+    # Minutes per weekday, Monday first.
+    weekday = (ds.frame["day_ord"].to_numpy(dtype=np.int64) - 1) % 7
+    minutes = ds.frame["minutes"].to_numpy(dtype=float)
+    return _frozen(np.bincount(weekday, weights=minutes, minlength=7).astype(np.int64))
+
+
+@memoised
+def overview(ds: Dataset) -> Overview:
+    if ds.frame.empty:
+        raise RuntimeError("No valid dates in CSV.")
+    latest = int(ds.frame["day_ord"].max())
+    today = title_totals(ds, latest, latest)
+    if not today.titles:
+        raise RuntimeError("No rows for the latest day. Check your date format or data.")
+    week = title_totals(ds, latest - WEEK_DAYS + 1, latest)
+    titles = week.titles if week.titles else today.titles
+    day = _days(latest, latest)[0]
+    return Overview(
+        latest_day=day,
+        week_start=day - pd.Timedelta(days=WEEK_DAYS - 1),
+        trend_start=day - pd.Timedelta(days=TREND_DAYS - 1),
+        today=today,
+        week=week,
+        trend=daily_totals(ds, latest - TREND_DAYS + 1, latest),
+        stack=daily_stack(ds, latest - WEEK_DAYS + 1, latest, titles),
+        streaks=streaks(ds),
+        titles=titles,
+    )
@@ -0,0 +1,135 @@
+import multiprocessing
+import time
+
+
+IDLE_EVENTS_S = 0.02
+_RANK = {"warm": 0, "show": 1, "refresh": 2}
+
+
+def serve(conn):
+    # Child side. The analytics stack is imported once and the data stays in
+    # memory as a LiveFrame, which follows the file as sessions are logged.
+    # "show" raises the open window and only redraws it when the data changed;
+    # "refresh" always redraws; "warm" just loads. Commands that queued up
+    # meanwhile are merged. While the window is open it also updates itself
+    # from the file, throttled by LiveDashboard.
+    import matplotlib.pyplot as plt
+    from charts import LiveDashboard, load_live
+
+    live, dash = None, None
+    while True:
+        if dash is not None and not plt.fignum_exists(dash.fig.number):
+            dash = None
+        try:
+            if dash is not None and not conn.poll():
+                # Keep the open window responsive between requests.
+                dash.fig.canvas.start_event_loop(IDLE_EVENTS_S)
+                dash.tick()
+                continue
+            msgs = [conn.recv()]
+            while conn.poll():
+                msgs.append(conn.recv())
+        except (EOFError, OSError):
+            break
+        if any(m[0] == "quit" for m in msgs):
+            break
+        path = msgs[-1][1]
+        kinds = {m[0] for m in msgs}
+        show = bool(kinds & {"show", "refresh"})
+
+        t0 = time.perf_counter()
+        try:
+            if live is None or live.path != path:
+                live = load_live(path)
+            else:
+                live.poll()
+            if show and dash is None:
+                dash = LiveDashboard(live)
+                plt.show(block=False)
+            elif show:
+                dash.follow(live)
+                dash.redraw(force="refresh" in kinds)
+                dash.fig.canvas.manager.show()
+        except Exception as exc:
+            # A failed warm-up is not worth a dialog; the next "show" retries.
+            reply = ("error" if show else "warning", str(exc))
+        else:
+            reply = ("done", time.perf_counter() - t0)
+        try:
+            conn.send(reply)
+        except (EOFError, OSError):
+            break
+    plt.close("all")
+
+
+class AnalyticsWorker:
+    # Parent side: one long-lived analytics process, started on first use. Only
+    # one request is in flight at a time; anything asked for meanwhile is kept
+    # as a single pending request, so a burst of clicks costs one redraw.
+
+    def __init__(self):
+        self._proc = None
+        self._conn = None
+        self.busy = False
+        self._pending = None
+
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.is_alive()
+
+    def request(self, cmd: str, path: str):
+        # cmd is "show", "refresh" or "warm"; see serve().
+        if not self.alive():
+            self._start()
+        if self.busy:
+            if self._pending is None or _RANK[cmd] >= _RANK[self._pending[0]]:
+                self._pending = (cmd, path)
+            return
+        self._send((cmd, path))
+
+    def poll(self):
+        # Replies received since the last call, as (kind, detail) pairs.
+        replies = []
+        if self._conn is None:
+            return replies
+        try:
+            while self._conn.poll():
+                replies.append(self._conn.recv())
+        except (EOFError, OSError):
+            pass
+        if replies:
+            self.busy = False
+        if self.busy and not self.alive():
+            self._discard()
+            replies.append(("error", "The analytics process exited unexpectedly."))
+        if not self.busy and self._pending is not None:
+            pending, self._pending = self._pending, None
+            self.request(*pending)
+        return replies
+
+    def close(self, timeout: float = 1.0):
+        if self.alive():
+            try:
+                self._conn.send(("quit",))
+            except (EOFError, OSError):
+                pass
+            self._proc.join(timeout)
+            if self._proc.is_alive():
+                self._proc.terminate()
+        self._discard()
+
+    def _start(self):
+        self._discard()
+        parent, child = multiprocessing.Pipe()
+        proc = multiprocessing.Process(target=serve, args=(child,), name="analytics", daemon=True)
+        proc.start()
+        child.close()
+        self._proc, self._conn = proc, parent
+
+    def _send(self, msg):
+        self._conn.send(msg)
+        self.busy = True
+
+    def _discard(self):
+        if self._conn is not None:
+            self._conn.close()
+        self._proc, self._conn, self.busy = None, None, False
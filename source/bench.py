@@ -0,0 +1,776 @@
+import argparse
+import gc
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from analytics_worker import AnalyticsWorker
+from daytree import DayTree, stripe
+from entries import Entry, EntryIndex, new_entry_id
+from search import SearchIndex
+from streaks import StreakTracker, streak_stats
+from storage import BackgroundWriter, JournalStore
+
+
+FIELDS = ["date", "clock", "title", "duration", "note", "hardness", "id"]
+TITLES = ["Deep work", "Reading", "Math", "Writing", "Code review", "Language", "Planning", "Research"]
+
+
+def synthetic_rows(n: int, days: int = 5 * 365, seed: int = 7):
+    # Fresh str objects per field, the way csv.DictReader hands them out.
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=days - 1)
+    per_day = max(1, n // days)
+    for i in range(n):
+        d = start + timedelta(days=min(days - 1, i // per_day))
+        yield {
+            "date": d.strftime("%d-%m-%y"),
+            "clock": f"{rng.randrange(6, 23):02d}:{rng.randrange(60):02d}",
+            "title": rng.choice(TITLES).encode().decode(),
+            "duration": str(rng.choice((15, 25, 30, 45, 50, 60, 90, 120))),
+            "note": f"session {i}" if rng.random() < 0.3 else "",
+            "hardness": str(rng.randint(1, 10)),
+        }
+
+
+def _retained_bytes(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    gc.collect()
+    return current
+
+
+def bench_memory(sizes):
+    print(f"{'entries':>10} {'dicts MB':>10} {'Entry MB':>10} {'B/entry':>16} {'saved':>7}")
+    for n in sizes:
+        before = _retained_bytes(lambda: [dict(r) for r in synthetic_rows(n)])
+        after = _retained_bytes(lambda: [Entry.from_row(r) for r in synthetic_rows(n)])
+        print(f"{n:>10} {before / 2**20:>10.1f} {after / 2**20:>10.1f} "
+              f"{before // n:>7} -> {after // n:<6} {100.0 * (1 - after / before):>6.1f}%")
+
+
+def _footer_from(entries):
+    total = sum(e.minutes for e in entries)
+    hvals = [e.hard for e in entries if e.hard is not None]
+    return total, (sum(hvals) / len(hvals)) if hvals else 1.0
+
+
+def _load_scan(rows):
+    # Pre-index load: every footer refresh filtered the whole entry list, once
+    # per grouped insert and once more per day at the end.
+    entries = []
+    seen = set()
+    for r in rows:
+        e = Entry.from_row(r)
+        entries.append(e)
+        if e.date in seen:
+            _footer_from([x for x in entries if x.date == e.date])
+        seen.add(e.date)
+    for day in seen:
+        _footer_from([x for x in entries if x.date == day])
+    return entries
+
+
+def _load_indexed(rows):
+    # Entries land in their day bucket and aggregate; footers are refreshed
+    # once per dirty day from the O(1) aggregate.
+    index = EntryIndex()
+    dirty = set()
+    for r in rows:
+        e = Entry.from_row(r)
+        index.add(e)
+        dirty.add(e.date)
+    for day in dirty:
+        agg = index.summary(day)
+        agg.minutes, agg.avg_hardness()
+    return index
+
+
+class ModelTree:
+    # Just enough of ttk.Treeview for the tree benchmarks; every call is counted
+    # because each one is a Tcl round trip in the real widget.
+
+    def __init__(self):
+        self.calls = 0
+        self._children = {"": []}
+        self._rows = {}
+        self._next = 0
+
+    def insert(self, parent, index, iid=None, **kw):
+        self.calls += 1
+        if iid is None:
+            self._next += 1
+            iid = f"I{self._next:06d}"
+        kids = self._children[parent]
+        kids.insert(len(kids) if index == "end" else index, iid)
+        self._children[iid] = []
+        self._rows[iid] = dict(kw, parent=parent)
+        return iid
+
+    def item(self, iid, option=None, **kw):
+        self.calls += 1
+        if option is not None:
+            return self._rows[iid].get(option, "")
+        self._rows[iid].update(kw)
+
+    def parent(self, iid):
+        self.calls += 1
+        return self._rows[iid]["parent"]
+
+    def exists(self, iid):
+        self.calls += 1
+        return iid in self._rows
+
+    def _position(self, iid):
+        # Sessions arrive day by day, so the row asked about is usually the last.
+        kids = self._children[self._rows[iid]["parent"]]
+        return kids, len(kids) - 1 if kids and kids[-1] == iid else kids.index(iid)
+
+    def delete(self, *items):
+        self.calls += 1
+        for iid in items:
+            kids, i = self._position(iid)
+            del kids[i]
+            stack = [iid]
+            while stack:
+                gone = stack.pop()
+                stack.extend(self._children.pop(gone))
+                del self._rows[gone]
+
+    def index(self, iid):
+        self.calls += 1
+        return self._position(iid)[1]
+
+    def get_children(self, parent=""):
+        self.calls += 1
+        return tuple(self._children[parent])
+
+
+def _retag_all(tree):
+    for i, rid in enumerate(tree.get_children("")):
+        tree.item(rid, tags=stripe(i))
+        for j, cid in enumerate(tree.get_children(rid)):
+            tree.item(cid, tags=stripe(j))
+
+
+def _retag_fill(rows):
+    # The pre-incremental eager fill, kept as the baseline: rows went in
+    # untagged and the whole tree was re-striped after every session.
+    tree = ModelTree()
+    days = {}
+    for r in rows:
+        e = Entry.from_row(r)
+        values = (e.duration, e.hardness, e.title, e.note)
+        state = days.get(e.date)
+        if state is None:
+            days[e.date] = [tree.insert("", "end", iid=e.id, values=values), None]
+        elif state[1] is None:
+            single = state[0]
+            index = tree.index(single)
+            tree.delete(single)
+            parent = tree.insert("", index)
+            tree.insert(parent, "end", iid=single)
+            tree.insert(parent, "end", iid=e.id, values=values)
+            state[:] = [parent, 2]
+        else:
+            tree.insert(state[0], "end", iid=e.id, values=values)
+            state[1] += 1
+        _retag_all(tree)
+    for parent, count in days.values():
+        if count is not None:
+            tree.insert(parent, "end", text="Total")
+    _retag_all(tree)
+    return tree
+
+
+def _day_tree_fill(rows, per_session):
+    # The app's DayTree: per_session adds each session as on_add does,
+    # otherwise every day row is inserted collapsed as the async load does.
+    # Footers are refreshed once per dirty day, as the app does at idle.
+    index = EntryIndex()
+    dirty = set()
+    days = DayTree(ModelTree(), index, dirty.add)
+    for r in rows:
+        e = Entry.from_row(r)
+        index.add(e)
+        if per_session:
+            days.insert_entry(e)
+    if not per_session:
+        for day_key in index.days():
+            days.insert_day(day_key)
+    for day_key in dirty:
+        days.update_footer(day_key)
+    return days.tree
+
+
+def bench_startup(sizes, retag_max):
+    print(f"{'entries':>10} {'retag calls':>12} {'per entry':>10} {'retag s':>8} "
+          f"{'incr calls':>11} {'per entry':>10} {'incr s':>8} {'load calls':>11} {'load s':>7}")
+    for n in sizes:
+        rows = list(synthetic_rows(n, days=max(1, n // 4)))
+        old = ("-", "-", "-")
+        if n <= retag_max:
+            t = time.perf_counter()
+            tree = _retag_fill(rows)
+            old = (tree.calls, f"{tree.calls / n:.1f}", f"{time.perf_counter() - t:.2f}")
+        t = time.perf_counter()
+        tree = _day_tree_fill(rows, per_session=True)
+        dt = time.perf_counter() - t
+        t = time.perf_counter()
+        load = _day_tree_fill(rows, per_session=False)
+        load_dt = time.perf_counter() - t
+        print(f"{n:>10} {old[0]:>12} {old[1]:>10} {old[2]:>8} {tree.calls:>11} {tree.calls / n:>10.1f} {dt:>8.2f} "
+              f"{load.calls:>11} {load_dt:>7.2f}")
+
+
+def _removal_fixture(n, k, contiguous=False, seed=11):
+    # Every day expanded, so any session can be selected.
+    index = EntryIndex(Entry.from_row(dict(r, id=new_entry_id())) for r in synthetic_rows(n, days=max(1, n // 6)))
+    dirty = set()
+    days = DayTree(ModelTree(), index, dirty.add)
+    for day_key in index.days():
+        days.insert_day(day_key)
+        days.materialize_day(day_key, open_row=True)
+    for day_key in dirty:
+        days.update_footer(day_key)
+    tmp = tempfile.mkdtemp()
+    store = JournalStore(os.path.join(tmp, "items.csv"), FIELDS)
+    store.reset([e.to_row() for e in index])
+    ids = [e.id for e in index]
+    if contiguous:
+        start = random.Random(seed).randrange(len(ids) - k)
+        selection = ids[start:start + k]
+    else:
+        selection = random.Random(seed).sample(ids, k)
+    days.tree.calls = 0
+    return days, selection, BackgroundWriter(store)
+
+
+def _remove_per_row(days, selection, writer):
+    # The pre-batch remove_selected, kept as the baseline: each row is deleted
+    # on its own, groups are relabelled or collapsed per row and every removal
+    # is its own writer op.
+    tree, index = days.tree, days.entries
+    top_start = None
+    for iid in selection:
+        if not tree.exists(iid):
+            continue
+        e = index.get(iid)
+        parent = tree.parent(iid)
+        pos = tree.index(iid)
+        tree.delete(iid)
+        index.remove(e)
+        state = days.day_index[e.date]
+        if parent:
+            state["children"].remove(iid)
+            if len(state["children"]) == 1:
+                remaining = state["children"][0]
+                tags = tree.item(parent, "tags")
+                at = tree.index(parent)
+                tree.delete(parent)
+                tree.insert("", at, iid=remaining, tags=tags)
+                days.day_index[e.date] = {"mode": "single", "item_id": remaining, "parent_id": remaining, "footer_id": remaining}
+            else:
+                tree.item(parent, text=days.day_label(e.date, len(state["children"])))
+                days.restripe(parent, pos)
+        else:
+            del days.day_index[e.date]
+            top_start = pos if top_start is None else min(top_start, pos)
+        writer.remove(e.to_row())
+    if top_start is not None:
+        days.restripe("", top_start)
+
+
+def _remove_batched(days, selection, writer):
+    # App.remove_selected, less the search index.
+    doomed = days.resolve(selection)
+    for e in doomed.values():
+        days.entries.remove(e)
+    writer.remove_many([e.to_row() for e in doomed.values()])
+    days.remove(doomed.values())
+
+
+def bench_remove(sizes, count, contiguous):
+    print(f"{'entries':>10} {'removed':>8} {'per-row calls':>14} {'ms':>8} {'batched calls':>14} {'ms':>8} {'writes':>7}")
+    for n in sizes:
+        out = []
+        for remove in (_remove_per_row, _remove_batched):
+            days, selection, writer = _removal_fixture(n, count, contiguous)
+            t = time.perf_counter()
+            remove(days, selection, writer)
+            dt = time.perf_counter() - t
+            writer.close()
+            out.append((days.tree.calls, dt, writer.stats["batches"]))
+        (old_calls, old_dt, _), (new_calls, new_dt, writes) = out
+        print(f"{n:>10} {count:>8} {old_calls:>14} {1000 * old_dt:>8.1f} {new_calls:>14} {1000 * new_dt:>8.1f} {writes:>7}")
+
+
+def bench_search(sizes, queries, repeat=5):
+    for n in sizes:
+        entries = [Entry.from_row(r) for r in synthetic_rows(n)]
+        t = time.perf_counter()
+        index = SearchIndex(entries)
+        build = time.perf_counter() - t
+        print(f"{n} entries, {len(index)} tokens, index built in {build:.2f}s")
+        print(f"  {'query':<16} {'matches':>9} {'best ms':>8} {'median ms':>10}")
+        for q in queries:
+            times = []
+            for _ in range(repeat):
+                t = time.perf_counter()
+                found = index.query(q)
+                times.append(1000 * (time.perf_counter() - t))
+            times.sort()
+            print(f"  {q!r:<16} {len(found):>9} {times[0]:>8.2f} {times[len(times) // 2]:>10.2f}")
+        del entries, index
+        gc.collect()
+
+
+def bench_load(sizes, scan_max):
+    print(f"{'entries':>10} {'scan s':>10} {'indexed s':>10} {'us/entry':>10}")
+    for n in sizes:
+        rows = list(synthetic_rows(n))
+        scan = "-"
+        if n <= scan_max:
+            t = time.perf_counter()
+            _load_scan(rows)
+            scan = f"{time.perf_counter() - t:.2f}"
+        t = time.perf_counter()
+        _load_indexed(rows)
+        dt = time.perf_counter() - t
+        print(f"{n:>10} {scan:>10} {dt:>10.2f} {1e6 * dt / n:>10.2f}")
+
+
+def _cold_dashboard(path):
+    # What Analyze used to do per click: fresh process, imports, parse, draw.
+    from charts import draw_dashboard, load_frame
+    draw_dashboard(load_frame(path)).canvas.draw()
+
+
+def _wait_reply(worker):
+    while True:
+        replies = worker.poll()
+        if replies:
+            return replies[-1]
+        time.sleep(0.001)
+
+
+def bench_analyze(sizes, repeat):
+    # Click-to-figure latency under Agg: a new process per click vs the warm
+    # worker. Cold runs and refreshes include one full render of the figure;
+    # a warm "show" on unchanged data only raises the open window.
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    print(f"{'entries':>10} {'cold s':>8} {'warm-up s':>10} {'show ms':>8} {'refresh ms':>11} {'10 refreshes ms':>16}")
+    for n in sizes:
+        tmp = tempfile.mkdtemp()
+        store = JournalStore(os.path.join(tmp, "items.csv"), FIELDS)
+        store.reset(list(synthetic_rows(n)))
+        # Prime the parse snapshot both paths share, without importing the
+        # analytics stack here: forked children would inherit it.
+        p = multiprocessing.Process(target=_cold_dashboard, args=(store.path,))
+        p.start()
+        p.join()
+        cold = []
+        for _ in range(repeat):
+            t = time.perf_counter()
+            p = multiprocessing.Process(target=_cold_dashboard, args=(store.path,))
+            p.start()
+            p.join()
+            cold.append(time.perf_counter() - t)
+        worker = AnalyticsWorker()
+        t = time.perf_counter()
+        worker.request("warm", store.path)
+        _wait_reply(worker)
+        warm_up = time.perf_counter() - t
+        worker.request("show", store.path)  # first show creates the figure
+        _wait_reply(worker)
+        timings = {"show": [], "refresh": []}
+        for cmd in ("show", "refresh"):
+            for _ in range(repeat):
+                t = time.perf_counter()
+                worker.request(cmd, store.path)
+                _wait_reply(worker)
+                timings[cmd].append(time.perf_counter() - t)
+        t = time.perf_counter()
+        for _ in range(10):
+            worker.request("refresh", store.path)
+        while worker.busy:
+            _wait_reply(worker)
+        burst = time.perf_counter() - t
+        worker.close()
+        print(f"{n:>10} {min(cold):>8.2f} {warm_up:>10.2f} {1000 * min(timings['show']):>8.1f} "
+              f"{1000 * min(timings['refresh']):>11.0f} {1000 * burst:>16.0f}")
+
+
+def bench_rollup(sizes):
+    # Data prep behind the analytics views: aggregating every session (what
+    # each view did on its own) vs reading the (day, title) rollup the app
+    # keeps, plus the app's cost of writing that rollup out.
+    from snapshot import load_rollups, load_sessions, rollup_sessions
+    from rollups import index_rows, rollup_path, write_rollups
+    print(f"{'entries':>10} {'rows':>7} {'from sessions s':>16} {'read rollup ms':>15} {'app write ms':>13}")
+    for n in sizes:
+        tmp = tempfile.mkdtemp()
+        store = JournalStore(os.path.join(tmp, "items.csv"), FIELDS)
+        rows = list(synthetic_rows(n))
+        store.reset(rows)
+        load_sessions(store.path)  # both paths start from a warm snapshot
+        t = time.perf_counter()
+        rollup_sessions(load_sessions(store.path, columns=["date", "title", "duration", "hardness", "date_parsed"]))
+        raw = time.perf_counter() - t
+        index = EntryIndex(Entry.from_row(r) for r in rows)
+        t = time.perf_counter()
+        write_rollups(store.path, index_rows(index))
+        write = time.perf_counter() - t
+        t = time.perf_counter()
+        df = load_rollups(store.path)
+        read = time.perf_counter() - t
+        assert os.path.exists(rollup_path(store.path))
+        print(f"{n:>10} {len(df):>7} {raw:>16.2f} {1000 * read:>15.1f} {1000 * write:>13.1f}")
+
+
+def _streaks_timestamps(days):
+    # The old Analyze loop: sorted Timestamps, then a set walk back from the end.
+    import pandas as pd
+    unique_days = sorted(pd.to_datetime(pd.Series(days) - 719163, unit="D").unique())
+    longest = run = 1
+    for i in range(1, len(unique_days)):
+        run = run + 1 if unique_days[i] == unique_days[i - 1] + pd.Timedelta(days=1) else 1
+        longest = max(longest, run)
+    set_days = set(unique_days)
+    current, ptr = 0, unique_days[-1]
+    while ptr in set_days:
+        current += 1
+        ptr -= pd.Timedelta(days=1)
+    return current, longest
+
+
+def _streaks_sorted_list(days):
+    # The old Streamlit helper: membership tests against a sorted list.
+    norm = sorted(set(days))
+    longest = run = 0
+    prev = None
+    for d in norm:
+        run = run + 1 if prev is not None and d - prev == 1 else 1
+        prev = d
+        longest = max(longest, run)
+    current, cur = 0, norm[-1]
+    while cur in norm:
+        current += 1
+        cur -= 1
+    return current, longest
+
+
+def bench_streaks(sizes, list_max):
+    # sizes are numbers of distinct days: about one in eight skipped, except a
+    # final unbroken fifth so the current streak is long.
+    import numpy as np
+    import pandas  # noqa: F401  (not timed)
+    print(f"{'days':>8} {'timestamps ms':>14} {'sorted list ms':>15} {'numpy ms':>9} {'tracker us/add':>15}")
+    for n in sizes:
+        rng = np.random.default_rng(3)
+        head = 700_000 + np.flatnonzero(rng.random((n - n // 5) * 8 // 7) > 1 / 8)
+        days = head.tolist() + list(range(int(head[-1]) + 2, int(head[-1]) + 2 + n // 5))
+        t = time.perf_counter()
+        expected = _streaks_timestamps(days)
+        loop = time.perf_counter() - t
+        listed = "-"
+        if n <= list_max:
+            t = time.perf_counter()
+            assert _streaks_sorted_list(days) == expected
+            listed = f"{1000 * (time.perf_counter() - t):.1f}"
+        arr = np.asarray(days)
+        t = time.perf_counter()
+        assert streak_stats(arr) == expected
+        vec = time.perf_counter() - t
+        tracker = StreakTracker()
+        t = time.perf_counter()
+        for d in days:
+            tracker.add(d)
+        per_add = (time.perf_counter() - t) / len(days)
+        assert tracker.longest == expected[1]
+        print(f"{n:>8} {1000 * loop:>14.1f} {listed:>15} {1000 * vec:>9.2f} {1e6 * per_add:>15.2f}")
+
+
+def _dashboard_legacy(path):
+    # The old dashboard.load_data for a CSV: dateutil per date that the
+    # snapshot could not parse, then a row-wise apply to attach the clock.
+    import pandas as pd
+    from dateutil import parser
+    from snapshot import load_sessions
+
+    def parse_date(v):
+        try:
+            return pd.to_datetime(parser.parse(str(v), dayfirst=True).date())
+        except Exception:
+            return pd.NaT
+
+    def parse_datetime(row):
+        try:
+            clock_val = row.get("clock", "")
+            if pd.isna(clock_val) or str(clock_val).strip() == "":
+                return pd.Timestamp(row["date_parsed"])
+            return pd.to_datetime(f"{row['date_parsed'].date().isoformat()} {clock_val}", dayfirst=True)
+        except Exception:
+            return pd.Timestamp(row["date_parsed"])
+
+    df = load_sessions(path)
+    df["title"] = df["title"].astype(object)
+    retry = df["date_parsed"].isna() & df["date"].notna()
+    if retry.any():
+        df.loc[retry, "date_parsed"] = df.loc[retry, "date"].apply(parse_date)
+    df = df.dropna(subset=["date_parsed"]).copy()
+    df["date_time"] = df.apply(parse_datetime, axis=1)
+    df["duration"] = pd.to_numeric(df.get("duration", 0), errors="coerce").fillna(0).astype(int)
+    df["hardness"] = pd.to_numeric(df.get("hardness", 0), errors="coerce").fillna(0).astype(int)
+    df["date"] = df["date_parsed"].dt.date
+    df["hour"] = df["date_time"].dt.hour.fillna(0).astype(int)
+    return df
+
+
+def bench_dashboard(sizes, odd_share):
+    # dashboard.load_data from a warm snapshot. odd_share of the rows get a
+    # date or clock the fast paths reject, so the per-row fallbacks are timed too.
+    import warnings
+    from snapshot import load_dashboard_data, load_sessions
+    warnings.simplefilter("ignore")
+    print(f"{'entries':>10} {'legacy s':>9} {'vectorized s':>13} {'speedup':>8} {'hours equal':>12}")
+    for n in sizes:
+        rng = random.Random(5)
+        rows = list(synthetic_rows(n))
+        for r in rows[:int(n * odd_share)]:
+            # No dates in the clock column: the old code turns those into
+            # tz-aware timestamps and then fails on .dt.hour.
+            if rng.random() < 0.5:
+                r["date"] = rng.choice(("2026-10-05", "5/10/26", "", "x"))
+            else:
+                r["clock"] = rng.choice(("2pm", "14:30:15", "", "x"))
+        tmp = tempfile.mkdtemp()
+        store = JournalStore(os.path.join(tmp, "items.csv"), FIELDS)
+        store.reset(rows)
+        load_sessions(store.path)
+        t = time.perf_counter()
+        old = _dashboard_legacy(store.path)
+        legacy = time.perf_counter() - t
+        t = time.perf_counter()
+        new = load_dashboard_data(store.path)
+        vec = time.perf_counter() - t
+        same = len(old) == len(new) and (old["hour"].values == new["hour"].values).all()
+        print(f"{n:>10} {legacy:>9.2f} {vec:>13.3f} {legacy / vec:>7.0f}x {str(same):>12}")
+
+
+def _render_frame(titles, days, seed):
+    # A (day, title) rollup as charts.load_frame returns it: every title on
+    # every day, so the 7-day panels carry all of them.
+    import pandas as pd
+    from snapshot import with_days
+    rng = random.Random(seed)
+    last = date(2026, 10, 17).toordinal()
+    rows = [(last - d, f"Title {t:02d}", rng.randint(5, 120), 1, rng.randint(1, 10), 1)
+            for d in range(days) for t in range(titles)]
+    return with_days(pd.DataFrame(rows, columns=["day", "title", "minutes", "sessions", "hsum", "hcount"]))
+
+
+def bench_render(titles, days, repeat):
+    # Agg render of the six-panel dashboard: a first draw on a new figure vs a
+    # refresh of the same figure with new numbers, each including canvas.draw().
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from charts import draw_dashboard
+    print(f"{'titles':>7} {'days':>6} {'first draw ms':>14} {'refresh ms':>11} {'artists':>8}")
+    for n in titles:
+        frames = [_render_frame(n, days, seed) for seed in range(repeat + 1)]
+        first, refresh = [], []
+        for df in frames:
+            fig = Figure(figsize=(14, 10), facecolor="#121212")
+            FigureCanvasAgg(fig)
+            t = time.perf_counter()
+            draw_dashboard(df, fig)
+            fig.canvas.draw()
+            first.append(time.perf_counter() - t)
+        for df in frames[1:]:
+            t = time.perf_counter()
+            draw_dashboard(df, fig)
+            fig.canvas.draw()
+            refresh.append(time.perf_counter() - t)
+        artists = len(fig.findobj())
+        print(f"{n:>7} {days:>6} {1000 * min(first):>14.0f} {1000 * min(refresh):>11.0f} {artists:>8}")
+
+
+def bench_analytics(titles, days, repeat):
+    # Each analytics computation on its own: cold (memo cleared, what a new
+    # dataset version costs) vs a memo hit (a redraw or rerun on unchanged data).
+    import analytics
+    print(f"{'titles':>7} {'days':>6} {'computation':<16} {'cold ms':>9} {'memo hit us':>12}")
+    for n in titles:
+        ds = analytics.Dataset(_render_frame(n, days, 0))
+        latest = int(ds.frame["day_ord"].max())
+        week = latest - analytics.WEEK_DAYS + 1
+        today = date.fromordinal(latest)
+        calls = [
+            ("title_totals", lambda: analytics.title_totals(ds, week, latest)),
+            ("daily_totals", lambda: analytics.daily_totals(ds, latest - analytics.TREND_DAYS + 1, latest)),
+            ("daily_stack", lambda: analytics.daily_stack(ds, week, latest)),
+            ("streaks", lambda: analytics.streaks(ds)),
+            ("month_totals", lambda: analytics.month_totals(ds, today.year, today.month)),
+            ("weekday_totals", lambda: analytics.weekday_totals(ds)),
+            ("overview", lambda: analytics.overview(ds)),
+        ]
+        for name, call in calls:
+            cold, hit = [], []
+            for _ in range(repeat):
+                analytics.clear_memo()
+                t = time.perf_counter()
+                call()
+                cold.append(time.perf_counter() - t)
+                t = time.perf_counter()
+                call()
+                hit.append(time.perf_counter() - t)
+            print(f"{n:>7} {days:>6} {name:<16} {1000 * min(cold):>9.2f} {1e6 * min(hit):>12.1f}")
+        t = time.perf_counter()
+        analytics.content_key(ds.frame)
+        print(f"{n:>7} {days:>6} {'content_key':<16} {1000 * (time.perf_counter() - t):>9.2f} {'-':>12}")
+
+
+def bench_live(sizes, appended):
+    # Picking up sessions logged while Analyze is open: re-reading the data
+    # (the rollup is stale once the file changed) vs folding in only the new
+    # journal records.
+    from live import LiveFrame
+    from snapshot import load_rollups, load_sessions
+    print(f"{'entries':>10} {'appended':>9} {'full reload ms':>15} {'live poll ms':>13}")
+    for n in sizes:
+        tmp = tempfile.mkdtemp()
+        store = JournalStore(os.path.join(tmp, "items.csv"), FIELDS, compact_threshold=1 << 40)
+        rows = list(synthetic_rows(n))
+        store.reset(rows)
+        load_sessions(store.path)
+        live = LiveFrame(store.path)
+        for k in appended:
+            for r in rows[:k]:
+                store.add(dict(r, id=new_entry_id()))
+            t = time.perf_counter()
+            live.poll()
+            poll = time.perf_counter() - t
+            store.compact()
+            t = time.perf_counter()
+            load_rollups(store.path)
+            reload = time.perf_counter() - t
+            live.poll()
+            print(f"{n:>10} {k:>9} {1000 * reload:>15.0f} {1000 * poll:>13.1f}")
+
+
+def bench_dashcache(sizes, appended):
+    # The Streamlit dashboard's data after new sessions were logged: reading
+    # the data again (a cache miss) vs the live session frame, which parses
+    # only the new journal records; plus a rerun on unchanged data.
+    from live import LiveSessions
+    from snapshot import load_dashboard_data
+    print(f"{'entries':>10} {'appended':>9} {'full reload ms':>15} {'live poll ms':>13} {'unchanged ms':>13}")
+    for n in sizes:
+        tmp = tempfile.mkdtemp()
+        store = JournalStore(os.path.join(tmp, "items.csv"), FIELDS, compact_threshold=1 << 40)
+        rows = [dict(r, id=new_entry_id()) for r in synthetic_rows(n)]
+        store.reset(rows)
+        live = LiveSessions(store.path)
+        for k in appended:
+            for r in rows[:k]:
+                store.add(dict(r, id=new_entry_id()))
+            t = time.perf_counter()
+            live.poll()
+            poll = time.perf_counter() - t
+            t = time.perf_counter()
+            live.poll()
+            idle = time.perf_counter() - t
+            store.compact()
+            t = time.perf_counter()
+            load_dashboard_data(store.path)
+            reload = time.perf_counter() - t
+            live.poll()
+            print(f"{n:>10} {k:>9} {1000 * reload:>15.0f} {1000 * poll:>13.1f} {1000 * idle:>13.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Concentria micro-benchmarks")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("memory", help="retained memory of the in-memory entry list")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    p = sub.add_parser("load", help="startup data work on a synthetic 5-year history")
+    p.add_argument("--sizes", type=int, nargs="+", default=[5_000, 10_000, 20_000, 100_000, 500_000])
+    p.add_argument("--scan-max", type=int, default=20_000, help="skip the O(days x entries) loader above this size")
+    p = sub.add_parser("startup", help="Treeview calls to fill the day tree, full re-stripe vs DayTree")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1_000, 2_000, 4_000, 50_000])
+    p.add_argument("--retag-max", type=int, default=4_000, help="skip the re-stripe-everything fill above this size")
+    p = sub.add_parser("remove", help="delete a multi-row selection, per row vs batched")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000])
+    p.add_argument("--count", type=int, default=1_000)
+    p.add_argument("--contiguous", action="store_true", help="select a run of adjacent rows instead of random ones")
+    p = sub.add_parser("search", help="inverted index build and query latency")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    p.add_argument("--queries", nargs="+", default=["math", "deep wo", "code review", "session 4242", "sess", "nothing"])
+    p = sub.add_parser("analyze", help="Analyze click latency, process per click vs warm worker")
+    p.add_argument("--sizes", type=int, nargs="+", default=[50_000, 500_000])
+    p.add_argument("--repeat", type=int, default=3)
+    p = sub.add_parser("rollup", help="analytics data prep, raw sessions vs the (day, title) rollup")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    p = sub.add_parser("streaks", help="current/longest streak, old loops vs vectorized vs incremental")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000, 50_000])
+    p.add_argument("--list-max", type=int, default=5_000, help="skip the O(n^2) sorted-list walk above this many days")
+    p = sub.add_parser("dashboard", help="Streamlit load_data, row-wise parsing vs vectorized")
+    p.add_argument("--sizes", type=int, nargs="+", default=[50_000, 500_000])
+    p.add_argument("--odd-share", type=float, default=0.001, help="share of rows with a non-standard date or clock")
+    p = sub.add_parser("render", help="dashboard draw time on an Agg canvas, first draw vs refresh")
+    p.add_argument("--titles", type=int, nargs="+", default=[10, 50])
+    p.add_argument("--days", type=int, default=365)
+    p.add_argument("--repeat", type=int, default=3)
+    p = sub.add_parser("live", help="following new sessions in the open Analyze window, reload vs journal tail")
+    p.add_argument("--sizes", type=int, nargs="+", default=[50_000, 500_000])
+    p.add_argument("--appended", type=int, nargs="+", default=[1, 10, 100])
+    p = sub.add_parser("analytics", help="each shared analytics computation, cold vs memo hit")
+    p.add_argument("--titles", type=int, nargs="+", default=[10, 50])
+    p.add_argument("--days", type=int, default=5 * 365)
+    p.add_argument("--repeat", type=int, default=5)
+    p = sub.add_parser("dashcache", help="Streamlit dashboard data after new sessions, full reload vs live frame")
+    p.add_argument("--sizes", type=int, nargs="+", default=[50_000, 500_000])
+    p.add_argument("--appended", type=int, nargs="+", default=[1, 10, 100])
+    args = ap.parse_args()
+    t0 = time.perf_counter()
+    if args.cmd == "memory":
+        bench_memory(args.sizes)
+    elif args.cmd == "load":
+        bench_load(args.sizes, args.scan_max)
+    elif args.cmd == "startup":
+        bench_startup(args.sizes, args.retag_max)
+    elif args.cmd == "remove":
+        bench_remove(args.sizes, args.count, args.contiguous)
+    elif args.cmd == "search":
+        bench_search(args.sizes, args.queries)
+    elif args.cmd == "dashcache":
+        bench_dashcache(args.sizes, args.appended)
+    elif args.cmd == "analytics":
+        bench_analytics(args.titles, args.days, args.repeat)
+    elif args.cmd == "live":
+        bench_live(args.sizes, args.appended)
+    elif args.cmd == "render":
+        bench_render(args.titles, args.days, args.repeat)
+    elif args.cmd == "dashboard":
+        bench_dashboard(args.sizes, args.odd_share)
+    elif args.cmd == "streaks":
+        bench_streaks(args.sizes, args.list_max)
+    elif args.cmd == "rollup":
+        bench_rollup(args.sizes)
+    elif args.cmd == "analyze":
+        bench_analyze(args.sizes, args.repeat)
+    print(f"done in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
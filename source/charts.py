@@ -0,0 +1,337 @@
+import logging
+import time
+
+import pandas as pd
+import matplotlib.pyplot as plt
+import numpy as np
+
+from analytics import TREND_DAYS, WEEK_DAYS, DailyStack, DailyTotals, Dataset, Overview, TitleTotals, overview
+from live import LiveFrame
+
+plt.style.use("dark_background")
+log = logging.getLogger("concentria.charts")
+
+LIVE_POLL_S = 0.25
+LIVE_REDRAW_S = 0.5
+
+
+def load_frame(csv_path: str) -> pd.DataFrame:
+    # (day, title) rollup rather than raw sessions: everything below is
+    # O(days x titles), however long the history is. Taken from a LiveFrame,
+    # so sessions still in the journal (or a rotated one) are included.
+    return load_live(csv_path).frame
+
+
+def load_live(csv_path: str) -> LiveFrame:
+    # load_frame that keeps following the file.
+    try:
+        live = LiveFrame(csv_path)
+    except Exception as e:
+        raise RuntimeError(f"Failed to read data '{csv_path}': {e}")
+    if live.frame.empty:
+        raise RuntimeError("No valid dates in CSV.")
+    return live
+
+
+SMALL_TITLE = dict(fontsize=12, fontweight="bold", color="white")
+LABEL_STYLE = dict(fontsize=10, color="lightgray")
+ANNOT_FS = 9
+PIE_RADIUS = 0.82
+PIE_PCT_DISTANCE = 0.68
+
+
+def _palette(titles):
+    # One colour per title in the overview's order, and the fallback colour.
+    palette = plt.cm.plasma(np.linspace(0.1, 0.9, max(3, len(titles))))
+    return {t: palette[i % len(palette)] for i, t in enumerate(titles)}, palette[0]
+
+
+class DashboardView:
+    # The six panels on one figure. Axes, titles and styling are set up once;
+    # update() moves the existing artists to new data (bar heights, wedge
+    # angles, line points, label text) and only recreates a panel's artists
+    # when its number of titles changed. Bar values are labelled with one
+    # bar_label call per panel and the daily stack is a single PolyCollection,
+    # so the artist count no longer grows with titles x days.
+
+    def __init__(self, fig):
+        import matplotlib.gridspec as gridspec
+
+        self.fig = fig
+        # right < 1.0 reserves room for the legends (do not call tight_layout)
+        gs = gridspec.GridSpec(3, 3, figure=fig, wspace=0.5, hspace=0.6,
+                               left=0.06, right=0.75, top=0.88, bottom=0.06)
+        self.ax_bar_today = fig.add_subplot(gs[0, 0:2])
+        self.ax_pie_today = fig.add_subplot(gs[0, 2])
+        self.ax_bar_week = fig.add_subplot(gs[1, 0:2])
+        self.ax_pie_week = fig.add_subplot(gs[1, 2])
+        self.ax_line_trend = fig.add_subplot(gs[2, 0:2])
+        self.ax_stack_week = fig.add_subplot(gs[2, 2])
+        self._state = {}
+        self._inputs = {}
+
+        for ax, title in ((self.ax_bar_today, "Today (by title)"), (self.ax_bar_week, "Last 7 Days (by title)")):
+            ax.set_title(title, **SMALL_TITLE)
+            ax.set_xlabel("", **LABEL_STYLE)
+            ax.set_ylabel("Minutes", **LABEL_STYLE)
+            ax.grid(axis="y", linestyle="--", alpha=0.25, color="gray")
+            ax.tick_params(colors="lightgray", labelsize=9, axis="x", rotation=25)
+
+        ax = self.ax_line_trend
+        self._trend_line = None
+        ax.set_xlabel("Date", **LABEL_STYLE)
+        ax.set_ylabel("Minutes", **LABEL_STYLE)
+        ax.grid(True, linestyle="--", alpha=0.25, color="gray")
+        ax.tick_params(colors="lightgray", axis="x", labelrotation=35, labelsize=9)
+        ax.tick_params(colors="lightgray", axis="y", labelsize=9)
+        # One label per trend day, reused on every update.
+        self._trend_labels = [
+            ax.annotate("", xy=(0, 0), xytext=(0, 5), textcoords="offset points", ha="center", va="bottom",
+                        fontsize=8, color="white", visible=False,
+                        bbox=dict(boxstyle="round,pad=0.15", fc=(0, 0, 0, 0.4), ec="none"))
+            for _ in range(TREND_DAYS)]
+
+        from matplotlib.collections import PolyCollection
+        ax = self.ax_stack_week
+        self._stack = PolyCollection([], edgecolors="#1a1a1a", linewidths=0.4)
+        ax.add_collection(self._stack, autolim=False)
+        ax.set_title("Last 7 Days — Daily stack", **SMALL_TITLE)
+        ax.set_xlabel("", **LABEL_STYLE)
+        ax.set_ylabel("Minutes", **LABEL_STYLE)
+        ax.grid(axis="y", linestyle="--", alpha=0.25, color="gray")
+        ax.tick_params(colors="lightgray", axis="x", labelrotation=35, labelsize=8)
+        ax.tick_params(colors="lightgray", axis="y", labelsize=9)
+        ax.set_xlim(-0.4 - 0.34, WEEK_DAYS - 0.6 + 0.34)
+
+    def update(self, data) -> bool:
+        # data is a DataFrame or an analytics.Dataset. True if anything on the
+        # figure changed.
+        return self._show(overview(_dataset(data)))
+
+    def _show(self, ov: Overview) -> bool:
+        # Panels whose inputs are unchanged are left alone, e.g. the "today"
+        # panels when a session is logged for an earlier day.
+        colors, fallback = _palette(ov.titles)
+
+        def colors_for(titles):
+            return [colors.get(t, fallback) for t in titles]
+
+        def changed(panel, *key):
+            if self._inputs.get(panel) == key:
+                return False
+            self._inputs[panel] = key
+            return True
+
+        def totals_key(totals):
+            return totals.titles, totals.minutes.tobytes(), tuple(tuple(c) for c in colors_for(totals.titles))
+
+        pretty_date = ov.latest_day.strftime("%d-%m-%y")
+        # header: show primary totals and streaks in a single short suptitle
+        header = (f"Today: {pretty_date} {ov.today.total:.0f}m   |   7d: {ov.week.total:.0f}m   |   "
+                  f"Max streak: {ov.streaks.longest}d   |   Current streak: {ov.streaks.current}d")
+        dirty = False
+        if changed("header", header):
+            self.fig.suptitle(header, fontsize=13, fontweight="bold", color="white")
+            dirty = True
+        if changed("today", *totals_key(ov.today)):
+            self._update_bars(self.ax_bar_today, ov.today, colors_for(ov.today.titles))
+            self._update_pie(self.ax_pie_today, "Today (share)", ov.today, colors_for(ov.today.titles))
+            dirty = True
+        if changed("week", *totals_key(ov.week)):
+            self._update_bars(self.ax_bar_week, ov.week, colors_for(ov.week.titles))
+            self._update_pie(self.ax_pie_week, "Last 7 Days (share)", ov.week, colors_for(ov.week.titles))
+            dirty = True
+        if changed("trend", tuple(ov.trend.days), ov.trend.minutes.tobytes()):
+            self._update_trend(ov.trend, ov.trend_start, pretty_date)
+            dirty = True
+        if changed("stack", *totals_key(ov.stack), tuple(ov.stack.days)):
+            self._update_stack(ov.stack, colors_for(ov.stack.titles))
+            dirty = True
+        return dirty
+
+    def _update_bars(self, ax, totals: TitleTotals, colors):
+        heights = totals.minutes.astype(float)
+        x = np.arange(len(heights))
+        state = self._state.get(ax)
+        if state is not None and len(state["bars"]) == len(heights):
+            for rect, label, h, c in zip(state["bars"], state["labels"], heights, colors):
+                rect.set_height(h)
+                rect.set_facecolor(c)
+                label.xy = (label.xy[0], h)
+                label.set_text(f"{h:.0f}")
+        else:
+            if state is not None:
+                state["bars"].remove()
+                for label in state["labels"]:
+                    label.remove()
+            bars = ax.bar(x, heights, color=colors, edgecolor="white", linewidth=0.8)
+            labels = ax.bar_label(bars, fmt="%.0f", padding=3, fontsize=ANNOT_FS, color="white")
+            self._state[ax] = {"bars": bars, "labels": labels}
+            if state is not None:
+                ax.relim()
+                ax.autoscale_view(scaley=False)
+        ax.set_xticks(x, labels=list(totals.titles))
+        if len(heights):
+            ax.set_ylim(0, max(1, heights.max() * 1.15))
+
+    def _update_pie(self, ax, title, totals: TitleTotals, colors):
+        sizes = totals.minutes.astype(float)
+        labels = list(totals.titles)
+        total = sizes.sum()
+        state = self._state.get(ax)
+        if state is not None and total > 0 and len(state["wedges"]) == len(sizes) \
+                and len(state["autotexts"]) == len(sizes):
+            # Same geometry as Axes.pie: counter-clockwise from startangle.
+            theta1 = 0.25
+            for wedge, text, size, c in zip(state["wedges"], state["autotexts"], sizes, colors):
+                theta2 = theta1 + size / total
+                wedge.set_theta1(360 * theta1)
+                wedge.set_theta2(360 * theta2)
+                wedge.set_facecolor(c)
+                mid = np.pi * (theta1 + theta2)
+                r = PIE_PCT_DISTANCE * PIE_RADIUS
+                text.set_position((r * np.cos(mid), r * np.sin(mid)))
+                p = 100 * size / total
+                text.set_text(f"{p:.0f}%\n{p * total / 100:.0f}m")
+                theta1 = theta2
+        else:
+            ax.cla()
+            autopct = (lambda p: f"{p:.0f}%\n{p * total / 100:.0f}m") if total > 0 else None
+            wedges, *rest = ax.pie(
+                sizes, labels=None, autopct=autopct, startangle=90,
+                colors=colors, pctdistance=PIE_PCT_DISTANCE, radius=PIE_RADIUS,
+                textprops=dict(color="white", fontsize=8),
+                wedgeprops=dict(edgecolor="#1a1a1a", linewidth=0.6)
+            )
+            ax.axis("equal")
+            ax.set_title(title, **SMALL_TITLE)
+            state = self._state[ax] = {"wedges": list(wedges), "autotexts": rest[1] if len(rest) > 1 else [],
+                                       "legend": None}
+        # Legend handles are copies, so it is rebuilt only when titles or
+        # colours changed. It sits in the reserved right margin.
+        key = (tuple(labels), tuple(map(tuple, colors)))
+        if len(labels) and key != state["legend"]:
+            ax.legend(state["wedges"], labels, title="Title", loc="center left",
+                      bbox_to_anchor=(1.02, 0.5), frameon=True, facecolor="#121212",
+                      edgecolor="white", fontsize=9, handlelength=1.0)
+            state["legend"] = key
+
+    def _update_trend(self, trend: DailyTotals, trend_start, pretty_date):
+        ax = self.ax_line_trend
+        y_vals = trend.minutes.astype(float)
+        x_vals = trend.days
+        if self._trend_line is None:
+            # Plotted with real dates first, so the axis gets date units.
+            (self._trend_line,) = ax.plot(x_vals, y_vals, marker="o", linewidth=1.75)
+        else:
+            self._trend_line.set_data(x_vals, y_vals)
+            ax.relim()
+            ax.autoscale_view(scaley=False)
+        ax.set_title(f"Last 14 Days — {trend_start.strftime('%d-%m-%y')} → {pretty_date}", **SMALL_TITLE)
+        if len(y_vals):
+            ymax = y_vals.max()
+            ax.set_ylim(0, ymax * 1.15 if ymax > 0 else 1)
+        for label, x, y in zip(self._trend_labels, x_vals, y_vals):
+            label.xy = (x, y)
+            label.set_text(f"{int(y)}m")
+            label.set_visible(y > 0)
+
+    def _update_stack(self, stack: DailyStack, colors):
+        # All segments in one PolyCollection: title by title, each stacked on
+        # the running total of the titles before it.
+        from matplotlib.patches import Patch
+        ax = self.ax_stack_week
+        vals = stack.minutes
+        bottoms = np.cumsum(vals, axis=1) - vals
+        x0 = np.arange(len(stack.days)) - 0.4
+        verts = [[(x, b), (x, b + h), (x + 0.8, b + h), (x + 0.8, b)]
+                 for k in range(vals.shape[1]) for x, b, h in zip(x0, bottoms[:, k], vals[:, k])]
+        self._stack.set_verts(verts)
+        self._stack.set_facecolor(np.repeat(np.asarray(colors).reshape(-1, 4), len(stack.days), axis=0)
+                                  if colors else [])
+        ax.set_xticks(np.arange(len(stack.days)), labels=[d.strftime("%Y-%m-%d") for d in stack.days])
+        top = vals.sum(axis=1).max() if vals.size else 0
+        ax.set_ylim(0, top * 1.05 if top > 0 else 1)
+        titles = list(stack.titles)
+        key = (tuple(titles), tuple(map(tuple, colors)))
+        if titles and key != self._state.get(ax):
+            handles = [Patch(facecolor=c, edgecolor="#1a1a1a", linewidth=0.4, label=t) for t, c in zip(titles, colors)]
+            ax.legend(handles=handles, loc="center left", bbox_to_anchor=(1.02, 0.5),
+                      facecolor="#121212", edgecolor="white", title="Title", fontsize=8)
+            self._state[ax] = key
+        elif not titles and ax.get_legend() is not None:
+            ax.get_legend().remove()
+            self._state.pop(ax, None)
+
+
+def _dataset(data) -> Dataset:
+    return data if isinstance(data, Dataset) else Dataset(data)
+
+
+def draw_dashboard(data, fig=None):
+    # Draws a DataFrame or analytics.Dataset onto fig when given, otherwise
+    # onto a new figure. A figure that already shows the dashboard is updated
+    # in place; any other is cleared first. Returns the figure.
+    ov = overview(_dataset(data))  # fails before an open window is cleared
+    view = getattr(fig, "_dashboard_view", None)
+    if view is None:
+        if fig is None:
+            fig = plt.figure(figsize=(14, 10), facecolor="#121212")
+        else:
+            fig.clf()
+        view = fig._dashboard_view = DashboardView(fig)
+    view._show(ov)
+    return fig
+
+
+class LiveDashboard:
+    # An open dashboard following its data file through a LiveFrame. tick() is
+    # called from the window's event loop: it looks at the file at most every
+    # LIVE_POLL_S and redraws at most every LIVE_REDRAW_S, so a burst of new
+    # sessions costs one redraw.
+
+    def __init__(self, live: LiveFrame, fig=None):
+        self.live = live
+        self.fig = draw_dashboard(live.dataset, fig)
+        self._drawn = live.version
+        self._polled = self._redrawn = time.monotonic()
+
+    def tick(self):
+        now = time.monotonic()
+        try:
+            if now - self._polled >= LIVE_POLL_S:
+                self._polled = now
+                self.live.poll()
+            if self.live.version != self._drawn and now - self._redrawn >= LIVE_REDRAW_S:
+                self.redraw()
+        except Exception as e:
+            # Usually a file caught mid-compaction; the next poll retries.
+            log.warning("Live dashboard update failed: %s", e)
+
+    def follow(self, live: LiveFrame):
+        if live is not self.live:
+            self.live, self._drawn = live, None
+
+    def redraw(self, force: bool = False):
+        # Brings the figure up to the frame's current version; force redraws
+        # the canvas even if nothing changed.
+        if self.live.version == self._drawn and not force:
+            return
+        self._drawn = self.live.version
+        self._redrawn = time.monotonic()
+        if self.fig._dashboard_view.update(self.live.dataset) or force:
+            self.fig.canvas.draw_idle()
+
+
+def run_dashboard(csv_path: str):
+    dash = LiveDashboard(load_live(csv_path))
+    timer = dash.fig.canvas.new_timer(interval=int(LIVE_POLL_S * 1000))
+    timer.add_callback(dash.tick)
+    timer.start()
+    try:
+        plt.show()
+    finally:
+        try:
+            plt.close("all")
+        except Exception:
+            pass
@@ -1,12 +1,16 @@
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
 import io
 import os
+import threading
 
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import streamlit as st
-from dateutil import parser
+
+import analytics
+from live import LiveFrame, LiveSessions
+from snapshot import DASHBOARD_COLUMNS, rollup_sessions, with_days
 
 st.set_page_config(page_title="Concentria Dashboard", layout="wide", initial_sidebar_state="auto")
 
@@ -75,65 +79,37 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-@st.cache_data
-def load_data(path="items.csv"):
-    expected_cols = ["date", "clock", "title", "duration", "hardness", "note"]
+CACHE_TTL_S = 30 * 60
+CACHE_MAX_FILES = 4
 
-    if not os.path.exists(path):
-        return pd.DataFrame(columns=expected_cols)
+@st.cache_resource(ttl=CACHE_TTL_S, max_entries=CACHE_MAX_FILES, show_spinner=False)
+def live_data(path):
+    # Sessions and (day, title) rollup of one data file, shared by every
+    # browser session. Each rerun checks the file's inode, size and mtime:
+    # appended rows and journal records are parsed on their own and added,
+    # only a rewritten file is read again. Entries expire after CACHE_TTL_S
+    # and at most CACHE_MAX_FILES files are kept.
+    return threading.Lock(), LiveSessions(path), LiveFrame(path)
 
+def load_data(path="items.csv"):
+    # (sessions, rollup); both empty if the file is unreadable. A failed poll
+    # leaves the followers as they were, so the next rerun tries again.
     try:
-        df = pd.read_csv(path)
+        lock, sessions, rollup = live_data(path)
+        with lock:
+            sessions.poll()
+            rollup.poll()
+            return sessions.frame, rollup.frame
     except Exception:
-        return pd.DataFrame(columns=expected_cols)
-
-    if "date" not in df.columns:
-        df["date"] = pd.NA
-
-    def parse_date(v):
-        try:
-            dt = parser.parse(str(v), dayfirst=True)
-            return pd.to_datetime(dt.date())
-        except Exception:
-            return pd.NaT
-
-    df["date_parsed"] = df["date"].apply(parse_date)
-
-    df = df.dropna(subset=["date_parsed"]).copy()
-
-    if df.empty:
-        for col in ("date_time", "duration", "hardness", "hour", "date"):
-            if col not in df.columns:
-                df[col] = pd.Series(dtype="object")
-        return pd.DataFrame(columns=expected_cols) 
-
-    def parse_datetime(row):
-        try:
-            clock_val = row.get("clock", "")
-            if pd.isna(clock_val) or str(clock_val).strip() == "":
-                return pd.Timestamp(row["date_parsed"])
-            return pd.to_datetime(f"{row['date_parsed'].date().isoformat()} {clock_val}", dayfirst=True)
-        except Exception:
-            return pd.Timestamp(row["date_parsed"])
-
-    df["date_time"] = df.apply(parse_datetime, axis=1)
+        return pd.DataFrame(columns=DASHBOARD_COLUMNS), pd.DataFrame()
 
-    df["duration"] = pd.to_numeric(df.get("duration", 0), errors="coerce").fillna(0).astype(int)
-    df["hardness"] = pd.to_numeric(df.get("hardness", 0), errors="coerce").fillna(0).astype(int)
+DATA_PATH = os.environ.get("CONCENTRIA_DATA", "items.csv")
 
-    df["date"] = df["date_parsed"].dt.date
-    df["hour"] = df["date_time"].dt.hour.fillna(0).astype(int)
-
-    if "title" not in df.columns:
-        df["title"] = "untitled"
-
-    return df
-
-df = load_data("items.csv")
+df, rollups = load_data(DATA_PATH)
 
 if df.empty or "date_parsed" not in df.columns or df["date_parsed"].isna().all():
     st.title("Concentria Dashboard")
-    st.error("❌ `items.csv` not found or contains no valid `date` values. Please place a CSV with a 'date' column next to this script.")
+    st.error(f"❌ `{DATA_PATH}` not found or contains no valid `date` values. Please place a CSV with a 'date' column next to this script.")
     st.stop()
 
 st.sidebar.header("Controls")
@@ -174,43 +150,32 @@ if fdf.empty:
     st.warning("No sessions match filters. Adjust filters to see data.")
     st.stop()
 
-def monthly_totals(df_, year, month):
-    first = date(year, month, 1)
-    if month == 12:
-        next_first = date(year + 1, 1, 1)
-    else:
-        next_first = date(year, month + 1, 1)
-    last = next_first - timedelta(days=1)
-    all_days = pd.date_range(first, last, freq="D").date
-    grouped = df_.groupby(df_["date_parsed"].dt.date)["duration"].sum()
-    series = pd.Series({d: int(grouped.get(d, 0)) for d in all_days})
-    series.index.name = "day"
-    return series
-
-def compute_streak(dates):
-    if not dates:
-        return 0, 0
-    norm = sorted({pd.to_datetime(d).normalize() for d in dates})
-    longest = 0
-    cur_len = 0
-    prev = None
-    for d in norm:
-        if prev is None or (d - prev).days == 1:
-            cur_len += 1
-        else:
-            cur_len = 1
-        prev = d
-        if cur_len > longest:
-            longest = cur_len
-    latest = norm[-1]
-    cur = latest
-    current = 0
-    while cur in norm:
-        current += 1
-        cur = cur - pd.Timedelta(days=1)
-    return current, longest
-
-month_series = monthly_totals(fdf, sel_year, sel_month)
+# Aggregate views read the (day, title) rollup. Per-session filters (minimum
+# length, hardness) cannot be applied to it, so those roll up the filtered
+# sessions instead.
+if int(min_duration) > 0 or (hardness_min, hardness_max) != (0, 10) or rollups.empty:
+    rdf = with_days(rollup_sessions(fdf))
+else:
+    rdf = rollups[
+        (rollups["day"].dt.date >= start_date)
+        & (rollups["day"].dt.date <= end_date)
+        & (rollups["title"].isin(selected_titles))
+    ]
+
+# Every number below comes from the shared analytics core, memoised on the
+# content of the filtered rollup, so a rerun that only moves the selected day
+# recomputes nothing.
+ds = analytics.Dataset(rdf)
+
+def monthly_totals(ds_, year, month):
+    totals = analytics.month_totals(ds_, year, month)
+    return pd.Series(totals.minutes, index=pd.Index(totals.days.date, name="day"))
+
+def title_minutes(ds_):
+    totals = analytics.title_totals(ds_)
+    return pd.Series(totals.minutes, index=pd.Index(totals.titles, name="title"), name="minutes")
+
+month_series = monthly_totals(ds, sel_year, sel_month)
 
 if "selected_day" not in st.session_state:
     available_days = [d for d in month_series.index if month_series.loc[d] > 0]
@@ -226,7 +191,7 @@ st.markdown("---")
 total_minutes_month = int(month_series.sum())
 focus_days_month = int((month_series > 0).sum())
 avg_per_focus_day = int(month_series[month_series > 0].mean()) if focus_days_month > 0 else 0
-avg_session = int(fdf["duration"].mean()) if not fdf.empty else 0
+avg_session = int(rdf["minutes"].sum() / rdf["sessions"].sum()) if rdf["sessions"].sum() > 0 else 0
 
 st.markdown("<div class='dashboard-card' style='margin-bottom:12px'>", unsafe_allow_html=True)
 st.markdown("<div class='section-title'>Key metrics</div>", unsafe_allow_html=True)
@@ -318,8 +283,7 @@ else:
 
 st.markdown("<hr style='border:0.5px solid rgba(255,255,255,0.04)'/>", unsafe_allow_html=True)
 
-all_dates = sorted({d for d in fdf["date_parsed"].dt.date.unique()})
-current_streak, longest_streak = compute_streak(all_dates)
+current_streak, longest_streak = analytics.streaks(ds)
 st.markdown(
     f"<div style='margin-top:6px'><span class='metric-small'>Current streak</span><div class='metric-large'>{current_streak} days</div>"
     f"<div class='metric-small'>Longest streak {longest_streak} days</div></div>",
@@ -346,7 +310,7 @@ with c1:
     st.pyplot(fig_cum)
 
 with c2:
-    weekday_totals = fdf.groupby(fdf["date_parsed"].dt.weekday)["duration"].sum().reindex(range(7), fill_value=0)
+    weekday_totals = pd.Series(analytics.weekday_totals(ds))
     wd_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
     fig_wd, axw = plt.subplots(figsize=(4.5, 3), dpi=100)
     bars_w = axw.bar(range(7), weekday_totals.values, color="#2fbf9a", edgecolor="#08332b")
@@ -363,7 +327,7 @@ with c2:
     st.pyplot(fig_wd)
 
 with c3:
-    top_titles = fdf.groupby("title")["duration"].sum().sort_values(ascending=False)
+    top_titles = title_minutes(ds)
     if top_titles.empty:
         st.info("No titles to show")
     else:
@@ -394,7 +358,7 @@ insightful_texts = []
 prev_month_year = sel_year if sel_month > 1 else sel_year - 1
 prev_month = sel_month - 1 if sel_month > 1 else 12
 try:
-    prev_series = monthly_totals(fdf, prev_month_year, prev_month)
+    prev_series = monthly_totals(ds, prev_month_year, prev_month)
     prev_total = int(prev_series.sum())
 except Exception:
     prev_total = 0
@@ -405,6 +369,12 @@ if prev_total > 0:
 else:
     insightful_texts.append("No data for previous month to compare")
 
+month_first = date(sel_year, sel_month, 1)
+month_next = date(sel_year + (sel_month == 12), sel_month % 12 + 1, 1)
+month_streak = analytics.longest_streak_in(ds, month_first, month_next)
+if month_streak:
+    insightful_texts.append(f"Longest streak this month: {month_streak} days")
+
 if 'weekday_totals' in locals() and not weekday_totals.empty:
     wd_idx = int(weekday_totals.idxmax())
     wd_name = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"][wd_idx]
@@ -419,9 +389,9 @@ st.markdown("</div>", unsafe_allow_html=True)
 st.markdown("---")
 st.markdown("<div class='dashboard-card'>", unsafe_allow_html=True)
 st.markdown("<div class='section-title'>Top Focused Titles (this range)</div>", unsafe_allow_html=True)
-top_titles_tbl = fdf.groupby("title")["duration"].sum().sort_values(ascending=False).head(12)
+top_titles_tbl = title_minutes(ds).head(12)
 if not top_titles_tbl.empty:
-    tbl = top_titles_tbl.reset_index().rename(columns={"duration": "minutes"})
+    tbl = top_titles_tbl.reset_index()
     st.table(tbl)
 else:
     st.info("No titles found in this range.")
@@ -0,0 +1,272 @@
+from entries import Entry
+
+
+PLACEHOLDER_TEXT = "…"
+
+
+def stripe(position: int):
+    return ("evenrow",) if position % 2 == 0 else ("oddrow",)
+
+
+def calc_points(total_minutes: int, avg_hardness: float, alpha: float = 0.7, beta: float = 0.5) -> float:
+    if total_minutes <= 0 or avg_hardness <= 0:
+        return 0.0
+    t_term = max(0.0, total_minutes) / 480.0
+    h_term = max(0.1, avg_hardness) / 6.0
+    raw = (t_term ** alpha) * (h_term ** beta)
+    return min(100.0, 100.0 * raw)
+
+
+class DayTree:
+    # The session list: one top-level row per day, a single session shown as
+    # its own row, several as a group with a footer. Rows are tagged when
+    # inserted and only shifted siblings are re-striped. tree is a
+    # ttk.Treeview or anything with the same insert/item/index/delete/exists/
+    # get_children/parent calls; on_dirty(day_key) is called when a day's
+    # footer needs update_footer(), which the app coalesces at idle.
+
+    def __init__(self, tree, entries, on_dirty=None):
+        self.tree = tree
+        self.entries = entries
+        self.on_dirty = on_dirty or (lambda day_key: None)
+        self.filter_ids = None    # search matches, None when not filtering
+        self.day_index = {}
+        self.row_day = {}
+        self.hidden_days = []     # older days not in the tree yet, oldest first
+
+    def clear(self):
+        for iid in self.tree.get_children():
+            self.tree.delete(iid)
+        self.day_index.clear()
+        self.row_day.clear()
+        self.hidden_days = []
+
+    def day_label(self, key: str, count: int) -> str:
+        return f"{key} ({count})"
+
+    def session_values(self, e: Entry):
+        return (e.duration, e.hardness, e.title, e.note)
+
+    def day_ids(self, day_key: str) -> list:
+        f = self.filter_ids
+        if f is None:
+            return [e.id for e in self.entries.day(day_key)]
+        return [e.id for e in self.entries.day(day_key) if e.id in f]
+
+    def _track_single(self, day_key: str, iid: str):
+        # A single-session day is one top-level row that is also its own footer.
+        self.day_index[day_key] = {"mode": "single", "item_id": iid, "parent_id": iid, "footer_id": iid}
+        self.row_day[iid] = day_key
+
+    def _track_group(self, day_key: str, parent_id: str, children: list, footer_id=None, **extra):
+        self.day_index[day_key] = {"mode": "group", "parent_id": parent_id, "footer_id": footer_id, "children": children, **extra}
+        self.row_day[parent_id] = day_key
+
+    def _untrack_day(self, day_key: str):
+        state = self.day_index.pop(day_key, None)
+        if state:
+            self.row_day.pop(state["parent_id"], None)
+        return state
+
+    def _recover_parent(self, day_key: str, stale_id):
+        # day_index lost its parent row; look for another live top-level row of
+        # the same day through the reverse index.
+        self.row_day.pop(stale_id, None)
+        for rid, d in self.row_day.items():
+            if d == day_key and self.entries.get(rid) is None and self.tree.exists(rid):
+                return rid
+        return None
+
+    def insert_day(self, day_key: str, index="end"):
+        # Multi-session days start collapsed with a placeholder child; their
+        # sessions are only created in the tree when the row is expanded.
+        ids = self.day_ids(day_key)
+        if not ids:
+            return
+        tags = stripe(len(self.day_index) if index == "end" else index)
+        if len(ids) == 1:
+            e = self.entries.get(ids[0])
+            self.tree.insert("", index, iid=e.id, text=f"{day_key}", values=self.session_values(e), tags=tags)
+            self._track_single(day_key, e.id)
+        else:
+            parent_id = self.tree.insert("", index, text=self.day_label(day_key, len(ids)), open=False, tags=tags)
+            placeholder = self.tree.insert(parent_id, "end", text=PLACEHOLDER_TEXT, tags=stripe(0))
+            self._track_group(day_key, parent_id, ids, placeholder=placeholder)
+        self.on_dirty(day_key)
+
+    def materialize_day(self, day_key: str, open_row: bool = False):
+        state = self.day_index.get(day_key)
+        if not state or state.get("mode") != "group":
+            return
+        parent_id = state["parent_id"]
+        placeholder = state.pop("placeholder", None)
+        if placeholder:
+            idx = self.tree.index(placeholder)
+            self.tree.delete(placeholder)
+            for i, cid in enumerate(state["children"]):
+                e = self.entries.get(cid)
+                self.tree.insert(parent_id, idx + i, iid=cid, text=e.clock or "--:--", values=self.session_values(e),
+                                 tags=stripe(idx + i))
+            self.restripe(parent_id, idx + len(state["children"]))
+        if open_row:
+            self.tree.item(parent_id, open=True)
+
+    def expand(self, iid: str):
+        # A day row was opened: fill in its sessions if still collapsed.
+        day_key = self.row_day.get(iid)
+        state = self.day_index.get(day_key)
+        if state and state["parent_id"] == iid and state.get("placeholder"):
+            self.materialize_day(day_key)
+
+    def load_older(self, count: int):
+        # Moves the newest count hidden days to the top of the tree.
+        if not self.hidden_days:
+            return
+        batch = self.hidden_days[-count:]
+        del self.hidden_days[-count:]
+        for i, day_key in enumerate(batch):
+            self.insert_day(day_key, index=i)
+        if len(batch) % 2:
+            self.restripe("", len(batch))
+
+    def insert_entry(self, e: Entry):
+        # A session that was just added to entries.
+        if self.filter_ids is not None and e.id not in self.filter_ids:
+            return
+        day_key = e.date
+        values = self.session_values(e)
+        if day_key not in self.day_index:
+            if day_key in self.hidden_days:
+                return
+            self.tree.insert("", "end", iid=e.id, text=f"{day_key}", values=values, tags=stripe(len(self.day_index)))
+            self._track_single(day_key, e.id)
+            self.on_dirty(day_key)
+            return
+        state = self.day_index[day_key]
+        if state["mode"] == "single":
+            single_id = state["item_id"]
+            first = self.entries.get(single_id)
+            old_vals = self.tree.item(single_id, "values")
+            old_tags = self.tree.item(single_id, "tags")
+            index = self.tree.index(single_id)
+            self.tree.delete(single_id)
+            self._untrack_day(day_key)
+            parent_id = self.tree.insert("", index, text=self.day_label(day_key, 2), open=True, tags=old_tags)
+            self.tree.insert(parent_id, "end", iid=single_id, text=(first.clock if first else "") or "--:--", values=old_vals,
+                             tags=stripe(0))
+            self.tree.insert(parent_id, "end", iid=e.id, text=e.clock, values=values, tags=stripe(1))
+            self._track_group(day_key, parent_id, [single_id, e.id])
+            self.on_dirty(day_key)
+        else:
+            parent_id = state["parent_id"]
+            if not self.tree.exists(parent_id):
+                recovered = self._recover_parent(day_key, parent_id)
+                if recovered:
+                    parent_id = recovered
+                    kids = self.tree.get_children(parent_id)
+                    footer_id = next((cid for cid in kids if self.entries.get(cid) is None), None)
+                    self._track_group(day_key, parent_id, [cid for cid in kids if self.entries.get(cid) is not None], footer_id)
+                else:
+                    parent_id = self.tree.insert("", "end", text=self.day_label(day_key, 0), open=True)
+                    self._track_group(day_key, parent_id, [])
+                    self.restripe("")
+                state = self.day_index[day_key]
+            footer_id = state["footer_id"]
+            if state.get("placeholder"):
+                pass
+            elif footer_id and self.tree.exists(footer_id):
+                idx = self.tree.index(footer_id)
+                self.tree.insert(parent_id, idx, iid=e.id, text=e.clock, values=values, tags=stripe(idx))
+                self.tree.item(footer_id, tags=stripe(idx + 1))
+            else:
+                self.tree.insert(parent_id, "end", iid=e.id, text=e.clock, values=values, tags=stripe(len(state["children"])))
+            state["children"].append(e.id)
+            self.tree.item(parent_id, text=self.day_label(day_key, len(state["children"])))
+            self.on_dirty(day_key)
+
+    def resolve(self, selection) -> dict:
+        # id -> Entry for selected rows; footers and placeholders resolve to
+        # nothing, a day row to all of its sessions.
+        doomed = {}
+        for iid in selection:
+            e = self.entries.get(iid)
+            if e is not None:
+                doomed[e.id] = e
+                continue
+            state = self.day_index.get(self.row_day.get(iid))
+            if state is not None and state["mode"] == "group" and state["parent_id"] == iid:
+                for cid in state["children"]:
+                    doomed[cid] = self.entries.get(cid)
+        return doomed
+
+    def remove(self, removed):
+        # Brings the tree in line with entries after the given sessions were
+        # removed from it, one rebuild per touched day and one top-level
+        # re-stripe from the first day row that went away.
+        days = {}
+        for e in removed:
+            days.setdefault(e.date, []).append(e.id)
+        top_start = None
+        for day_key, ids in days.items():
+            pos = self._rebuild_day(day_key, ids)
+            if pos is not None:
+                top_start = pos if top_start is None else min(top_start, pos)
+        if top_start is not None:
+            self.restripe("", top_start)
+
+    def _rebuild_day(self, day_key: str, removed: list):
+        # Returns the row's position when the day vanished.
+        state = self.day_index.get(day_key)
+        if state is None:
+            return None
+        row = state["parent_id"]
+        count = len(self.day_ids(day_key))
+        if state["mode"] == "group" and count > 1:
+            gone = set(removed)
+            state["children"] = [cid for cid in state["children"] if cid not in gone]
+            if not state.get("placeholder"):
+                self.tree.delete(*removed)
+                self.restripe(row)
+            self.tree.item(row, text=self.day_label(day_key, count))
+            self.on_dirty(day_key)
+            return None
+        pos = self.tree.index(row)
+        self.tree.delete(row)
+        self._untrack_day(day_key)
+        if not count:
+            return pos
+        self.insert_day(day_key, index=pos)
+        return None
+
+    def update_footer(self, day_key: str):
+        agg = self.entries.summary(day_key)
+        total = agg.minutes
+        avg_hardness = agg.avg_hardness()
+        points = calc_points(total, avg_hardness, alpha=0.7, beta=0.5)
+        points_str = f"{points:.2f}"
+        avg_h_str = f"{avg_hardness:.2f}"
+        state = self.day_index.get(day_key)
+        if not state:
+            return
+        if state.get("mode") == "group":
+            parent_id = state["parent_id"]
+            if not self.tree.exists(parent_id):
+                return
+            footer_id = state["footer_id"]
+            footer_text = f"Total • Points: {points_str} (Avg H: {avg_h_str})"
+            footer_vals = (str(total), "", "", "")
+            if footer_id and self.tree.exists(footer_id):
+                self.tree.item(footer_id, text=footer_text, values=footer_vals)
+            else:
+                pos = 1 if state.get("placeholder") else len(state["children"])
+                state["footer_id"] = self.tree.insert(parent_id, "end", text=footer_text, values=footer_vals, tags=stripe(pos))
+        else:
+            iid = state.get("item_id")
+            if iid and self.tree.exists(iid):
+                self.tree.item(iid, text=f"{day_key} — Total: {total} — Points: {points_str} (Avg H: {avg_h_str})")
+
+    def restripe(self, parent: str = "", start: int = 0):
+        # Rows are tagged when inserted; after a removal or a mid-list insert only
+        # the siblings from the first shifted position onwards need new tags.
+        for i, iid in enumerate(self.tree.get_children(parent)[start:], start):
+            self.tree.item(iid, tags=stripe(i))
@@ -0,0 +1,174 @@
+import sys
+import uuid
+
+from storage import day_ordinal, parse_hardness, parse_minutes
+from streaks import StreakTracker
+
+
+_intern = sys.intern
+_day_ordinals = {}
+
+
+def cached_day_ordinal(date_key: str):
+    try:
+        return _day_ordinals[date_key]
+    except KeyError:
+        day = _day_ordinals[date_key] = day_ordinal(date_key)
+        return day
+
+
+def new_entry_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class Entry:
+    # One logged session. Numbers are parsed once; the raw duration/hardness
+    # strings are kept only when they would not round-trip from the parsed value.
+    __slots__ = ("id", "date", "day", "clock", "title", "minutes", "note", "hard", "_duration", "_hardness")
+
+    def __init__(self, date: str, clock: str, title: str, duration: str, note: str, hardness: str, id: str = None):
+        self.id = id or new_entry_id()
+        self.date = _intern(date)
+        self.day = cached_day_ordinal(self.date)
+        self.clock = _intern(clock)
+        self.title = _intern(title)
+        self.note = note
+        self.minutes = parse_minutes(duration)
+        self._duration = None if str(self.minutes) == duration else _intern(duration)
+        h = parse_hardness(hardness)
+        if h is not None and h.is_integer():
+            h = int(h)
+        self.hard = h
+        self._hardness = None if h is not None and str(h) == hardness else _intern(hardness)
+
+    @property
+    def duration(self) -> str:
+        return str(self.minutes) if self._duration is None else self._duration
+
+    @property
+    def hardness(self) -> str:
+        return str(self.hard) if self._hardness is None else self._hardness
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Entry":
+        return cls(row.get("date", ""), row.get("clock", ""), row.get("title", ""),
+                   row.get("duration", ""), row.get("note", ""), row.get("hardness", ""), row.get("id") or None)
+
+    def to_row(self) -> dict:
+        return {"date": self.date, "clock": self.clock, "title": self.title,
+                "duration": self.duration, "note": self.note, "hardness": self.hardness, "id": self.id}
+
+    def __repr__(self):
+        return (f"Entry({self.date!r}, {self.clock!r}, {self.title!r}, {self.duration!r}, "
+                f"{self.note!r}, {self.hardness!r}, id={self.id!r})")
+
+
+class DayAggregate:
+    __slots__ = ("count", "minutes", "hsum", "hcount")
+
+    def __init__(self):
+        self.count = 0
+        self.minutes = 0
+        self.hsum = 0
+        self.hcount = 0
+
+    def add(self, e: Entry, sign: int = 1):
+        self.count += sign
+        self.minutes += sign * e.minutes
+        if e.hard is not None:
+            self.hsum += sign * e.hard
+            self.hcount += sign
+
+    def avg_hardness(self, default: float = 1.0) -> float:
+        return self.hsum / self.hcount if self.hcount else default
+
+
+class EntryIndex:
+    # All entries in insertion order plus a per-day bucket and per-day title
+    # counts, so day-level work never scans the whole history. rollups holds
+    # one DayAggregate per (day ordinal, title) for the analytics views and
+    # streaks follows the dated days; entries whose date does not parse are
+    # only counted in undated.
+
+    def __init__(self, entries=()):
+        self._all = {}
+        self.by_day = {}
+        self.day_titles = {}
+        self.aggregates = {}
+        self.rollups = {}
+        self.streaks = StreakTracker()
+        self.undated = 0
+        for e in entries:
+            self.add(e)
+
+    def __iter__(self):
+        return iter(self._all.values())
+
+    def __len__(self):
+        return len(self._all)
+
+    def add(self, e: Entry):
+        self._all[e.id] = e
+        bucket = self.by_day.get(e.date)
+        if bucket is None:
+            bucket = self.by_day[e.date] = {}
+            self.day_titles[e.date] = {}
+            self.aggregates[e.date] = DayAggregate()
+        bucket[e.id] = e
+        self.aggregates[e.date].add(e)
+        titles = self.day_titles[e.date]
+        titles[e.title] = titles.get(e.title, 0) + 1
+        if e.day is None:
+            self.undated += 1
+            return
+        key = (e.day, e.title)
+        agg = self.rollups.get(key)
+        if agg is None:
+            agg = self.rollups[key] = DayAggregate()
+        agg.add(e)
+        self.streaks.add(e.day)
+
+    def remove(self, e: Entry):
+        del self._all[e.id]
+        bucket = self.by_day[e.date]
+        del bucket[e.id]
+        self.aggregates[e.date].add(e, -1)
+        titles = self.day_titles[e.date]
+        titles[e.title] -= 1
+        if not titles[e.title]:
+            del titles[e.title]
+        if not bucket:
+            del self.by_day[e.date]
+            del self.day_titles[e.date]
+            del self.aggregates[e.date]
+        if e.day is None:
+            self.undated -= 1
+            return
+        key = (e.day, e.title)
+        agg = self.rollups[key]
+        agg.add(e, -1)
+        if not agg.count:
+            del self.rollups[key]
+        self.streaks.remove(e.day)
+
+    def get(self, entry_id: str):
+        return self._all.get(entry_id)
+
+    def day(self, date_key: str):
+        bucket = self.by_day.get(date_key)
+        return bucket.values() if bucket is not None else ()
+
+    def summary(self, date_key: str) -> DayAggregate:
+        return self.aggregates.get(date_key) or DayAggregate()
+
+    def days(self):
+        return self.by_day.keys()
+
+    def clear(self):
+        self._all.clear()
+        self.by_day.clear()
+        self.day_titles.clear()
+        self.aggregates.clear()
+        self.rollups.clear()
+        self.streaks.clear()
+        self.undated = 0
@@ -0,0 +1,260 @@
+import csv
+import io
+import itertools
+import os
+
+import pandas as pd
+
+from analytics import Dataset
+from entries import Entry
+from rollups import ROLLUP_COLUMNS
+from snapshot import DASHBOARD_COLUMNS, dashboard_frame, parse_session_rows, read_rollups, read_sessions, with_days
+from storage import COMPACTING_SUFFIX, JOURNAL_SUFFIX, OP_ADD, OP_DEL, clean_row, is_sqlite_path, rotated_journal_folded
+
+
+# Versions are unique within the process, so a Dataset key never names two
+# different frames even across LiveFrames for the same file.
+_versions = itertools.count(1)
+
+
+def _stat(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class LiveFrame:
+    # The (day, title) rollup of one data file, kept current without re-reading
+    # the history. For CSV that is the snapshot plus its journal: records
+    # appended to the journal are read from the last offset and folded into
+    # the aggregates, and only a new snapshot (compaction, reset) is reloaded
+    # in full. SQLite reloads its trigger-maintained rollup table whenever the
+    # database or its WAL changes. version and dataset are replaced on every
+    # change.
+
+    def __init__(self, path: str):
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.sqlite = is_sqlite_path(path)
+        self.version = 0
+        self.frame = None
+        self.dataset = None
+        self._data = None
+        self._base = None
+        self._journal = None
+        self._header = None
+        self.reload()
+
+    def poll(self) -> bool:
+        # True if the frame changed.
+        if self._base_signature() != self._base or self._journal_replaced():
+            self.reload()
+            return True
+        if self.sqlite or not self._follow_journal():
+            return False
+        self._publish()
+        return True
+
+    def reload(self):
+        base = self._base_signature()
+        self._data, self._journal, self._header = self._read_base(), None, None
+        if not self.sqlite:
+            compacting = self.journal_path + COMPACTING_SUFFIX
+            if os.path.exists(compacting) and not rotated_journal_folded(self.path):
+                # Rotated out for compaction but not yet in the snapshot.
+                with open(compacting, "rb") as f:
+                    self._apply(self._records(f.read(), None)[0])
+            self._follow_journal()
+        self._base = base
+        self._publish()
+
+    def _read_base(self) -> pd.DataFrame:
+        if self.sqlite or os.path.exists(self.path):
+            return read_rollups(self.path)
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+
+    def _base_signature(self):
+        # Everything that is re-read in full: the snapshot and a journal being
+        # compacted, or the database and its WAL.
+        if self.sqlite:
+            return _stat(self.path), _stat(self.path + "-wal")
+        return _stat(self.path), _stat(self.journal_path + COMPACTING_SUFFIX)
+
+    def _journal_replaced(self) -> bool:
+        # The journal we are part way through is gone, swapped or cut back.
+        if self.sqlite or self._journal is None:
+            return False
+        st = _stat(self.journal_path)
+        return st is None or st[0] != self._journal[0] or st[1] < self._journal[1]
+
+    def _follow_journal(self) -> bool:
+        try:
+            f = open(self.journal_path, "rb")
+        except OSError:
+            return False
+        with f:
+            ino = os.fstat(f.fileno()).st_ino
+            offset = self._journal[1] if self._journal is not None and self._journal[0] == ino else 0
+            f.seek(offset)
+            data = f.read()
+        records, used = self._records(data, self._header if offset else None)
+        # Only past the records once they are in the frame, so a poll that
+        # fails here reads them again on the next try.
+        self._apply(records)
+        self._journal = (ino, offset + used)
+        return bool(records)
+
+    def _records(self, data: bytes, header):
+        # Complete journal records in data (each ends with \r\n; a torn tail is
+        # left for the next read) and the number of bytes they take.
+        used = data.rfind(b"\r\n") + 2
+        if used < 2:
+            return [], 0
+        text = io.StringIO(data[:used].decode("utf-8"), newline="")
+        if header is None:
+            reader = csv.DictReader(text)
+            records = list(reader)
+            self._header = reader.fieldnames
+        else:
+            records = list(csv.DictReader(text, fieldnames=header))
+        return records, used
+
+    def _apply(self, records):
+        fields = [k for k in self._header or () if k != "op"]
+        rows = []
+        for rec in records:
+            op = (rec.get("op") or "").strip()
+            sign = 1 if op == OP_ADD else -1 if op == OP_DEL else 0
+            e = Entry.from_row(clean_row(rec, fields))
+            if not sign or e.day is None:
+                continue
+            hard = e.hard is not None
+            rows.append((e.day, e.title, sign * e.minutes, sign, sign * e.hard if hard else 0, sign * hard))
+        if not rows:
+            return
+        delta = pd.DataFrame(rows, columns=ROLLUP_COLUMNS)
+        merged = pd.concat([self._data, delta], ignore_index=True) if len(self._data) else delta
+        merged = merged.groupby(["day", "title"], as_index=False, sort=False).sum()
+        self._data = merged[merged["sessions"] > 0][ROLLUP_COLUMNS]
+
+    def _publish(self):
+        self.frame = with_days(self._data.astype({"day": "int64"}))
+        self.version = next(_versions)
+        self.dataset = Dataset(self.frame, key=("live", self.version))
+
+
+class LiveSessions(LiveFrame):
+    # The Streamlit dashboard's session rows (snapshot.dashboard_frame) for one
+    # data file, kept current the same way: journal adds are parsed and
+    # appended, journal removals drop rows. A CSV snapshot that only grew
+    # (same inode, the bytes before the old end unchanged) has just its new
+    # rows parsed. Anything else reloads in full.
+
+    PROBE = 256
+
+    def __init__(self, path: str):
+        self._snapshot = None   # (inode, bytes read, the PROBE bytes before that)
+        self._columns = None
+        super().__init__(path)
+
+    def poll(self) -> bool:
+        grew = self._follow_snapshot()
+        if super().poll():
+            return True
+        if grew:
+            self._publish()
+        return grew
+
+    def _read_base(self) -> pd.DataFrame:
+        self._snapshot = None
+        if not self.sqlite and not os.path.exists(self.path):
+            return pd.DataFrame(columns=DASHBOARD_COLUMNS)
+        before = _stat(self.path)
+        df = dashboard_frame(read_sessions(self.path))
+        if not self.sqlite and before is not None and before == _stat(self.path):
+            self._mark_snapshot(before)
+        return df.reset_index(drop=True)
+
+    def _mark_snapshot(self, st):
+        # Remember where the snapshot ends if that is a record boundary, so
+        # rows appended later can be read from there.
+        ino, size = st[0], st[1]
+        with open(self.path, "rb") as f:
+            header = f.readline()
+            f.seek(max(0, size - self.PROBE))
+            probe = f.read(min(size, self.PROBE))
+        if size <= len(header) or not probe.endswith(b"\n"):
+            return
+        self._columns = next(csv.reader(io.StringIO(header.decode("utf-8"))))
+        self._snapshot = (ino, size, probe)
+
+    def _follow_snapshot(self) -> bool:
+        if self._snapshot is None or self._base is None:
+            return False
+        base = self._base_signature()
+        ino, offset, probe = self._snapshot
+        st = base[0]
+        if base == self._base or base[1] != self._base[1] or st is None or st[0] != ino or st[1] <= offset:
+            return False
+        with open(self.path, "rb") as f:
+            f.seek(offset - len(probe))
+            if f.read(len(probe)) != probe:
+                return False
+            data = f.read(st[1] - offset)
+        used = data.rfind(b"\r\n") + 2
+        if used < 2:
+            if b"\n" in data:
+                # Not written by the csv module; read it all again.
+                return False
+            # Part of a record: wait for the rest.
+            self._base = base
+            return False
+        rows = pd.read_csv(io.BytesIO(data[:used]), dtype=str, encoding="utf-8", header=None, names=self._columns)
+        self._data = pd.concat([self._data, parse_session_rows(rows)], ignore_index=True)
+        offset += used
+        self._snapshot = (ino, offset, (probe + data[:used])[-self.PROBE:])
+        self._base = base
+        return True
+
+    def _apply(self, records):
+        fields = [k for k in self._header or () if k != "op"]
+        adds, removed, unmatched = [], set(), []
+        for rec in records:
+            op = (rec.get("op") or "").strip()
+            row = clean_row(rec, fields)
+            if op == OP_ADD:
+                adds.append(row)
+            elif op == OP_DEL and row.get("id"):
+                removed.add(row["id"])
+            elif op == OP_DEL:
+                unmatched.append(row)
+        df = self._data
+        if adds:
+            raw = pd.DataFrame(adds, columns=fields)
+            df = pd.concat([df, parse_session_rows(raw.mask(raw == ""))], ignore_index=True)
+        for row in unmatched:
+            df = self._drop_first(df, row, fields)
+        if removed and "id" in df.columns:
+            df = df[~df["id"].isin(removed)].reset_index(drop=True)
+        self._data = df
+
+    def _drop_first(self, df, row, fields):
+        # A removal without an id takes out the first row with the same
+        # values, as storage.replay_journal does.
+        raw = pd.DataFrame([row], columns=fields)
+        key = parse_session_rows(raw.mask(raw == ""))
+        if key.empty:
+            return df
+        same = pd.Series(True, index=df.index)
+        for col in ("date_time", "title", "duration", "hardness", "note"):
+            if col in df.columns and col in key.columns:
+                v = key[col].iloc[0]
+                same &= df[col].isna() if pd.isna(v) else df[col] == v
+        hits = same.to_numpy().nonzero()[0]
+        return df.drop(df.index[hits[0]]).reset_index(drop=True) if hits.size else df
+
+    def _publish(self):
+        self.frame = self._data
+        self.version = next(_versions)
@@ -1,13 +1,25 @@
+import time
+_IMPORT_T0 = time.perf_counter()
 import tkinter as tk
 from tkinter import ttk, messagebox
+from contextlib import contextmanager
 from datetime import datetime
-import os, csv, random, sys, platform
+import os, sys, platform
 from pathlib import Path
 import threading
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
+import logging
+import queue
 import multiprocessing
+from analytics_worker import AnalyticsWorker
+from daytree import DayTree
+from entries import Entry, EntryIndex, new_entry_id
+from quotes import QuoteStore
+from rollups import index_rows, write_rollups
+from search import SearchIndex
+from storage import BackgroundWriter, JournalStore, SqliteStore
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_T0
+
+log = logging.getLogger("concentria")
 
 
 APP_NAME = "Concentria"
@@ -25,261 +37,62 @@ def app_data_dir() -> Path:
 
 
 CSV_FILE = str(app_data_dir() / "items.csv")
-CSV_FIELDS = ["date", "clock", "title", "duration", "note", "hardness"]
-
-plt.style.use("dark_background")
-
-
-
-def run_dashboard(csv_path: str = CSV_FILE):
-    # --- load & validate (unchanged) ---
-    try:
-        df = pd.read_csv(csv_path, encoding="utf-8")
-    except Exception as e:
-        raise RuntimeError(f"Failed to read CSV '{csv_path}': {e}")
-
-    required = {"date", "title", "duration"}
-    missing = required - set(df.columns)
-    if missing:
-        raise RuntimeError(f"CSV missing required columns: {', '.join(sorted(missing))}")
-
-    if "hardness" not in df.columns:
-        df["hardness"] = np.nan
-
-    df["date_parsed"] = pd.to_datetime(df["date"], format="%d-%m-%y", dayfirst=True, errors="coerce")
-    if df["date_parsed"].isna().any():
-        mask = df["date_parsed"].isna()
-        df.loc[mask, "date_parsed"] = pd.to_datetime(df.loc[mask, "date"], dayfirst=True, errors="coerce")
-
-    df = df.dropna(subset=["date_parsed"])
-    if df.empty:
-        raise RuntimeError("No valid dates in CSV.")
-    df["day"] = df["date_parsed"].dt.normalize()
-    latest_day = df["day"].max()
-
-    today_df = df[df["day"] == latest_day].copy()
-    if today_df.empty:
-        raise RuntimeError("No rows for the latest day. Check your date format or data.")
-
-    week_start = latest_day - pd.Timedelta(days=6)
-    trend_start = latest_day - pd.Timedelta(days=13)
-
-    week_df = df[(df["day"] >= week_start) & (df["day"] <= latest_day)].copy()
-
-    for col in ("duration", "hardness"):
-        today_df[col] = pd.to_numeric(today_df[col], errors="coerce")
-        week_df[col] = pd.to_numeric(week_df[col], errors="coerce")
-
-    grouped_today = (
-        today_df.groupby("title", as_index=False)
-        .agg(total_duration=("duration", "sum"), avg_hardness=("hardness", "mean"))
-        .sort_values("total_duration", ascending=False)
-    )
-    grouped_week = (
-        week_df.groupby("title", as_index=False)
-        .agg(total_duration=("duration", "sum"), avg_hardness=("hardness", "mean"))
-        .sort_values("total_duration", ascending=False)
-    )
+CSV_FIELDS = ["date", "clock", "title", "duration", "note", "hardness", "id"]
+DB_FILE = str(app_data_dir() / "items.db")
+QUOTE_PACKS_DIR = app_data_dir() / "quotes"
+QUOTE_TAGS = [t for t in os.environ.get("CONCENTRIA_QUOTE_TAGS", "").split(",") if t.strip()]
+STORAGE_BACKEND = os.environ.get("CONCENTRIA_STORAGE", "csv").strip().lower()
+LOAD_BATCH = 2000
+LOAD_SLICE_MS = 15
+LOAD_POLL_MS = 10
+RENDER_DAYS_PER_SLICE = 200
+TREE_DAYS = int(os.environ.get("CONCENTRIA_TREE_DAYS", "0") or 0)
+OLDER_DAYS_STEP = TREE_DAYS or 30
+SEARCH_DEBOUNCE_MS = 150
+ANALYTICS_POLL_MS = 100
+ANALYTICS_WARM_MS = 2000
+ANALYTICS_PREWARM = os.environ.get("CONCENTRIA_ANALYTICS_PREWARM", "1") not in ("", "0")
+PROFILE_STARTUP = "--profile-startup" in sys.argv or os.environ.get("CONCENTRIA_PROFILE_STARTUP", "0") not in ("", "0")
+
+
+def open_store():
+    if STORAGE_BACKEND == "sqlite":
+        return SqliteStore(DB_FILE, CSV_FIELDS, import_from=CSV_FILE)
+    return JournalStore(CSV_FILE, CSV_FIELDS)
+
+
+class StartupProfiler:
+    # Opt-in wall-clock breakdown of startup (--profile-startup or
+    # CONCENTRIA_PROFILE_STARTUP=1), printed to stderr once the first load is on screen.
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.phases = [("imports", IMPORT_SECONDS)]
+        self._pending = {"first frame", "load"}
+
+    @contextmanager
+    def phase(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - t0))
 
-    total_day_duration = grouped_today["total_duration"].sum()
-    total_week_duration = grouped_week["total_duration"].sum()
+    def milestone(self, name: str, seconds: float):
+        if not self._pending:
+            return
+        self.phases.append((name, seconds))
+        self._pending.discard(name.split(" (")[0])
+        if not self._pending:
+            self.report()
 
-    # --- STREAK CALCULATIONS (unchanged) ---
-    unique_days = sorted(pd.to_datetime(df["day"].unique()))
-    if not unique_days:
-        max_streak = 0
-    else:
-        max_streak = 1
-        current_run = 1
-        for i in range(1, len(unique_days)):
-            if unique_days[i] == unique_days[i - 1] + pd.Timedelta(days=1):
-                current_run += 1
-                if current_run > max_streak:
-                    max_streak = current_run
-            else:
-                current_run = 1
-
-    set_days = set(pd.to_datetime(df["day"].unique()))
-    current_streak = 0
-    day_ptr = pd.to_datetime(latest_day)
-    while day_ptr in set_days:
-        current_streak += 1
-        day_ptr -= pd.Timedelta(days=1)
-    # --- end streaks ---
-
-    # colors and stacks (unchanged)
-    all_titles = grouped_week["title"].tolist() if len(grouped_week) else grouped_today["title"].tolist()
-    palette = plt.cm.plasma(np.linspace(0.1, 0.9, max(3, len(all_titles))))
-    title_to_color = {t: palette[i % len(palette)] for i, t in enumerate(all_titles)}
-
-    def colors_for(grouped):
-        return [title_to_color.get(t, palette[0]) for t in grouped["title"]]
-
-    trend_df = df[(df["day"] >= trend_start) & (df["day"] <= latest_day)].copy()
-    daily_totals = trend_df.groupby("day", as_index=True)["duration"].sum()
-    trend_index = pd.date_range(trend_start, latest_day, freq="D")
-    daily_totals = daily_totals.reindex(trend_index, fill_value=0)
-
-    stack_df = week_df.pivot_table(index="day", columns="title", values="duration", aggfunc="sum").fillna(0)
-    stack_index = pd.date_range(week_start, latest_day, freq="D")
-    stack_df = stack_df.reindex(stack_index, fill_value=0)
-    stack_titles = sorted(stack_df.columns.tolist(), key=lambda t: all_titles.index(t) if t in all_titles else 999)
-    stack_df = stack_df[stack_titles]
-
-    # ---------------- Improved layout using GridSpec (reserve right margin for legends) ----------------
-    import matplotlib.gridspec as gridspec
-
-    # set right < 1.0 to reserve room for pie legends (adjust if your legends are wider)
-    fig = plt.figure(figsize=(14, 10), facecolor="#121212")
-    gs = gridspec.GridSpec(3, 3, figure=fig, wspace=0.5, hspace=0.6,
-                           left=0.06, right=0.75, top=0.88, bottom=0.06)
-
-    ax_bar_today = fig.add_subplot(gs[0, 0:2])
-    ax_pie_today = fig.add_subplot(gs[0, 2])
-    ax_bar_week = fig.add_subplot(gs[1, 0:2])
-    ax_pie_week = fig.add_subplot(gs[1, 2])
-    ax_line_trend = fig.add_subplot(gs[2, 0:2])
-    ax_stack_week = fig.add_subplot(gs[2, 2])
-
-    # compact, consistent font sizes
-    small_title = dict(fontsize=12, fontweight="bold", color="white")
-    label_style = dict(fontsize=10, color="lightgray")
-    annot_fs = 9
-
-    pretty_date = latest_day.strftime("%d-%m-%y")
-    pretty_week = f"{week_start.strftime('%d-%m-%y')} → {pretty_date}"
-    trend_start_str = trend_start.strftime('%d-%m-%y')
-
-    # header: show primary totals and streaks in a single short suptitle
-    fig.suptitle(
-        f"Today: {pretty_date} {total_day_duration:.0f}m   |   7d: {total_week_duration:.0f}m   |   "
-        f"Max streak: {max_streak}d   |   Current streak: {current_streak}d",
-        fontsize=13, fontweight="bold", color="white"
-    )
-
-    # --- Today bar ---
-    bars = ax_bar_today.bar(
-        grouped_today["title"], grouped_today["total_duration"],
-        color=colors_for(grouped_today), edgecolor="white", linewidth=0.8
-    )
-    for b in bars:
-        h = b.get_height()
-        ax_bar_today.annotate(f"{h:.0f}", xy=(b.get_x() + b.get_width() / 2, h),
-                              xytext=(0, 3), textcoords="offset points",
-                              ha="center", va="bottom", fontsize=annot_fs, color="white")
-    ax_bar_today.set_title("Today (by title)", **small_title)
-    ax_bar_today.set_xlabel("", **label_style)
-    ax_bar_today.set_ylabel("Minutes", **label_style)
-    if len(grouped_today):
-        ax_bar_today.set_ylim(0, max(1, grouped_today["total_duration"].max() * 1.15))
-    ax_bar_today.grid(axis="y", linestyle="--", alpha=0.25, color="gray")
-    ax_bar_today.tick_params(colors="lightgray", labelsize=9, axis="x", rotation=25)
-
-    # --- Today pie (compact, shrunk radius) ---
-    sizes = grouped_today["total_duration"].values
-    labels = grouped_today["title"].values
-    total = sizes.sum() if len(sizes) else 0
-    autopct = (lambda p: f"{p:.0f}%\n{p * total / 100:.0f}m") if total > 0 else None
-    wedges, texts, autotexts = ax_pie_today.pie(
-        sizes, labels=None, autopct=autopct, startangle=90,
-        colors=colors_for(grouped_today), pctdistance=0.68, radius=0.82,
-        textprops=dict(color="white", fontsize=8),
-        wedgeprops=dict(edgecolor="#1a1a1a", linewidth=0.6)
-    )
-    ax_pie_today.axis("equal")
-    ax_pie_today.set_title("Today (share)", **small_title)
-    # place legend in the reserved right margin area (inside figure now)
-    if len(labels):
-        ax_pie_today.legend(wedges, labels, title="Title", loc="center left",
-                            bbox_to_anchor=(1.02, 0.5), frameon=True, facecolor="#121212",
-                            edgecolor="white", fontsize=9, handlelength=1.0)
-
-    # --- Week bar ---
-    bars_w = ax_bar_week.bar(
-        grouped_week["title"], grouped_week["total_duration"],
-        color=colors_for(grouped_week), edgecolor="white", linewidth=0.8
-    )
-    for b in bars_w:
-        h = b.get_height()
-        ax_bar_week.annotate(f"{h:.0f}", xy=(b.get_x() + b.get_width() / 2, h),
-                             xytext=(0, 3), textcoords="offset points",
-                             ha="center", va="bottom", fontsize=annot_fs, color="white")
-    ax_bar_week.set_title("Last 7 Days (by title)", **small_title)
-    ax_bar_week.set_xlabel("", **label_style)
-    ax_bar_week.set_ylabel("Minutes", **label_style)
-    if len(grouped_week):
-        ax_bar_week.set_ylim(0, max(1, grouped_week["total_duration"].max() * 1.15))
-    ax_bar_week.grid(axis="y", linestyle="--", alpha=0.25, color="gray")
-    ax_bar_week.tick_params(colors="lightgray", labelsize=9, axis="x", rotation=25)
-
-    # --- Week pie (compact, shrunk radius) ---
-    sizes_w = grouped_week["total_duration"].values
-    labels_w = grouped_week["title"].values
-    total_w = sizes_w.sum() if len(sizes_w) else 0
-    autopct_w = (lambda p: f"{p:.0f}%\n{p * total_w / 100:.0f}m") if total_w > 0 else None
-    wedges_w, texts_w, autotexts_w = ax_pie_week.pie(
-        sizes_w, labels=None, autopct=autopct_w, startangle=90,
-        colors=colors_for(grouped_week), pctdistance=0.68, radius=0.82,
-        textprops=dict(color="white", fontsize=8),
-        wedgeprops=dict(edgecolor="#1a1a1a", linewidth=0.6)
-    )
-    ax_pie_week.axis("equal")
-    ax_pie_week.set_title("Last 7 Days (share)", **small_title)
-    if len(labels_w):
-        ax_pie_week.legend(wedges_w, labels_w, title="Title", loc="center left",
-                           bbox_to_anchor=(1.02, 0.5), frameon=True, facecolor="#121212",
-                           edgecolor="white", fontsize=9, ncol=1, handlelength=1.0)
-
-    # --- 14-day trend line (wider) ---
-    y_vals = daily_totals.values.astype(float)
-    x_vals = daily_totals.index
-    ax_line_trend.plot(x_vals, y_vals, marker="o", linewidth=1.75)
-    ax_line_trend.set_title(f"Last 14 Days — {trend_start_str} → {pretty_date}", **small_title)
-    ax_line_trend.set_xlabel("Date", **label_style)
-    ax_line_trend.set_ylabel("Minutes", **label_style)
-    ax_line_trend.grid(True, linestyle="--", alpha=0.25, color="gray")
-    ax_line_trend.tick_params(colors="lightgray", axis="x", labelrotation=35, labelsize=9)
-    ax_line_trend.tick_params(colors="lightgray", axis="y", labelsize=9)
-    if len(y_vals):
-        ymax = y_vals.max()
-        ax_line_trend.set_ylim(0, ymax * 1.15 if ymax > 0 else 1)
-    for x, y in zip(x_vals, y_vals):
-        if y > 0:
-            ax_line_trend.annotate(f"{int(y)}m", xy=(x, y), xytext=(0, 5),
-                                   textcoords="offset points", ha="center", va="bottom",
-                                   fontsize=8, color="white",
-                                   bbox=dict(boxstyle="round,pad=0.15", fc=(0, 0, 0, 0.4), ec="none"))
-
-    # --- Stacked small column for last 7 days (compact) ---
-    bottom = np.zeros(len(stack_df), dtype=float)
-    for t in stack_titles:
-        vals = stack_df[t].values
-        ax_stack_week.bar(
-            stack_df.index, vals, bottom=bottom,
-            label=t, color=title_to_color.get(t, palette[0]),
-            edgecolor="#1a1a1a", linewidth=0.4
-        )
-        bottom += vals
-    ax_stack_week.set_title("Last 7 Days — Daily stack", **small_title)
-    ax_stack_week.set_xlabel("", **label_style)
-    ax_stack_week.set_ylabel("Minutes", **label_style)
-    ax_stack_week.grid(axis="y", linestyle="--", alpha=0.25, color="gray")
-    ax_stack_week.tick_params(colors="lightgray", axis="x", labelrotation=35, labelsize=8)
-    ax_stack_week.tick_params(colors="lightgray", axis="y", labelsize=9)
-    if len(stack_titles):
-        ax_stack_week.legend(loc="center left", bbox_to_anchor=(1.02, 0.5),
-                             facecolor="#121212", edgecolor="white", title="Title", fontsize=8)
-
-    # Reserve the right margin for legends (do not call tight_layout)
-    fig.subplots_adjust(right=0.75)  # tweak 0.75 -> 0.70/0.78 if you need more/less room
-
-    try:
-        plt.show()
-    finally:
-        try:
-            plt.close("all")
-        except Exception:
-            pass
+    def report(self):
+        if not self.enabled:
+            return
+        heavy = [m for m in ("pandas", "numpy", "matplotlib") if m in sys.modules]
+        lines = [f"  {name:<34} {1000 * secs:9.1f} ms" for name, secs in self.phases]
+        lines.append(f"  analytics stack imported: {', '.join(heavy) if heavy else 'no'}")
+        print("startup profile\n" + "\n".join(lines), file=sys.stderr)
 
 
 def resource_path(relative_path: str) -> Path:
@@ -289,28 +102,56 @@ def resource_path(relative_path: str) -> Path:
 
 class App(tk.Tk):
     def __init__(self):
-        super().__init__()
+        self.profile = StartupProfiler(PROFILE_STARTUP)
+        with self.profile.phase("tk init"):
+            super().__init__()
         self.title("Concentria v2.0")
         self.geometry("1440x960")
         self.minsize(1100, 680)
         self.configure(padx=14, pady=14)
-        self.day_index = {}
-        self.entries = []
-        self._suppress_save = False
+        self._t_start = time.perf_counter()
+        self._dirty_footers = set()
+        self._footer_after_id = None
+        self._load_gen = 0
+        self._loading = False
+        self._loaded = False    # entries hold the whole store (a load finished)
+        self._load_after_id = None
+        self._pending_adds = []
+        self.entries = EntryIndex()
+        self.search = SearchIndex()
+        self._search_gen = 0
+        self._search_after_id = None
+        self._stream_after_id = None
+        self.analytics = AnalyticsWorker()
+        self._analytics_after_id = None
+        with self.profile.phase("open store"):
+            self.store = open_store()
+            self.writer = BackgroundWriter(self.store)
         self._timer_after_id = None
         self._timer_running = False
         self._timer_total_secs = 0
         self._timer_remaining_secs = 0
         self._closing = False
         self.protocol("WM_DELETE_WINDOW", self.on_close)
-        self._build_ui()
+        with self.profile.phase("_build_ui"):
+            self._build_ui()
+        self.day_tree = DayTree(self.tree, self.entries, self._schedule_footer)
         self._quotes_after_id = None
         self.quote_interval_ms = 10 * 60 * 1000
-        self.quotes = []
-        self.quote_index = -1
-        self._load_quotes()
+        self.quotes = None
+        with self.profile.phase("_load_quotes"):
+            self._load_quotes()
         self._show_next_quote(schedule_next=True)
-        self.load_entries_from_csv()
+        with self.profile.phase("load_entries_from_csv (call)"):
+            self.load_entries_from_csv()
+        self._writer_after_id = self.after(1000, self._check_writer_errors)
+        self.after_idle(self._report_first_frame)
+
+    def _report_first_frame(self):
+        self.update_idletasks()
+        now = time.perf_counter()
+        log.info("first interactive frame after %.0f ms", 1000 * (now - self._t_start))
+        self.profile.milestone("first frame (since process start)", now - _IMPORT_T0)
 
     def _build_ui(self):
         style = ttk.Style(self)
@@ -392,6 +233,8 @@ class App(tk.Tk):
         header.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 12))
         header.columnconfigure(0, weight=1)
         ttk.Label(header, text="Concentria created by Ali Aliyev 2025", font=hero_font, foreground="#ffffff").grid(row=0, column=0, sticky="w")
+        self.streak_lbl = ttk.Label(header, text="", foreground=FG_MUTED, font=base_font)
+        self.streak_lbl.grid(row=0, column=1, sticky="e")
         self.subtitle_lbl = ttk.Label(header, text="", foreground=FG_MUTED, font=quote_font, wraplength=1000, justify="left")
         self.subtitle_lbl.grid(row=1, column=0, sticky="w", pady=(2, 0))
         inputs_card = ttk.LabelFrame(self, text="Quick Add", style="Card.TLabelframe")
@@ -427,8 +270,22 @@ class App(tk.Tk):
         ttk.Button(toolbar, text="Remove Selected", style="Secondary.TButton", command=self.remove_selected).grid(row=0, column=0, sticky="ew", padx=4)
         ttk.Button(toolbar, text="Clear All", style="Danger.TButton", command=self.clear_all).grid(row=0, column=1, sticky="ew", padx=4)
         ttk.Button(toolbar, text="Reload CSV", style="Secondary.TButton", command=self.reload_csv).grid(row=0, column=2, sticky="ew", padx=4)
+        self.btn_load_older = ttk.Button(toolbar, text="Load older", style="Secondary.TButton", command=self.load_older_days, state="disabled")
+        self.btn_load_older.grid(row=0, column=3, sticky="ew", padx=4)
+        self.load_progress = ttk.Progressbar(toolbar, mode="indeterminate")
+        self.load_progress.grid(row=0, column=4, sticky="ew", padx=4)
+        self.load_progress.grid_remove()
         ttk.Button(toolbar, text="Quit", style="Secondary.TButton", command=self.on_close).grid(row=0, column=5, sticky="e", padx=4)
         ttk.Button(toolbar, text="Analyze", style="Secondary.TButton", command=self.on_analyze).grid(row=0, column=6, sticky="e", padx=4)
+        search_bar = ttk.Frame(toolbar)
+        search_bar.grid(row=1, column=0, columnspan=7, sticky="ew", padx=4, pady=(10, 0))
+        search_bar.columnconfigure(1, weight=1)
+        ttk.Label(search_bar, text="Search").grid(row=0, column=0, sticky="w", padx=(0, 8))
+        self.search_var = tk.StringVar()
+        ttk.Entry(search_bar, textvariable=self.search_var).grid(row=0, column=1, sticky="ew")
+        self.search_status = ttk.Label(search_bar, text="", foreground=FG_MUTED)
+        self.search_status.grid(row=0, column=2, sticky="e", padx=(8, 0))
+        self.search_var.trace_add("write", lambda *_: self._schedule_search())
         list_card = ttk.LabelFrame(self, text="Items (grouped by day)", style="Card.TLabelframe")
         list_card.grid(row=3, column=0, sticky="nsew", padx=(0, 10))
         self.grid_rowconfigure(3, weight=1)
@@ -454,6 +311,7 @@ class App(tk.Tk):
         hsb.grid(row=1, column=0, columnspan=2, sticky="we", padx=10, pady=(0, 10))
         self.tree.tag_configure("oddrow", background=ROW_ODD)
         self.tree.tag_configure("evenrow", background=ROW_EVEN)
+        self.tree.bind("<<TreeviewOpen>>", self._on_tree_open)
         timer = ttk.LabelFrame(self, text="Focus Timer", style="Card.TLabelframe")
         timer.grid(row=1, column=1, rowspan=3, sticky="nsew")
         for c in range(2):
@@ -480,78 +338,184 @@ class App(tk.Tk):
     def _day_key(self, dt: datetime) -> str:
         return dt.strftime("%d-%m-%y")
 
-    def _day_label(self, key: str, count: int) -> str:
-        return f"{key} ({count})"
+    def save_entries_to_csv(self):
+        self.writer.reset([e.to_row() for e in self.entries])
 
-    def _parse_day_from_parent_text(self, text: str) -> str:
-        return text.split(" ")[0]
+    def _persist_add(self, entry: Entry):
+        self.writer.add(entry.to_row())
 
-    def _find_parent_for_day(self, day_key: str):
-        for rid in self.tree.get_children(""):
-            txt = self.tree.item(rid, "text") or ""
-            if txt.startswith(day_key + " ") or txt == day_key or txt.startswith(day_key + " — "):
-                return rid
-        return None
+    def _persist_remove_many(self, entries):
+        self.writer.remove_many([e.to_row() for e in entries])
 
-    def _find_footer_id(self, parent_id: str):
-        for cid in self.tree.get_children(parent_id):
-            if (self.tree.item(cid, "text") or "").startswith("Total"):
-                return cid
-        return None
+    def _check_writer_errors(self):
+        if self._closing:
+            return
+        errors = self.writer.take_errors()
+        if errors:
+            messagebox.showerror("Save error", f"Failed to save CSV: {errors[-1]}\nThe changes are kept and will be saved again shortly.")
+        self._writer_after_id = self.after(1000, self._check_writer_errors)
 
-    def _parse_minutes(self, s: str) -> int:
+    def load_entries_from_csv(self):
+        # Rows are parsed on a worker thread and handed over in batches; the Tk
+        # side drains them in short after() slices so the window stays live.
+        self._cancel_load()
+        self._cancel_search()
+        self.day_tree.filter_ids = None
+        self.clear_visual_only()
+        self.entries = EntryIndex()
+        self.day_tree.entries = self.entries
+        self._loading = True
+        self._loaded = False
+        self._pending_adds = []
+        self._load_done = 0
+        self._load_t0 = time.perf_counter()
+        self._show_load_progress(0)
+        q = queue.Queue()
+        threading.Thread(target=self._load_worker, args=(self._load_gen, q), daemon=True).start()
+        self._load_after_id = self.after(LOAD_POLL_MS, self._drain_load, self._load_gen, q)
+
+    def _load_worker(self, gen, q):
         try:
-            val = int(float(str(s).strip()))
-            return max(0, val)
-        except Exception:
-            return 0
+            self.writer.flush()
+            search = SearchIndex()
+            seen = set()
+            needs_rewrite = False
+            batch = []
+            # Rows are turned into entries as the store parses them, so only
+            # one batch of row dicts is alive at a time.
+            for row in self.store.iter_rows():
+                e = Entry.from_row(row)
+                if not row.get("id") or e.id in seen:
+                    # Legacy or hand-edited rows get a fresh id; persist them once.
+                    e.id = new_entry_id()
+                    needs_rewrite = True
+                seen.add(e.id)
+                search.add(e)
+                batch.append(e)
+                if len(batch) == LOAD_BATCH:
+                    if gen != self._load_gen:
+                        return
+                    q.put(("rows", batch))
+                    batch = []
+            if batch:
+                q.put(("rows", batch))
+            q.put(("done", (needs_rewrite, search)))
+        except Exception as e:
+            q.put(("error", e))
 
-    def _day_total_minutes(self, day_key: str) -> int:
-        return sum(self._parse_minutes(e.get("duration", 0)) for e in self.entries if e.get("date") == day_key)
+    def _drain_load(self, gen, q):
+        self._load_after_id = None
+        if gen != self._load_gen:
+            return
+        deadline = time.perf_counter() + LOAD_SLICE_MS / 1000
+        while time.perf_counter() < deadline:
+            try:
+                kind, payload = q.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "rows":
+                for e in payload:
+                    self.entries.add(e)
+                self._load_done += len(payload)
+            elif kind == "error":
+                messagebox.showerror("Load error", f"Failed to read CSV: {payload}")
+                self._finish_load(False, SearchIndex(self.entries))
+                return
+            else:
+                self._loaded = True
+                self._finish_load(*payload)
+                return
+        self._show_load_progress(self._load_done)
+        self._load_after_id = self.after(LOAD_POLL_MS, self._drain_load, gen, q)
 
-    def save_entries_to_csv(self):
-        if self._suppress_save:
+    def _cancel_load(self):
+        self._load_gen += 1
+        self._loading = False
+        if self._load_after_id is not None:
+            try:
+                self.after_cancel(self._load_after_id)
+            except Exception:
+                pass
+            self._load_after_id = None
+        self._show_load_progress(None)
+
+    def _finish_load(self, needs_rewrite: bool, search: SearchIndex):
+        # Sessions added while loading were already persisted; a re-read store may
+        # also have returned them, so they only join the index if still missing.
+        self.search = search
+        self._merge_pending_adds(visual=False)
+        if needs_rewrite:
+            self.writer.reset([e.to_row() for e in self.entries])
+        days = list(self.entries.days())
+        shown = days[-TREE_DAYS:] if TREE_DAYS else days
+        self.day_tree.hidden_days = days[:len(days) - len(shown)]
+        self._render_loaded_days(self._load_gen, shown, 0)
+
+    def _render_loaded_days(self, gen, shown, start):
+        self._load_after_id = None
+        if gen != self._load_gen:
+            return
+        for day_key in shown[start:start + RENDER_DAYS_PER_SLICE]:
+            self.day_tree.insert_day(day_key)
+        start += RENDER_DAYS_PER_SLICE
+        if start < len(shown):
+            self._load_after_id = self.after(LOAD_POLL_MS, self._render_loaded_days, gen, shown, start)
             return
+        if shown:
+            self.day_tree.materialize_day(shown[-1], open_row=True)
+        self._update_load_older()
+        self._loading = False
+        self._show_load_progress(None)
+        self._merge_pending_adds(visual=True)
+        self._flush_footers()
+        load_s = time.perf_counter() - self._load_t0
+        log.info("loaded %d sessions in %.0f ms", len(self.entries), 1000 * load_s)
+        self.profile.milestone(f"load ({len(self.entries)} sessions, async)", load_s)
+        if self.search_var.get().strip():
+            self._apply_search()
+        if ANALYTICS_PREWARM and len(self.entries):
+            self.after(ANALYTICS_WARM_MS, self._warm_analytics)
+
+    def _merge_pending_adds(self, visual: bool):
+        pending, self._pending_adds = self._pending_adds, []
+        for e in pending:
+            if self.entries.get(e.id) is None:
+                self.entries.add(e)
+                self.search.add(e)
+                if visual:
+                    self.day_tree.insert_entry(e)
+
+    def _show_load_progress(self, done):
+        # The total is not known while rows are still streaming in, so the bar
+        # only shows that the load is moving.
         try:
-            with open(CSV_FILE, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-                writer.writeheader()
-                for e in self.entries:
-                    if "hardness" not in e:
-                        e["hardness"] = ""
-                    writer.writerow(e)
-        except Exception as e:
-            messagebox.showerror("Save error", f"Failed to save CSV: {e}")
+            if done is None:
+                self.load_progress.grid_remove()
+            else:
+                self.load_progress.step()
+                self.load_progress.grid()
+        except Exception:
+            pass
 
-    def load_entries_from_csv(self):
-        self._suppress_save = True
-        self.clear_visual_only()
-        self.entries = []
-        if os.path.exists(CSV_FILE):
-            try:
-                with open(CSV_FILE, "r", newline="", encoding="utf-8") as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        if not row:
-                            continue
-                        try:
-                            date_key = (row.get("date", "") or "").strip()
-                            clock = (row.get("clock", "") or "").strip()
-                            title = (row.get("title", "") or "").strip()
-                            duration = (row.get("duration", "") or "").strip()
-                            note = (row.get("note", "") or "").strip()
-                            hardness = (row.get("hardness", "") or "").strip()
-                            self.entries.append({"date": date_key, "clock": clock, "title": title, "duration": duration, "note": note, "hardness": hardness})
-                        except Exception:
-                            continue
-            except Exception as e:
-                messagebox.showerror("Load error", f"Failed to read CSV: {e}")
-        for e in self.entries:
-            self._insert_visual(e["date"], e["clock"], e["title"], e["duration"], e["note"], e.get("hardness", ""))
-        for day_key in {e["date"] for e in self.entries}:
-            self._update_total_footer(day_key)
-        self._suppress_save = False
-        self._retag_tree()
+    def _on_tree_open(self, event=None):
+        iid = self.tree.focus()
+        if not iid or self.tree.parent(iid):
+            return
+        self.day_tree.expand(iid)
+
+    def load_older_days(self):
+        if not self.day_tree.hidden_days:
+            return
+        self.day_tree.load_older(OLDER_DAYS_STEP)
+        self._update_load_older()
+        self._flush_footers()
+
+    def _update_load_older(self):
+        n = len(self.day_tree.hidden_days)
+        try:
+            self.btn_load_older.configure(text=f"Load older ({n} days)" if n else "Load older", state="normal" if n else "disabled")
+        except Exception:
+            pass
 
     def reload_csv(self):
         self.load_entries_from_csv()
@@ -579,44 +543,38 @@ class App(tk.Tk):
         date_key = self._day_key(now)
         clock = now.strftime("%H:%M")
         duration = duration_raw
-        self.entries.append({"date": date_key, "clock": clock, "title": title, "duration": duration, "note": note, "hardness": hardness})
-        self.save_entries_to_csv()
-        self._insert_visual(date_key, clock, title, duration, note, hardness)
-        self._update_total_footer(date_key)
+        entry = Entry(date_key, clock, title, duration, note, hardness)
+        if self._loading:
+            self._pending_adds.append(entry)
+            self._persist_add(entry)
+        else:
+            self.entries.add(entry)
+            self.search.add(entry)
+            self._persist_add(entry)
+            matches = self.day_tree.filter_ids
+            if matches is not None and self.search.matches(entry, self.search_var.get()):
+                matches.add(entry.id)
+            self.day_tree.insert_entry(entry)
         self.title_var.set("")
         self.duration_var.set("0")
         self.note_text.delete("1.0", "end")
 
     def _load_quotes(self):
-        lines = []
+        # The bundled quotes.txt plus any *.txt packs in the app data "quotes"
+        # folder; CONCENTRIA_QUOTE_TAGS narrows them down by pack tag.
+        packs = [resource_path("quotes.txt")]
+        if QUOTE_PACKS_DIR.is_dir():
+            packs.extend(sorted(QUOTE_PACKS_DIR.glob("*.txt")))
         try:
-            path = resource_path("quotes.txt")
-            with open(path, "r", encoding="utf-8") as f:
-                for line in f:
-                    s = line.strip()
-                    if s and not s.startswith("#"):
-                        lines.append(s)
+            self.quotes = QuoteStore(packs, tags=QUOTE_TAGS, index_dir=app_data_dir() / "cache")
         except Exception:
-            lines = []
-        self.quotes = lines
-        self.quote_index = -1
+            self.quotes = None
 
     def _show_next_quote(self, schedule_next=False):
         if not getattr(self, "subtitle_lbl", None):
             return
-        if not getattr(self, "quotes", None):
-            self._load_quotes()
-        if self.quotes:
-            if len(self.quotes) == 1:
-                new_idx = 0
-            else:
-                last = getattr(self, "quote_index", -1)
-                new_idx = random.randrange(len(self.quotes))
-                if last != -1 and len(self.quotes) > 1:
-                    if new_idx == last:
-                        new_idx = random.randrange(len(self.quotes))
-            self.quote_index = new_idx
-            quote = self.quotes[new_idx]
+        quote = self.quotes.next() if self.quotes is not None else None
+        if quote:
             try:
                 self.subtitle_lbl.configure(text=f'“{quote}”')
             except Exception:
@@ -632,209 +590,121 @@ class App(tk.Tk):
             except Exception:
                 self._quotes_after_id = None
 
-    def _insert_visual(self, day_key: str, clock: str, title: str, duration: str, note: str, hardness: str):
-        if day_key not in self.day_index:
-            iid = self.tree.insert("", "end", text=f"{day_key}", values=(duration, hardness, title, note))
-            self.day_index[day_key] = {"mode": "single", "item_id": iid, "clock": clock}
-            self._retag_tree()
-            return
-        state = self.day_index[day_key]
-        if state["mode"] == "single":
-            single_id = state["item_id"]
-            first_clock = state.get("clock", "")
-            old_vals = self.tree.item(single_id, "values")
-            index = self.tree.index(single_id)
-            parent_id = self.tree.insert("", index, text=self._day_label(day_key, 2), open=True)
-            child1 = self.tree.insert(parent_id, "end", text=first_clock or "--:--", values=old_vals)
-            self.tree.insert(parent_id, "end", text=clock, values=(duration, hardness, title, note))
-            self.tree.delete(single_id)
-            self.day_index[day_key] = {"mode": "group", "parent_id": parent_id, "children": [child1]}
-            self.day_index[day_key]["children"].append(self.tree.get_children(parent_id)[-1])
-            self._update_total_footer(day_key)
-        else:
-            parent_id = state.get("parent_id")
-            if not parent_id or not self.tree.exists(parent_id):
-                recovered = self._find_parent_for_day(day_key)
-                if recovered:
-                    parent_id = recovered
-                    state["parent_id"] = parent_id
-                    state["children"] = [cid for cid in self.tree.get_children(parent_id) if not (self.tree.item(cid, "text") or "").startswith("Total")]
-                else:
-                    parent_id = self.tree.insert("", "end", text=self._day_label(day_key, 0), open=True)
-                    state["mode"] = "group"
-                    state["parent_id"] = parent_id
-                    state["children"] = []
-            existing_footer = self._find_footer_id(parent_id)
-            if existing_footer:
-                idx = self.tree.index(existing_footer)
-                child = self.tree.insert(parent_id, idx, text=clock, values=(duration, hardness, title, note))
-            else:
-                child = self.tree.insert(parent_id, "end", text=clock, values=(duration, hardness, title, note))
-            state["children"].append(child)
-            self.tree.item(parent_id, text=self._day_label(day_key, len(state["children"])))
-            self._update_total_footer(day_key)
-        self._retag_tree()
-
     def remove_selected(self):
         sel = self.tree.selection()
         if not sel:
             return
-        changed = False
-        affected_days = set()
-        for iid in list(sel):
-            parent = self.tree.parent(iid)
-            if parent:
-                parent_text = self.tree.item(parent, "text")
-                day_key = self._parse_day_from_parent_text(parent_text)
-                vals = self.tree.item(iid, "values")
-                duration, hardness, title, note = vals
-                clock = self.tree.item(iid, "text")
-                self.tree.delete(iid)
-                state = self.day_index.get(day_key)
-                if state and state.get("mode") == "group":
-                    if iid in state["children"]:
-                        state["children"].remove(iid)
-                        if len(state["children"]) == 1:
-                            remaining = state["children"][0]
-                            r_vals = self.tree.item(remaining, "values")
-                            r_clock = self.tree.item(remaining, "text")
-                            index = self.tree.index(parent)
-                            new_single = self.tree.insert("", index, text=f"{day_key}", values=r_vals)
-                            self.tree.delete(remaining)
-                            self.tree.delete(parent)
-                            self.day_index[day_key] = {"mode": "single", "item_id": new_single, "clock": r_clock}
-                        else:
-                            self.tree.item(parent, text=self._day_label(day_key, len(state["children"])))
-                if self._remove_first_matching_entry(day_key, clock, title, duration, note, hardness):
-                    changed = True
-                    affected_days.add(day_key)
-            else:
-                if self.tree.get_children(iid):
-                    parent_text = self.tree.item(iid, "text")
-                    day_key = self._parse_day_from_parent_text(parent_text)
-                    for cid in list(self.tree.get_children(iid)):
-                        ctext = self.tree.item(cid, "text") or ""
-                        if ctext.startswith("Total"):
-                            self.tree.delete(cid)
-                            continue
-                        dur, hardness, title, note = self.tree.item(cid, "values")
-                        clock = ctext
-                        if self._remove_first_matching_entry(day_key, clock, title, dur, note, hardness):
-                            changed = True
-                        self.tree.delete(cid)
-                    self.tree.delete(iid)
-                    if self.day_index.get(day_key, {}).get("parent_id") == iid:
-                        del self.day_index[day_key]
-                    affected_days.add(day_key)
-                else:
-                    text = self.tree.item(iid, "text")
-                    day_key = text.split(" — ")[0]
-                    vals = self.tree.item(iid, "values")
-                    if vals:
-                        duration, hardness, title, note = vals
-                    else:
-                        duration = hardness = title = note = ""
-                    state = self.day_index.get(day_key, {})
-                    stored_clock = state.get("clock", "")
-                    self.tree.delete(iid)
-                    if state.get("item_id") == iid:
-                        del self.day_index[day_key]
-                    if stored_clock:
-                        if self._remove_first_matching_entry(day_key, stored_clock, title, duration, note, hardness):
-                            changed = True
-                            affected_days.add(day_key)
-                    else:
-                        if self._remove_first_matching_single(day_key, title, duration, note, hardness):
-                            changed = True
-                            affected_days.add(day_key)
-        if changed:
-            self.save_entries_to_csv()
-            for day_key in affected_days:
-                self._update_total_footer(day_key)
-        self._retag_tree()
-
-    def _calc_points(self, total_minutes: int, avg_hardness: float, alpha: float = 0.7, beta: float = 0.5) -> float:
-        if total_minutes <= 0 or avg_hardness <= 0:
-            return 0.0
-        t_term = max(0.0, total_minutes) / 480.0
-        h_term = max(0.1, avg_hardness) / 6.0
-        raw = (t_term ** alpha) * (h_term ** beta)
-        return min(100.0, 100.0 * raw)
-
-    def _update_total_footer(self, day_key: str):
-        total = self._day_total_minutes(day_key)
-        hvals = []
-        for e in self.entries:
-            if e.get("date") == day_key:
+        # Resolve the whole selection to entries first, drop them from the
+        # indexes and the store in one batch, then rebuild each touched day once.
+        doomed = self.day_tree.resolve(sel)
+        if not doomed:
+            return
+        for e in doomed.values():
+            self.entries.remove(e)
+            self.search.remove(e)
+        if self.day_tree.filter_ids is not None:
+            self.day_tree.filter_ids.difference_update(doomed)
+        self._persist_remove_many(doomed.values())
+        self.day_tree.remove(doomed.values())
+
+    def _schedule_search(self):
+        if self._search_after_id is not None:
+            try:
+                self.after_cancel(self._search_after_id)
+            except Exception:
+                pass
+        self._search_after_id = self.after(SEARCH_DEBOUNCE_MS, self._apply_search)
+
+    def _cancel_search(self):
+        self._search_gen += 1
+        for after_id in (self._search_after_id, self._stream_after_id):
+            if after_id is not None:
                 try:
-                    h = float(str(e.get("hardness", "")).strip())
-                    if 1.0 <= h <= 10.0:
-                        hvals.append(h)
+                    self.after_cancel(after_id)
                 except Exception:
                     pass
-        avg_hardness = (sum(hvals) / len(hvals)) if hvals else 1.0
-        points = self._calc_points(total, avg_hardness, alpha=0.7, beta=0.5)
-        points_str = f"{points:.2f}"
-        avg_h_str = f"{avg_hardness:.2f}"
-        state = self.day_index.get(day_key)
-        if not state:
+        self._search_after_id = self._stream_after_id = None
+
+    def _apply_search(self):
+        # Filters the tree to matching sessions. The match set comes from the
+        # index in one go; the tree is refilled day by day in after() slices.
+        self._search_after_id = None
+        if self._loading:
             return
-        if state.get("mode") == "group":
-            parent_id = state.get("parent_id")
-            if not parent_id or not self.tree.exists(parent_id):
-                return
-            footer_id = self._find_footer_id(parent_id)
-            footer_text = f"Total • Points: {points_str} (Avg H: {avg_h_str})"
-            footer_vals = (str(total), "", "", "")
-            if footer_id:
-                self.tree.item(footer_id, text=footer_text, values=footer_vals)
-                self.tree.move(footer_id, parent_id, "end")
-            else:
-                self.tree.insert(parent_id, "end", text=footer_text, values=footer_vals)
+        self._cancel_search()
+        text = self.search_var.get().strip()
+        self.clear_visual_only()
+        days = list(self.entries.days())
+        if text:
+            t0 = time.perf_counter()
+            matches = self.day_tree.filter_ids = self.search.query(text)
+            log.info("search %r: %d match(es) in %.1f ms", text, len(matches), 1000 * (time.perf_counter() - t0))
+            self.search_status.configure(text=f"{len(matches)} match(es)")
+            shown = days
         else:
-            iid = state.get("item_id")
-            if iid and self.tree.exists(iid):
-                self.tree.item(iid, text=f"{day_key} — Total: {total} — Points: {points_str} (Avg H: {avg_h_str})")
-        self._retag_tree()
-
-    def _remove_first_matching_entry(self, day_key, clock, title, duration, note, hardness) -> bool:
-        for i, e in enumerate(self.entries):
-            if (e.get("date") == day_key and e.get("clock") == clock and e.get("title") == title and
-                str(e.get("duration")) == str(duration) and e.get("note") == note and
-                str(e.get("hardness", "")) == str(hardness)):
-                del self.entries[i]
-                return True
-        for i, e in enumerate(self.entries):
-            if (e.get("date") == day_key and e.get("clock") == clock and e.get("title") == title and
-                str(e.get("duration")) == str(duration) and e.get("note") == note):
-                del self.entries[i]
-                return True
-        return False
-
-    def _remove_first_matching_single(self, day_key, title, duration, note, hardness) -> bool:
-        for i, e in enumerate(self.entries):
-            if (e.get("date") == day_key and e.get("title") == title and
-                str(e.get("duration")) == str(duration) and e.get("note") == note and
-                str(e.get("hardness", "")) == str(hardness)):
-                del self.entries[i]
-                return True
-        for i, e in enumerate(self.entries):
-            if (e.get("date") == day_key and e.get("title") == title and
-                str(e.get("duration")) == str(duration) and e.get("note") == note):
-                del self.entries[i]
-                return True
-        return False
+            self.day_tree.filter_ids = None
+            self.search_status.configure(text="")
+            shown = days[-TREE_DAYS:] if TREE_DAYS else days
+            self.day_tree.hidden_days = days[:len(days) - len(shown)]
+        self._stream_days(self._search_gen, shown, 0)
+
+    def _stream_days(self, gen, days, start):
+        self._stream_after_id = None
+        if gen != self._search_gen:
+            return
+        end = start + RENDER_DAYS_PER_SLICE
+        for day_key in days[start:end]:
+            self.day_tree.insert_day(day_key)
+        if end < len(days):
+            self._stream_after_id = self.after(LOAD_POLL_MS, self._stream_days, gen, days, end)
+            return
+        last = next((d for d in reversed(days) if d in self.day_tree.day_index), None)
+        if last is not None:
+            self.day_tree.materialize_day(last, open_row=True)
+        self._update_load_older()
+        self._flush_footers()
+
+    def _schedule_footer(self, day_key: str):
+        # Footers touched several times in one UI action are refreshed once, at idle.
+        self._dirty_footers.add(day_key)
+        if self._footer_after_id is None:
+            self._footer_after_id = self.after_idle(self._flush_footers)
+
+    def _flush_footers(self):
+        if self._footer_after_id is not None:
+            try:
+                self.after_cancel(self._footer_after_id)
+            except Exception:
+                pass
+            self._footer_after_id = None
+        dirty, self._dirty_footers = self._dirty_footers, set()
+        for day_key in dirty:
+            self.day_tree.update_footer(day_key)
+        self._update_streak_label()
+
+    def _update_streak_label(self):
+        streaks = self.entries.streaks
+        if not len(streaks):
+            self.streak_lbl.configure(text="")
+            return
+        current = streaks.current(datetime.now().toordinal())
+        self.streak_lbl.configure(text=f"Streak: {current} day{'s' if current != 1 else ''} • Best: {streaks.longest}")
 
     def clear_visual_only(self):
-        for iid in self.tree.get_children():
-            self.tree.delete(iid)
-        self.day_index.clear()
+        self.day_tree.clear()
+        self._update_load_older()
 
     def clear_all(self):
+        self._cancel_load()
+        self._cancel_search()
         self.clear_visual_only()
-        self.entries = []
+        self.entries.clear()
+        self.search.clear()
+        if self.day_tree.filter_ids is not None:
+            self.day_tree.filter_ids.clear()
+        self._loaded = True
+        self._update_streak_label()
         self.save_entries_to_csv()
-        self._retag_tree()
 
     def _format_mmss(self, secs: int) -> str:
         secs = max(0, int(secs))
@@ -895,14 +765,60 @@ class App(tk.Tk):
             self.btn_pause.configure(state="disabled", text="Pause")
 
     def on_analyze(self):
-        if not os.path.exists(CSV_FILE):
+        # Nothing is flushed or compacted here: the analytics process follows
+        # the journal, so sessions still on the writer queue show up in the
+        # open window as soon as they are written.
+        if not self.store.has_data() and not self.entries:
             messagebox.showinfo("Nothing to analyze", "No data yet. Add at least one entry first.")
             return
         try:
-            p = multiprocessing.Process(target=run_dashboard, args=(CSV_FILE,), daemon=True)
-            p.start()
+            self.analytics.request("show", self.store.path)
         except Exception as exc:
             messagebox.showerror("Analyze error", f"Failed to start analysis process:\n{exc}")
+            return
+        if self._analytics_after_id is None:
+            self._poll_analytics()
+
+    def _save_rollups(self):
+        # The (day, title) rollup kept in self.entries, written next to the CSV
+        # so the analytics views skip re-aggregating sessions. Only valid once
+        # the CSV holds exactly self.entries (flushed and compacted), so a load
+        # that was cancelled or failed part way leaves the file alone. SQLite
+        # maintains its own rollup table; undated rows need the analytics-side
+        # date fallback, so those datasets are left for the reader to rebuild.
+        if not isinstance(self.store, JournalStore) or not self._loaded or self.entries.undated or not os.path.exists(self.store.path):
+            return
+        try:
+            write_rollups(self.store.path, index_rows(self.entries))
+        except OSError:
+            log.exception("could not write the rollup file")
+
+    def _warm_analytics(self):
+        # Start the analytics process once the app is idle, so the first Analyze
+        # finds pandas/matplotlib imported and the history already parsed.
+        if self._closing or self.analytics.alive():
+            return
+        try:
+            self.analytics.request("warm", self.store.path)
+        except Exception:
+            log.exception("could not start the analytics process")
+            return
+        if self._analytics_after_id is None:
+            self._poll_analytics()
+
+    def _poll_analytics(self):
+        self._analytics_after_id = None
+        if self._closing:
+            return
+        for kind, detail in self.analytics.poll():
+            if kind == "error":
+                messagebox.showerror("Analyze error", detail)
+            elif kind == "warning":
+                log.warning("analytics warm-up failed: %s", detail)
+            else:
+                log.info("analytics request done in %.0f ms", 1000 * detail)
+        if self.analytics.busy:
+            self._analytics_after_id = self.after(ANALYTICS_POLL_MS, self._poll_analytics)
 
     def on_close(self):
         self._closing = True
@@ -919,6 +835,29 @@ class App(tk.Tk):
             except Exception:
                 pass
             self._quotes_after_id = None
+        self._cancel_load()
+        if self._analytics_after_id:
+            try:
+                self.after_cancel(self._analytics_after_id)
+            except Exception:
+                pass
+            self._analytics_after_id = None
+        self.analytics.close()
+        if getattr(self, "_writer_after_id", None):
+            try:
+                self.after_cancel(self._writer_after_id)
+            except Exception:
+                pass
+            self._writer_after_id = None
+        try:
+            self.writer.close()
+            self.store.close()
+        except Exception:
+            pass
+        else:
+            self._save_rollups()
+        if self.quotes is not None:
+            self.quotes.close()
 
         try:
             self.destroy()
@@ -956,16 +895,11 @@ class App(tk.Tk):
             return
         self._schedule_tick()
 
-    def _retag_tree(self):
-        for i, rid in enumerate(self.tree.get_children("")):
-            tag = "evenrow" if i % 2 == 0 else "oddrow"
-            self.tree.item(rid, tags=(tag,))
-            for j, cid in enumerate(self.tree.get_children(rid)):
-                ctag = "evenrow" if j % 2 == 0 else "oddrow"
-                self.tree.item(cid, tags=(ctag,))
 
 
 if __name__ == "__main__":
     multiprocessing.freeze_support()
+    logging.basicConfig(level=os.environ.get("CONCENTRIA_LOG_LEVEL", "WARNING").upper(),
+                        format="%(asctime)s %(name)s %(levelname)s %(message)s")
     App().mainloop()
 
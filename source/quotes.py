@@ -0,0 +1,161 @@
+import hashlib
+import mmap
+import os
+import random
+import struct
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+
+INDEX_MAGIC = b"CQI1"
+_HEADER = struct.Struct("<4sqqq")
+TAGS_PREFIX = b"# tags:"
+
+
+def _scan(buf):
+    # Start/end byte offsets of every quote line, stripped of surrounding
+    # whitespace; blank lines and "#" comments are skipped. "# tags:" headers
+    # are returned separately.
+    starts, ends, tags = array("q"), array("q"), []
+    pos, size = 0, len(buf)
+    while pos < size:
+        nl = buf.find(b"\n", pos)
+        if nl < 0:
+            nl = size
+        line = buf[pos:nl]
+        text = line.strip()
+        if text:
+            if text[:1] == b"#":
+                if text.lower().startswith(TAGS_PREFIX):
+                    tags.extend(t.strip().decode("utf-8").lower() for t in text[len(TAGS_PREFIX):].split(b","))
+            else:
+                s = pos + len(line) - len(line.lstrip())
+                starts.append(s)
+                ends.append(s + len(text))
+        pos = nl + 1
+    return starts, ends, [t for t in tags if t]
+
+
+class QuotePack:
+    # One quotes file, memory-mapped, with an offset index so any quote is read
+    # by position without keeping the decoded strings around. The index is
+    # cached in index_dir, keyed on the file's size and mtime.
+
+    def __init__(self, path, index_dir=None):
+        self.path = str(path)
+        st = os.stat(self.path)
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else b""
+        cached = self._read_index(index_dir, st)
+        if cached is None:
+            self.starts, self.ends, file_tags = _scan(self._map)
+            self._write_index(index_dir, st, file_tags)
+        else:
+            self.starts, self.ends, file_tags = cached
+        self.tags = {Path(self.path).stem.lower(), *file_tags}
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, i: int) -> str:
+        return self._map[self.starts[i]:self.ends[i]].decode("utf-8", errors="replace")
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def _index_path(self, index_dir):
+        key = hashlib.blake2b(os.path.abspath(self.path).encode("utf-8"), digest_size=8).hexdigest()
+        return Path(index_dir) / f"{Path(self.path).stem}-{key}.qidx"
+
+    def _read_index(self, index_dir, st):
+        if index_dir is None:
+            return None
+        try:
+            with open(self._index_path(index_dir), "rb") as f:
+                magic, size, mtime_ns, count = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != INDEX_MAGIC or size != st.st_size or mtime_ns != st.st_mtime_ns:
+                    return None
+                starts, ends = array("q"), array("q")
+                starts.fromfile(f, count)
+                ends.fromfile(f, count)
+                tags = [t for t in f.read().decode("utf-8").split("\n") if t]
+        except (OSError, EOFError, struct.error, UnicodeDecodeError):
+            return None
+        return starts, ends, tags
+
+    def _write_index(self, index_dir, st, tags):
+        if index_dir is None:
+            return
+        path = self._index_path(index_dir)
+        # Per-process name: the app and the bench/render CLIs may build it at once.
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(INDEX_MAGIC, st.st_size, st.st_mtime_ns, len(self.starts)))
+                self.starts.tofile(f)
+                self.ends.tofile(f)
+                f.write("\n".join(tags).encode("utf-8"))
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+
+class QuoteStore:
+    # Quotes from every pack whose tags match, drawn from a shuffle-bag: each
+    # quote is shown once before any repeats, and a refilled bag never starts
+    # with the quote that was just shown.
+
+    def __init__(self, paths, tags=None, index_dir=None, rng=None):
+        self.packs = []
+        for p in paths:
+            try:
+                self.packs.append(QuotePack(p, index_dir))
+            except OSError:
+                continue
+        wanted = {t.strip().lower() for t in tags or () if t.strip()}
+        selected = [p for p in self.packs if not wanted or p.tags & wanted]
+        self.selected = selected or self.packs
+        self._bounds = []
+        total = 0
+        for p in self.selected:
+            total += len(p)
+            self._bounds.append(total)
+        self._rng = rng or random.Random()
+        self._bag = array("I")
+        self._left = 0
+        self._last = None
+
+    def __len__(self):
+        return self._bounds[-1] if self._bounds else 0
+
+    def __getitem__(self, i: int) -> str:
+        k = bisect_right(self._bounds, i)
+        pack = self.selected[k]
+        return pack[i - (self._bounds[k - 1] if k else 0)]
+
+    def next(self):
+        # Incremental Fisher-Yates: one swap per draw instead of shuffling the
+        # whole bag up front, so big packs cost nothing extra per refill.
+        n = len(self)
+        if not n:
+            return None
+        if not self._left:
+            if len(self._bag) != n:
+                self._bag = array("I", range(n))
+            self._left = n
+        j = self._rng.randrange(self._left)
+        if n > 1 and self._left == n and self._bag[j] == self._last:
+            j = (j + 1 + self._rng.randrange(n - 1)) % n
+        self._left -= 1
+        bag = self._bag
+        bag[j], bag[self._left] = bag[self._left], bag[j]
+        self._last = bag[self._left]
+        return self[self._last]
+
+    def close(self):
+        for p in self.packs:
+            p.close()
@@ -0,0 +1,94 @@
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import matplotlib
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from analytics import content_key
+from charts import draw_dashboard, load_frame
+
+
+# Headless dashboard: the same six panels as charts.run_dashboard, drawn on an
+# Agg canvas and saved to PNG or SVG. Outputs are content-addressed: the file
+# name is a hash of the (day, title) aggregates plus everything that affects
+# the drawing, so an unchanged dataset is a cache hit without any rendering.
+RENDER_VERSION = 1
+FORMATS = ("png", "svg")
+FIGSIZE = (14, 10)
+DEFAULT_DPI = 100
+
+
+def default_cache_dir() -> Path:
+    return Path(os.environ.get("CONCENTRIA_RENDER_CACHE", Path.home() / ".cache" / "concentria" / "renders"))
+
+
+def render_key(df: pd.DataFrame, fmt: str, dpi: int) -> str:
+    # The dashboard only depends on the aggregates (the latest day in the data
+    # is its "today"), so rows are hashed in a fixed order, not file order.
+    h = hashlib.blake2b(content_key(df).encode("ascii"), digest_size=16)
+    h.update(f"{RENDER_VERSION} {matplotlib.__version__} {fmt} {dpi} {FIGSIZE}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def render_dashboard(path: str, fmt: str = "png", dpi: int = DEFAULT_DPI, cache_dir=None):
+    # (output path, cache hit) for one data file.
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'; expected one of {', '.join(FORMATS)}.")
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    df = load_frame(path)
+    out = cache_dir / f"{render_key(df, fmt, dpi)}.{fmt}"
+    if out.exists():
+        return out, True
+
+    # A bare Figure on an Agg canvas, not pyplot: no GUI backend whatever
+    # pyplot is set to, and nothing global to close afterwards.
+    fig = Figure(figsize=FIGSIZE, facecolor="#121212")
+    FigureCanvasAgg(fig)
+    draw_dashboard(df, fig)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + f".{os.getpid()}.tmp")
+    # No timestamp in the SVG, so the same key always means the same bytes.
+    metadata = {"Date": None} if fmt == "svg" else None
+    fig.savefig(tmp, format=fmt, dpi=dpi, facecolor=fig.get_facecolor(), metadata=metadata)
+    os.replace(tmp, out)
+    return out, False
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Render the Concentria dashboard to image files without a display.")
+    ap.add_argument("paths", nargs="+", help="CSV or SQLite data files")
+    ap.add_argument("--format", dest="formats", nargs="+", choices=FORMATS, default=["png"])
+    ap.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    ap.add_argument("--out", help="copy each report here as <data file name>.<format>")
+    ap.add_argument("--cache-dir", help="render cache (default: $CONCENTRIA_RENDER_CACHE or ~/.cache/concentria/renders)")
+    args = ap.parse_args(argv)
+
+    failed = 0
+    for path in args.paths:
+        for fmt in args.formats:
+            t = time.perf_counter()
+            try:
+                cached, hit = render_dashboard(path, fmt, args.dpi, args.cache_dir)
+                target = cached
+                if args.out:
+                    Path(args.out).mkdir(parents=True, exist_ok=True)
+                    target = Path(args.out) / f"{Path(path).name}.{fmt}"
+                    shutil.copyfile(cached, target)
+            except Exception as e:
+                failed += 1
+                print(f"{path}: {e}", file=sys.stderr)
+                continue
+            state = "cached" if hit else "rendered"
+            print(f"{target}  ({state}, {(time.perf_counter() - t) * 1000:.0f} ms)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import csv
+import os
+
+
+# One row per (day ordinal, title): minutes, session count and hardness
+# sum/count. The file starts with a line naming the size and mtime of the data
+# file it was built from, so a stale rollup is never mistaken for a fresh one.
+ROLLUP_SUFFIX = ".rollup"
+ROLLUP_MAGIC = "# concentria-rollup v2"
+ROLLUP_COLUMNS = ["day", "title", "minutes", "sessions", "hsum", "hcount"]
+
+
+def rollup_path(data_path: str) -> str:
+    return data_path + ROLLUP_SUFFIX
+
+
+def source_identity(data_path: str) -> str:
+    st = os.stat(data_path)
+    return f"{st.st_size} {st.st_mtime_ns}"
+
+
+def read_identity(f) -> str:
+    # Identity recorded in an open rollup file, or None if it is not one.
+    line = f.readline()
+    if not line.startswith(ROLLUP_MAGIC + " "):
+        return None
+    return line[len(ROLLUP_MAGIC) + 1:].strip()
+
+
+def write_rollups(data_path: str, rows, identity: str = None):
+    # rows: (day, title, minutes, sessions, hsum, hcount) tuples. identity must
+    # be taken before the data file was read, or the rollup could claim changes
+    # it never saw.
+    identity = identity or source_identity(data_path)
+    path = rollup_path(data_path)
+    # Per-process name: the app, the analytics worker, the dashboard and the
+    # render CLI may all rebuild this file at once.
+    tmp = path + f".{os.getpid()}.tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        f.write(f"{ROLLUP_MAGIC} {identity}\n")
+        writer = csv.writer(f)
+        writer.writerow(ROLLUP_COLUMNS)
+        writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+def index_rows(index):
+    # Rollup rows from an EntryIndex, which keeps them up to date on every add
+    # and remove.
+    for (day, title), agg in index.rollups.items():
+        yield day, title, agg.minutes, agg.count, agg.hsum, agg.hcount
@@ -0,0 +1,96 @@
+import re
+from bisect import bisect_left, insort
+
+
+_TOKEN = re.compile(r"\w+")
+MIN_PREFIX = 2
+
+
+def tokenize(text: str):
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def _entry_tokens(e) -> set:
+    return set(tokenize(e.title)) | set(tokenize(e.note))
+
+
+class SearchIndex:
+    # Inverted index from title/note tokens to entry ids. The vocabulary is kept
+    # sorted so the last query term can match as a prefix while typing.
+
+    def __init__(self, entries=()):
+        self.postings = {}
+        self._vocab = []
+        for e in entries:
+            self.add(e)
+
+    def __len__(self):
+        return len(self.postings)
+
+    def add(self, e):
+        for tok in _entry_tokens(e):
+            ids = self.postings.get(tok)
+            if ids is None:
+                ids = self.postings[tok] = set()
+                insort(self._vocab, tok)
+            ids.add(e.id)
+
+    def remove(self, e):
+        for tok in _entry_tokens(e):
+            ids = self.postings.get(tok)
+            if ids is None:
+                continue
+            ids.discard(e.id)
+            if not ids:
+                del self.postings[tok]
+                del self._vocab[bisect_left(self._vocab, tok)]
+
+    def clear(self):
+        self.postings.clear()
+        self._vocab.clear()
+
+    def _prefix_ids(self, prefix: str):
+        exact = self.postings.get(prefix)
+        if len(prefix) < MIN_PREFIX:
+            return [exact] if exact else []
+        found = []
+        i = bisect_left(self._vocab, prefix)
+        vocab = self._vocab
+        while i < len(vocab) and vocab[i].startswith(prefix):
+            found.append(self.postings[vocab[i]])
+            i += 1
+        return found
+
+    def query(self, text: str) -> set:
+        # Every term must match; all but the last exactly, the last as a prefix
+        # once it is MIN_PREFIX characters long.
+        terms = tokenize(text)
+        if not terms:
+            return set()
+        groups = []
+        for term in terms[:-1]:
+            ids = self.postings.get(term)
+            if not ids:
+                return set()
+            groups.append([ids])
+        last = self._prefix_ids(terms[-1])
+        if not last:
+            return set()
+        groups.append(last)
+        sets = [g[0] if len(g) == 1 else set().union(*g) for g in groups]
+        if len(sets) == 1:
+            return set(sets[0])
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+    def matches(self, e, text: str) -> bool:
+        terms = tokenize(text)
+        if not terms:
+            return False
+        tokens = _entry_tokens(e)
+        if not all(t in tokens for t in terms[:-1]):
+            return False
+        last = terms[-1]
+        if len(last) < MIN_PREFIX:
+            return last in tokens
+        return any(t.startswith(last) for t in tokens)
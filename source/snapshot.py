@@ -0,0 +1,383 @@
+import hashlib
+import io
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from dateutil import parser
+
+from rollups import ROLLUP_COLUMNS, read_identity, rollup_path, source_identity, write_rollups
+from storage import SQLITE_DAILY_TITLE_SQL, SQLITE_ROLLUP_SQL, SQLITE_SESSIONS_SQL, connect_sqlite_readonly, is_sqlite_path
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_ARROW = True
+except ImportError:
+    HAVE_ARROW = False
+
+
+CACHE_VERSION = 2
+DATE_FORMAT = "%d-%m-%y"
+EPOCH_ORDINAL = 719163
+DASHBOARD_COLUMNS = ["date", "clock", "title", "duration", "hardness", "note"]
+_CHUNK = 1 << 20
+
+
+def cache_paths(csv_path: str):
+    base = f"{csv_path}.cache"
+    return base + (".parquet" if HAVE_ARROW else ".pkl"), base + ".json"
+
+
+def _file_identity(path: str) -> dict:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _hash_file(path: str, length: int):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(_CHUNK, remaining))
+            if not chunk:
+                break
+            h.update(chunk)
+            remaining -= len(chunk)
+    return h
+
+
+def _read_raw(src, names=None) -> pd.DataFrame:
+    if names is None:
+        return pd.read_csv(src, dtype=str, encoding="utf-8")
+    return pd.read_csv(src, dtype=str, encoding="utf-8", header=None, names=names)
+
+
+def _typed(raw: pd.DataFrame) -> pd.DataFrame:
+    df = raw
+    for col in ("duration", "hardness"):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    if "date" in df.columns:
+        parsed = dateutil_years(pd.to_datetime(df["date"], format=DATE_FORMAT, errors="coerce"))
+        df["date_parsed"] = parsed
+        df["day_ord"] = (parsed.dt.normalize() - pd.Timestamp("1970-01-01")).dt.days.add(719163).astype("Int32")
+    if "title" in df.columns:
+        df["title"] = df["title"].astype("category")
+    return df
+
+
+def _read_cache(data_path: str, columns=None) -> pd.DataFrame:
+    if HAVE_ARROW:
+        return pd.read_parquet(data_path, columns=columns)
+    df = pd.read_pickle(data_path)
+    return df[columns] if columns is not None else df
+
+
+def _select(df: pd.DataFrame, columns):
+    if columns is None:
+        return df
+    return df[[c for c in columns if c in df.columns]]
+
+
+def _write_cache(df: pd.DataFrame, meta: dict, data_path: str, meta_path: str):
+    # Per-process temp names, as several processes may refresh the cache at once.
+    tmp = data_path + f".{os.getpid()}.tmp"
+    if HAVE_ARROW:
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, data_path)
+    tmp = meta_path + f".{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+
+
+def _load_meta(meta_path: str):
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == CACHE_VERSION else None
+
+
+def _ends_with_newline(path: str, size: int) -> bool:
+    if size == 0:
+        return False
+    with open(path, "rb") as f:
+        f.seek(size - 1)
+        return f.read(1) == b"\n"
+
+
+def load_sessions(csv_path: str, columns=None) -> pd.DataFrame:
+    # Typed session frame for csv_path, served from a columnar cache next to it.
+    # The cache is keyed on size, mtime and content hash; when the CSV only grew,
+    # just the appended tail is parsed and added to the cached frame.
+    data_path, meta_path = cache_paths(csv_path)
+    ident = _file_identity(csv_path)
+    meta = _load_meta(meta_path)
+
+    if meta is not None and meta["size"] == ident["size"] and meta["mtime_ns"] == ident["mtime_ns"]:
+        try:
+            wanted = None if columns is None else [c for c in columns if c in meta["stored"]]
+            return _read_cache(data_path, wanted)
+        except Exception:
+            meta = None
+
+    cached = None
+    if meta is not None and os.path.exists(data_path):
+        try:
+            cached = _read_cache(data_path)
+        except Exception:
+            cached = None
+
+    if cached is not None:
+        old_size = meta["size"]
+        if ident["size"] >= old_size and _ends_with_newline(csv_path, old_size):
+            h = _hash_file(csv_path, old_size)
+            if h.hexdigest() == meta["hash"]:
+                if ident["size"] > old_size:
+                    with open(csv_path, "rb") as f:
+                        f.seek(old_size)
+                        tail = f.read(ident["size"] - old_size)
+                    h.update(tail)
+                    tail_df = _typed(_read_raw(io.BytesIO(tail), names=meta["columns"]))
+                    cached = pd.concat([cached, tail_df], ignore_index=True)
+                    if "title" in cached.columns:
+                        cached["title"] = cached["title"].astype("category")
+                meta.update(ident, hash=h.hexdigest())
+                try:
+                    _write_cache(cached, meta, data_path, meta_path)
+                except Exception:
+                    pass
+                return _select(cached, columns)
+
+    df = _typed(_read_raw(csv_path))
+    source_columns = [c for c in df.columns if c not in ("date_parsed", "day_ord")]
+    meta = {"version": CACHE_VERSION, **ident, "hash": _hash_file(csv_path, ident["size"]).hexdigest(),
+            "columns": source_columns, "stored": list(df.columns)}
+    try:
+        _write_cache(df, meta, data_path, meta_path)
+    except Exception:
+        pass
+    return _select(df, columns)
+
+
+def rollup_sessions(df: pd.DataFrame) -> pd.DataFrame:
+    # (day, title) rollup of a session frame with date/date_parsed, title,
+    # duration and hardness, using the app's rules: minutes are whole and never
+    # negative, hardness only counts inside 1..10.
+    missing = {"date", "title", "duration"} - set(df.columns)
+    if missing:
+        raise ValueError(f"CSV missing required columns: {', '.join(sorted(missing))}")
+    dates = df["date_parsed"] if "date_parsed" in df.columns else pd.Series(pd.NaT, index=df.index)
+    retry = dates.isna()
+    if retry.any():
+        dates = dates.copy()
+        dates[retry] = pd.to_datetime(df.loc[retry, "date"], dayfirst=True, errors="coerce")
+    minutes = pd.to_numeric(df["duration"], errors="coerce").replace([np.inf, -np.inf], np.nan)
+    hard = pd.to_numeric(df["hardness"], errors="coerce") if "hardness" in df.columns else pd.Series(np.nan, index=df.index)
+    frame = pd.DataFrame({
+        "day": (dates.dt.normalize() - pd.Timestamp("1970-01-01")).dt.days + EPOCH_ORDINAL,
+        "title": df["title"].astype(object).fillna(""),
+        "minutes": np.trunc(minutes.fillna(0)).clip(lower=0).astype("int64"),
+        "hard": hard.where((hard >= 1) & (hard <= 10)),
+    }).dropna(subset=["day"])
+    out = (
+        frame.groupby(["day", "title"], sort=False)
+        .agg(minutes=("minutes", "sum"), sessions=("minutes", "size"), hsum=("hard", "sum"), hcount=("hard", "count"))
+        .reset_index()
+    )
+    out["day"] = out["day"].astype("int64")
+    return out[ROLLUP_COLUMNS]
+
+
+def _read_rollup_file(data_path: str, identity: str):
+    try:
+        with open(rollup_path(data_path), "r", encoding="utf-8", newline="") as f:
+            if read_identity(f) != identity:
+                return None
+            return pd.read_csv(f, dtype={"title": str}, keep_default_na=False)
+    except (OSError, ValueError):
+        return None
+
+
+def _sqlite_rollups(db_path: str) -> pd.DataFrame:
+    conn = connect_sqlite_readonly(db_path)
+    try:
+        has_table = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_title'").fetchone()
+        return pd.read_sql_query(SQLITE_ROLLUP_SQL if has_table else SQLITE_DAILY_TITLE_SQL, conn)
+    finally:
+        conn.close()
+
+
+def read_rollups(path: str) -> pd.DataFrame:
+    # Materialized (day, title) rollup for a CSV or SQLite data file, in
+    # ROLLUP_COLUMNS with day as the date ordinal. SQLite keeps it in a
+    # trigger-maintained table; for CSV it is the file the app writes next to
+    # the data, rebuilt from the session snapshot when it is missing or stale.
+    if is_sqlite_path(path):
+        return _sqlite_rollups(path)
+    identity = source_identity(path)
+    df = _read_rollup_file(path, identity)
+    if df is None:
+        df = rollup_sessions(load_sessions(path, columns=["date", "title", "duration", "hardness", "date_parsed"]))
+        try:
+            write_rollups(path, df.itertuples(index=False, name=None), identity)
+        except OSError:
+            pass
+    return df
+
+
+def load_rollups(path: str) -> pd.DataFrame:
+    # read_rollups with day as a Timestamp and day_ord as the date ordinal.
+    return with_days(read_rollups(path))
+
+
+def with_days(rollup: pd.DataFrame) -> pd.DataFrame:
+    # Ordinal day column -> day_ord, plus day as a Timestamp.
+    df = rollup.rename(columns={"day": "day_ord"})
+    df["day"] = pd.to_datetime(df["day_ord"] - EPOCH_ORDINAL, unit="D")
+    df["title"] = df["title"].astype(object)
+    return df
+
+
+def _dateutil_date(v):
+    try:
+        return pd.Timestamp(parser.parse(str(v), dayfirst=True).date())
+    except Exception:
+        return pd.NaT
+
+
+def dateutil_years(parsed: pd.Series) -> pd.Series:
+    # Dates parsed with DATE_FORMAT get strptime's 1969 pivot for two-digit
+    # years; this moves them to dateutil's window (within 50 years of now),
+    # storage.window_year for a whole column.
+    ok = parsed.notna()
+    if not ok.any():
+        return parsed
+    parsed = parsed.copy()
+    now = time.localtime().tm_year
+    year = parsed.dt.year
+    want = now // 100 * 100 + year % 100
+    want = want.where(want < now + 50, want - 100)
+    want = want.where(want >= now - 50, want + 100)
+    shift = (want - year)[ok]
+    for years in shift[shift != 0].unique():
+        moved = ok & (want - year == years)
+        parsed[moved] = parsed[moved] + pd.DateOffset(years=int(years))
+    return parsed
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    # Same dates as dateutil's parse(str(v), dayfirst=True), but DD-MM-YY is
+    # parsed in one vectorized pass and only what that format rejects goes
+    # through dateutil.
+    parsed = dateutil_years(pd.to_datetime(values, format=DATE_FORMAT, errors="coerce"))
+    ok = parsed.notna()
+    rest = ~ok & values.notna()
+    if rest.any():
+        parsed[rest] = values[rest].map(_dateutil_date)
+    return parsed
+
+
+def combine_clock(dates: pd.Series, clocks: pd.Series) -> pd.Series:
+    # dates plus the HH:MM in clocks. Plain HH:MM is added as a timedelta in
+    # one pass; any other non-empty clock goes through pd.to_datetime per row,
+    # and a clock that does not parse leaves the date at midnight.
+    out = dates.copy()
+    text = clocks.where(clocks.notna(), "").astype(str)
+    hm = text.str.extract(r"^(\d{1,2}):(\d{2})$")
+    hours = pd.to_numeric(hm[0], errors="coerce")
+    minutes = pd.to_numeric(hm[1], errors="coerce")
+    fast = (hours < 24) & (minutes < 60)
+    if fast.any():
+        out[fast] = dates[fast] + pd.to_timedelta(hours[fast] * 60 + minutes[fast], unit="min")
+    slow = ~fast & (text.str.strip() != "")
+    if slow.any():
+        out[slow] = [_with_clock(d, c) for d, c in zip(dates[slow], text[slow])]
+    return out
+
+
+def _with_clock(day, clock: str):
+    # A "clock" that dateutil reads as a timezone (e.g. a stray date) would
+    # turn the whole column into objects; such rows keep the bare date.
+    try:
+        ts = pd.to_datetime(f"{day.date().isoformat()} {clock}")
+    except Exception:
+        return day
+    return day if pd.isna(ts) or ts.tz is not None else ts
+
+
+def load_dashboard_data(path: str) -> pd.DataFrame:
+    # Typed sessions for the Streamlit dashboard, with date_parsed, date_time
+    # and hour. Empty (with the expected columns) if the file is missing or
+    # unreadable.
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=DASHBOARD_COLUMNS)
+    try:
+        df = read_sessions(path)
+    except Exception:
+        return pd.DataFrame(columns=DASHBOARD_COLUMNS)
+    return dashboard_frame(df)
+
+
+def read_sessions(path: str) -> pd.DataFrame:
+    # Session rows of a CSV snapshot (through the columnar cache) or SQLite
+    # database, before dashboard_frame.
+    if not is_sqlite_path(path):
+        return load_sessions(path)
+    conn = connect_sqlite_readonly(path)
+    try:
+        return pd.read_sql_query(SQLITE_SESSIONS_SQL, conn)
+    finally:
+        conn.close()
+
+
+def parse_session_rows(raw: pd.DataFrame) -> pd.DataFrame:
+    # dashboard_frame of string columns as they appear in the CSV (rows
+    # appended to a snapshot, journal records).
+    return dashboard_frame(_typed(raw))
+
+
+def dashboard_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # Dashboard columns for session rows; rows without a usable date are
+    # dropped.
+    if "title" in df.columns:
+        df["title"] = df["title"].astype(object)
+
+    if "date" not in df.columns:
+        df["date"] = pd.NA
+
+    if "date_parsed" in df.columns:
+        # date_parsed from _typed already has dateutil's two-digit years; only
+        # what DATE_FORMAT rejected is left for parse_dates.
+        retry = df["date_parsed"].isna() & df["date"].notna()
+        if retry.any():
+            df.loc[retry, "date_parsed"] = parse_dates(df.loc[retry, "date"])
+    else:
+        df["date_parsed"] = parse_dates(df["date"])
+
+    df = df.dropna(subset=["date_parsed"]).copy()
+
+    if df.empty:
+        return pd.DataFrame(columns=DASHBOARD_COLUMNS)
+
+    if "clock" in df.columns:
+        df["date_time"] = combine_clock(df["date_parsed"], df["clock"])
+    else:
+        df["date_time"] = df["date_parsed"]
+
+    df["duration"] = pd.to_numeric(df.get("duration", 0), errors="coerce").fillna(0).astype(int)
+    df["hardness"] = pd.to_numeric(df.get("hardness", 0), errors="coerce").fillna(0).astype(int)
+
+    df["date"] = df["date_parsed"].dt.date
+    df["hour"] = df["date_time"].dt.hour.fillna(0).astype(int)
+
+    if "title" not in df.columns:
+        df["title"] = "untitled"
+
+    return df
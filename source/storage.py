@@ -0,0 +1,744 @@
+import csv
+import hashlib
+import io
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+JOURNAL_SUFFIX = ".journal"
+COMPACTING_SUFFIX = ".compacting"
+COMPACTED_SUFFIX = ".compacted"
+COMPACT_THRESHOLD_BYTES = 256 * 1024
+RETRY_MIN_S = 0.25
+RETRY_MAX_S = 10.0
+
+OP_ADD = "add"
+OP_DEL = "del"
+OP_RESET = "reset"
+
+log = logging.getLogger("concentria.storage")
+
+
+def window_year(year: int) -> int:
+    # dateutil's century for a two-digit year: the one within 50 years of now.
+    now = time.localtime().tm_year
+    year = now // 100 * 100 + year % 100
+    if year >= now + 50:
+        return year - 100
+    if year < now - 50:
+        return year + 100
+    return year
+
+
+def day_ordinal(date_key: str):
+    # Two-digit years follow window_year, not strptime's 1969 pivot, so the
+    # rollups agree with the dashboard's dateutil dates (snapshot.dateutil_years).
+    try:
+        d = datetime.strptime(date_key, "%d-%m-%y")
+    except (TypeError, ValueError):
+        return None
+    year = window_year(d.year)
+    try:
+        d = d.replace(year=year)
+    except ValueError:
+        # 29 February moved to a non-leap year becomes the 28th, as pandas does.
+        d = d.replace(year=year, day=28)
+    return d.toordinal()
+
+
+def parse_minutes(s) -> int:
+    try:
+        return max(0, int(float(str(s).strip())))
+    except Exception:
+        return 0
+
+
+def parse_hardness(s):
+    try:
+        h = float(str(s).strip())
+    except Exception:
+        return None
+    return h if 1.0 <= h <= 10.0 else None
+
+
+def clean_row(row: dict, fields) -> dict:
+    return {k: (row.get(k, "") or "").strip() for k in fields}
+
+
+def _same_entry(a: dict, b: dict, fields) -> bool:
+    return all(a.get(k, "") == b.get(k, "") for k in fields if k != "id")
+
+
+def _iter_csv(f, fields):
+    for row in csv.DictReader(f):
+        if row:
+            yield clean_row(row, fields)
+
+
+def read_rows(path: str, fields) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return list(_iter_csv(f, fields))
+
+
+def write_text_atomic(path: str, text: str):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def write_rows_atomic(path: str, fields, rows):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for r in rows:
+            writer.writerow(r)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def compaction_marker(snapshot_path: str, compacting_path: str) -> str:
+    # What the compacted marker records: the rotated journal's size and the
+    # size and hash of the snapshot it was folded into.
+    return f"{os.path.getsize(compacting_path)} {os.path.getsize(snapshot_path)} {file_digest(snapshot_path)}"
+
+
+def rotated_journal_folded(path: str) -> bool:
+    # True if path's rotated journal is already part of the snapshot: a
+    # compaction published the snapshot but did not get to remove the
+    # journal. The marker is written just before the snapshot is replaced
+    # and names the new snapshot by content, so a crash on either side of
+    # the replace is told apart without relying on mtimes, which some
+    # filesystems only keep to the second or two.
+    compacting = path + JOURNAL_SUFFIX + COMPACTING_SUFFIX
+    try:
+        with open(path + COMPACTED_SUFFIX, "r", encoding="utf-8") as f:
+            marker = f.read().strip()
+        return marker == compaction_marker(path, compacting)
+    except OSError:
+        return False
+
+
+def replay_journal(rows: list, journal_path: str, fields) -> list:
+    if not os.path.exists(journal_path):
+        return rows
+    removed = set()
+    with open(journal_path, "r", newline="", encoding="utf-8") as f:
+        for rec in csv.DictReader(f):
+            if not rec:
+                continue
+            op = (rec.get("op") or "").strip()
+            entry = clean_row(rec, fields)
+            if op == OP_ADD:
+                rows.append(entry)
+            elif op == OP_DEL and entry.get("id"):
+                removed.add(entry["id"])
+            elif op == OP_DEL:
+                for i, e in enumerate(rows):
+                    if e.get("id", "") not in removed and _same_entry(e, entry, fields):
+                        del rows[i]
+                        break
+    if removed:
+        rows = [r for r in rows if r.get("id", "") not in removed]
+    return rows
+
+
+def read_journal(path: str, fields) -> list:
+    # (op, entry) records of a journal; [] if there is none.
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return [((rec.get("op") or "").strip(), clean_row(rec, fields)) for rec in csv.DictReader(f) if rec]
+
+
+def replay_rows(rows, journals, fields):
+    # replay_journal over each journal in turn, for a stream: rows (the
+    # snapshot) are yielded as they are read, journal adds after them. The
+    # journals are read up front; they are small next to the snapshot. A
+    # removal by id drops every row with that id that existed when its
+    # journal ended; one without an id drops the first row that existed at
+    # that point and was not already removed.
+    ops, dels = [], {}
+    for records in journals:
+        end = len(ops) + len(records)
+        for op, entry in records:
+            if op == OP_DEL and entry.get("id"):
+                dels.setdefault(entry["id"], []).append((len(ops), end))
+            ops.append((op, entry))
+    pending = [(seq, entry) for seq, (op, entry) in enumerate(ops) if op == OP_DEL and not entry.get("id")]
+
+    def gone(row, born, before=None):
+        return any(end > born and (before is None or seq < before) for seq, end in dels.get(row.get("id", ""), ()))
+
+    def kept(row, born):
+        for k, (seq, entry) in enumerate(pending):
+            if seq > born and not gone(row, born, seq) and _same_entry(row, entry, fields):
+                del pending[k]
+                return False
+        return not gone(row, born)
+
+    for row in rows:
+        if kept(row, -1):
+            yield row
+    for seq, (op, entry) in enumerate(ops):
+        if op == OP_ADD and kept(entry, seq):
+            yield entry
+
+
+class SessionStore:
+    # Common interface for the app's persistence backends.
+
+    path = ""
+
+    def load(self) -> list:
+        raise NotImplementedError
+
+    def iter_rows(self):
+        # load() one row at a time.
+        yield from self.load()
+
+    def add(self, entry: dict):
+        raise NotImplementedError
+
+    def remove(self, entry: dict):
+        raise NotImplementedError
+
+    def reset(self, rows=()):
+        raise NotImplementedError
+
+    def apply(self, ops):
+        for op, payload in ops:
+            if op == OP_ADD:
+                self.add(payload)
+            elif op == OP_DEL:
+                self.remove(payload)
+            elif op == OP_RESET:
+                self.reset(payload)
+
+    def has_data(self) -> bool:
+        return os.path.exists(self.path)
+
+    def compact(self, wait: bool = True):
+        pass
+
+    def close(self):
+        pass
+
+
+class JournalStore(SessionStore):
+    # items.csv is the snapshot; adds and removals are appended to
+    # items.csv.journal and folded back into the snapshot in the background.
+
+    def __init__(self, path: str, fields, compact_threshold: int = COMPACT_THRESHOLD_BYTES):
+        self.path = path
+        self.fields = list(fields)
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.compacting_path = self.journal_path + COMPACTING_SUFFIX
+        self.marker_path = path + COMPACTED_SUFFIX
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._generation = 0
+        self._compactor = None
+
+    def load(self) -> list:
+        return list(self.iter_rows())
+
+    def iter_rows(self):
+        # The snapshot's text and the journals are read under the lock, so a
+        # compaction or reset meanwhile cannot mix two states; rows are then
+        # parsed as the caller consumes them. The file is not held open while
+        # that happens: on Windows it would make compaction's os.replace fail.
+        with self._lock:
+            self._finish_interrupted_compaction()
+            try:
+                with open(self.path, "r", newline="", encoding="utf-8") as f:
+                    text = f.read()
+            except FileNotFoundError:
+                text = ""
+            journals = [read_journal(p, self.fields) for p in (self.compacting_path, self.journal_path)]
+        yield from replay_rows(_iter_csv(io.StringIO(text, newline=""), self.fields), journals, self.fields)
+
+    def add(self, entry: dict):
+        self._append([(OP_ADD, entry)])
+
+    def remove(self, entry: dict):
+        self._append([(OP_DEL, entry)])
+
+    def apply(self, ops):
+        records = []
+        for op, payload in ops:
+            if op == OP_RESET:
+                records = []
+                self.reset(payload)
+            else:
+                records.append((op, payload))
+        if records:
+            self._append(records)
+
+    def reset(self, rows=()):
+        with self._lock:
+            self._generation += 1
+            write_rows_atomic(self.path, self.fields, rows)
+            for p in (self.journal_path, self.compacting_path, self.marker_path):
+                if os.path.exists(p):
+                    os.remove(p)
+
+    def has_data(self) -> bool:
+        return os.path.exists(self.path) or self.journal_size() > 0
+
+    def journal_size(self) -> int:
+        try:
+            return os.path.getsize(self.journal_path)
+        except OSError:
+            return 0
+
+    def compact(self, wait: bool = True):
+        with self._lock:
+            if self._compactor is None or not self._compactor.is_alive():
+                if not os.path.exists(self.journal_path) and not os.path.exists(self.compacting_path):
+                    return
+                self._compactor = threading.Thread(target=self._compact, name="journal-compactor", daemon=True)
+                self._compactor.start()
+            worker = self._compactor
+        if wait:
+            worker.join()
+            if os.path.exists(self.journal_path):
+                self._compact()
+
+    def close(self):
+        if self.journal_size() > 0 or os.path.exists(self.compacting_path):
+            self.compact(wait=True)
+
+    def _append(self, records):
+        with self._lock:
+            new_file = not os.path.exists(self.journal_path)
+            if not new_file:
+                self._drop_torn_record()
+            with open(self.journal_path, "a", newline="", encoding="utf-8") as f:
+                start = f.tell()
+                try:
+                    writer = csv.DictWriter(f, fieldnames=["op"] + self.fields, extrasaction="ignore")
+                    if new_file:
+                        writer.writeheader()
+                    for op, entry in records:
+                        writer.writerow({"op": op, **{k: entry.get(k, "") for k in self.fields}})
+                    f.flush()
+                    os.fsync(f.fileno())
+                except BaseException:
+                    # All or nothing, so the writer can retry the batch
+                    # without the records that did land applying twice.
+                    try:
+                        f.truncate(start)
+                    except OSError:
+                        pass
+                    raise
+                size = f.tell()
+        if size >= self.compact_threshold:
+            self.compact(wait=False)
+
+    def _drop_torn_record(self):
+        # Records end with the csv module's \r\n; notes only ever contain \n.
+        # A crash mid-append leaves a partial tail that is cut off here.
+        with open(self.journal_path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size < 2:
+                return
+            f.seek(size - 2)
+            if f.read(2) == b"\r\n":
+                return
+            f.seek(max(0, size - 65536))
+            tail = f.read()
+            cut = tail.rfind(b"\r\n")
+            f.truncate(size - len(tail) + cut + 2 if cut >= 0 else 0)
+
+    def _finish_interrupted_compaction(self):
+        # A crash between publishing the new snapshot and unlinking the rotated
+        # journal leaves a marker naming that snapshot: the journal is already
+        # folded in. A marker for a snapshot that never got published is stale.
+        if not os.path.exists(self.marker_path):
+            return
+        if rotated_journal_folded(self.path):
+            os.remove(self.compacting_path)
+        os.remove(self.marker_path)
+
+    def _compact(self):
+        with self._lock:
+            gen = self._generation
+            self._finish_interrupted_compaction()
+            if os.path.exists(self.journal_path):
+                if os.path.exists(self.compacting_path):
+                    with open(self.journal_path, "r", newline="", encoding="utf-8") as src, \
+                            open(self.compacting_path, "a", newline="", encoding="utf-8") as dst:
+                        next(src, None)
+                        for line in src:
+                            dst.write(line)
+                    os.remove(self.journal_path)
+                else:
+                    os.replace(self.journal_path, self.compacting_path)
+            if not os.path.exists(self.compacting_path):
+                return
+        rows = read_rows(self.path, self.fields)
+        rows = replay_journal(rows, self.compacting_path, self.fields)
+        tmp = f"{self.path}.compact.tmp"
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+            f.flush()
+            os.fsync(f.fileno())
+        with self._lock:
+            if gen != self._generation:
+                os.remove(tmp)
+                return
+            marker = compaction_marker(tmp, self.compacting_path)
+            write_text_atomic(self.marker_path, marker)
+            os.replace(tmp, self.path)
+            os.remove(self.compacting_path)
+            os.remove(self.marker_path)
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    day INTEGER,
+    clock TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL DEFAULT '',
+    duration TEXT NOT NULL DEFAULT '',
+    minutes INTEGER NOT NULL DEFAULT 0,
+    note TEXT NOT NULL DEFAULT '',
+    hardness TEXT NOT NULL DEFAULT '',
+    hardness_val REAL,
+    uid TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(date);
+CREATE INDEX IF NOT EXISTS idx_sessions_day ON sessions(day);
+CREATE INDEX IF NOT EXISTS idx_sessions_title ON sessions(title, day);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Materialized (day, title) rollup, kept current by triggers so analytics reads
+# one row per day and title instead of aggregating every session.
+SQLITE_ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_title (
+    day INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    minutes INTEGER NOT NULL DEFAULT 0,
+    sessions INTEGER NOT NULL DEFAULT 0,
+    hsum REAL NOT NULL DEFAULT 0,
+    hcount INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, title)
+);
+CREATE TRIGGER IF NOT EXISTS daily_title_add AFTER INSERT ON sessions WHEN NEW.day IS NOT NULL BEGIN
+    INSERT INTO daily_title(day, title, minutes, sessions, hsum, hcount)
+    VALUES (NEW.day, NEW.title, NEW.minutes, 1, COALESCE(NEW.hardness_val, 0), NEW.hardness_val IS NOT NULL)
+    ON CONFLICT(day, title) DO UPDATE SET
+        minutes = minutes + excluded.minutes, sessions = sessions + 1,
+        hsum = hsum + excluded.hsum, hcount = hcount + excluded.hcount;
+END;
+CREATE TRIGGER IF NOT EXISTS daily_title_del AFTER DELETE ON sessions WHEN OLD.day IS NOT NULL BEGIN
+    UPDATE daily_title SET
+        minutes = minutes - OLD.minutes, sessions = sessions - 1,
+        hsum = hsum - COALESCE(OLD.hardness_val, 0), hcount = hcount - (OLD.hardness_val IS NOT NULL)
+    WHERE day = OLD.day AND title = OLD.title;
+    DELETE FROM daily_title WHERE day = OLD.day AND title = OLD.title AND sessions <= 0;
+END;
+"""
+
+SQLITE_UID_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_uid ON sessions(uid)"
+
+SQLITE_SESSIONS_SQL = "SELECT date, clock, title, duration, note, hardness, COALESCE(uid, '') AS id FROM sessions ORDER BY id"
+
+SQLITE_DAILY_TITLE_SQL = """
+SELECT day, title, SUM(minutes) AS minutes, COUNT(*) AS sessions,
+       COALESCE(SUM(hardness_val), 0) AS hsum, COUNT(hardness_val) AS hcount
+FROM sessions WHERE day IS NOT NULL
+GROUP BY day, title
+"""
+
+SQLITE_ROLLUP_SQL = "SELECT day, title, minutes, sessions, hsum, hcount FROM daily_title"
+
+
+def is_sqlite_path(path) -> bool:
+    return str(path).lower().endswith((".db", ".sqlite", ".sqlite3"))
+
+
+def connect_sqlite_readonly(path: str):
+    # as_uri() percent-encodes the path, so a ?, # or % in it is not read as
+    # part of the URI syntax.
+    return sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+
+
+class SqliteStore(SessionStore):
+
+    def __init__(self, path: str, fields, import_from: str = None):
+        self.path = path
+        self.fields = list(fields)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SQLITE_SCHEMA)
+        if "uid" not in {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}:
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN uid TEXT")
+        self._conn.execute(SQLITE_UID_INDEX)
+        self._ensure_rollup()
+        self._migrate_days()
+        if import_from:
+            self.import_csv(import_from)
+
+    def import_csv(self, csv_path: str) -> int:
+        # One-time import; the marker keeps a later run from duplicating rows.
+        with self._lock:
+            done = self._conn.execute("SELECT value FROM meta WHERE key = 'imported_csv'").fetchone()
+            if done:
+                return 0
+            rows = JournalStore(csv_path, self.fields).load() if os.path.exists(csv_path) else []
+            with self._conn:
+                self._conn.executemany(self._insert_sql(), [self._params(r) for r in rows])
+                self._conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('imported_csv', ?)", (csv_path,))
+            return len(rows)
+
+    def _ensure_rollup(self):
+        # Databases created before the rollup existed are backfilled once.
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_title'").fetchone()
+        with self._conn:
+            self._conn.executescript(SQLITE_ROLLUP_SCHEMA)
+            if not exists:
+                self._conn.execute(f"INSERT INTO daily_title(day, title, minutes, sessions, hsum, hcount) {SQLITE_DAILY_TITLE_SQL}")
+
+    def _migrate_days(self):
+        # Rows stored while day_ordinal used strptime's pivot can be a century
+        # off; they and the rollup are fixed once.
+        if self._conn.execute("SELECT 1 FROM meta WHERE key = 'day_rule'").fetchone():
+            return
+        self._conn.create_function("day_ordinal", 1, day_ordinal, deterministic=True)
+        with self._conn:
+            cur = self._conn.execute("UPDATE sessions SET day = day_ordinal(date) WHERE day IS NOT day_ordinal(date)")
+            if cur.rowcount:
+                self._conn.execute("DELETE FROM daily_title")
+                self._conn.execute(f"INSERT INTO daily_title(day, title, minutes, sessions, hsum, hcount) {SQLITE_DAILY_TITLE_SQL}")
+            self._conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('day_rule', 'window')")
+
+    def has_data(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM sessions LIMIT 1").fetchone() is not None
+
+    def load(self) -> list:
+        with self._lock:
+            cur = self._conn.execute(SQLITE_SESSIONS_SQL)
+            return [dict(zip(self.fields, row)) for row in cur]
+
+    def iter_rows(self):
+        # Streamed from a read-only connection of its own, so the writer is
+        # not held up; WAL gives it one consistent snapshot.
+        conn = connect_sqlite_readonly(self.path)
+        try:
+            for row in conn.execute(SQLITE_SESSIONS_SQL):
+                yield dict(zip(self.fields, row))
+        finally:
+            conn.close()
+
+    def add(self, entry: dict):
+        with self._lock, self._conn:
+            self._conn.execute(self._insert_sql(), self._params(entry))
+
+    def remove(self, entry: dict):
+        with self._lock, self._conn:
+            self._delete(entry)
+
+    def _delete(self, entry: dict):
+        e = clean_row(entry, self.fields)
+        if e.get("id"):
+            self._conn.execute("DELETE FROM sessions WHERE uid = ?", (e["id"],))
+            return
+        self._conn.execute(
+            "DELETE FROM sessions WHERE id = (SELECT id FROM sessions WHERE date = ? AND clock = ? AND title = ? "
+            "AND duration = ? AND note = ? AND hardness = ? ORDER BY id LIMIT 1)",
+            (e["date"], e["clock"], e["title"], e["duration"], e["note"], e["hardness"]),
+        )
+
+    def reset(self, rows=()):
+        with self._lock, self._conn:
+            self._reset(rows)
+
+    def apply(self, ops):
+        with self._lock, self._conn:
+            for op, payload in ops:
+                if op == OP_ADD:
+                    self._conn.execute(self._insert_sql(), self._params(payload))
+                elif op == OP_DEL:
+                    self._delete(payload)
+                elif op == OP_RESET:
+                    self._reset(payload)
+
+    def _reset(self, rows):
+        self._conn.execute("DELETE FROM sessions")
+        self._conn.execute("DELETE FROM daily_title")
+        self._conn.executemany(self._insert_sql(), [self._params(r) for r in rows])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _insert_sql(self) -> str:
+        return ("INSERT INTO sessions(date, day, clock, title, duration, minutes, note, hardness, hardness_val, uid) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+    def _params(self, entry: dict):
+        e = clean_row(entry, self.fields)
+        return (e["date"], day_ordinal(e["date"]), e["clock"], e["title"], e["duration"],
+                parse_minutes(e["duration"]), e["note"], e["hardness"], parse_hardness(e["hardness"]), e.get("id") or None)
+
+
+class BackgroundWriter:
+    # Owns all writes to a SessionStore. The UI thread only enqueues; the writer
+    # thread merges whatever arrives within coalesce_ms into one store.apply().
+    # A batch that fails to save is kept and put in front of the next one,
+    # retried on its own with a growing delay if nothing else comes in.
+
+    def __init__(self, store: SessionStore, coalesce_ms: int = 50):
+        self.store = store
+        self.coalesce_s = coalesce_ms / 1000.0
+        self.stats = {"batches": 0, "ops": 0, "last_write_ms": 0.0, "max_write_ms": 0.0, "max_submit_ms": 0.0}
+        self._queue = queue.Queue()
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._errors = []
+        self._failed = []
+        self._retry_s = 0.0
+        self._thread = threading.Thread(target=self._run, name="concentria-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, entry: dict):
+        self._submit(OP_ADD, entry)
+
+    def remove(self, entry: dict):
+        self._submit(OP_DEL, entry)
+
+    def remove_many(self, entries):
+        self._submit_many([(OP_DEL, e) for e in entries])
+
+    def reset(self, rows=()):
+        self._submit(OP_RESET, list(rows))
+
+    def flush(self, timeout=None) -> bool:
+        # Waits for every queued op to be tried once; a batch held back by a
+        # failed write is not waited for, or a full disk would hang the caller.
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def take_errors(self) -> list:
+        with self._cond:
+            errors, self._errors = self._errors, []
+        return errors
+
+    def close(self, timeout=None):
+        self.flush(timeout)
+        self._queue.put(None)
+        self._thread.join(timeout)
+        s = self.stats
+        log.info("writer closed: %d change(s) in %d write(s), max write %.1f ms, max UI enqueue %.3f ms",
+                 s["ops"], s["batches"], s["max_write_ms"], s["max_submit_ms"])
+
+    def _submit(self, op: str, payload):
+        t0 = time.perf_counter()
+        with self._cond:
+            self._pending += 1
+        self._queue.put((op, payload, t0))
+        submit_ms = (time.perf_counter() - t0) * 1000.0
+        if submit_ms > self.stats["max_submit_ms"]:
+            self.stats["max_submit_ms"] = submit_ms
+
+    def _submit_many(self, ops):
+        # Enqueued back to back so the writer picks them up as one batch.
+        t0 = time.perf_counter()
+        with self._cond:
+            self._pending += len(ops)
+        for op, payload in ops:
+            self._queue.put((op, payload, t0))
+        submit_ms = (time.perf_counter() - t0) * 1000.0
+        if submit_ms > self.stats["max_submit_ms"]:
+            self.stats["max_submit_ms"] = submit_ms
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self._retry_s) if self._failed else self._queue.get()
+            except queue.Empty:
+                self._write([])
+                continue
+            if item is None:
+                if self._failed:
+                    self._write([])
+                if self._failed:
+                    log.error("closing with %d unsaved op(s)", len(self._failed))
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.coalesce_s
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    nxt = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch):
+        ops = self._failed + [(op, payload) for op, payload, _ in batch]
+        last_reset = max((i for i, (op, _) in enumerate(ops) if op == OP_RESET), default=0)
+        ops = ops[last_reset:]
+        t0 = time.perf_counter()
+        try:
+            self.store.apply(ops)
+            if self._failed:
+                log.info("saved %d change(s) held back by a failed write", len(self._failed))
+            self._failed, self._retry_s = [], 0.0
+        except Exception as e:
+            log.exception("save failed; retrying %d op(s)", len(ops))
+            if not self._failed:
+                # Reported once per run of failures, not on every retry.
+                with self._cond:
+                    self._errors.append(e)
+            self._failed = ops
+            self._retry_s = min(RETRY_MAX_S, max(RETRY_MIN_S, 2 * self._retry_s))
+        write_ms = (time.perf_counter() - t0) * 1000.0
+        queued_ms = (t0 - batch[0][2]) * 1000.0 if batch else 0.0
+        s = self.stats
+        s["batches"] += 1
+        s["ops"] += len(batch)
+        s["last_write_ms"] = write_ms
+        s["max_write_ms"] = max(s["max_write_ms"], write_ms)
+        log.info("saved %d change(s) as %d op(s) in %.1f ms (oldest queued %.1f ms)", len(batch), len(ops), write_ms, queued_ms)
+        with self._cond:
+            self._pending -= len(batch)
+            self._cond.notify_all()
@@ -0,0 +1,122 @@
+# Streaks over day ordinals (date.toordinal(), the same numbers EntryIndex and
+# the rollups use). The NumPy functions are for the analytics views; numpy is
+# imported on first use so the Tk app can keep a StreakTracker without loading
+# the analytics stack.
+
+
+def runs(days):
+    # (starts, lengths) of the runs of consecutive days in days, in day order.
+    # Duplicates are fine.
+    import numpy as np
+    d = np.unique(np.asarray(days, dtype=np.int64))
+    if not d.size:
+        return d, d
+    first = np.concatenate(([0], np.flatnonzero(np.diff(d) != 1) + 1))
+    return d[first], np.diff(np.append(first, d.size))
+
+
+def streak_stats(days, anchor=None):
+    # (current, longest). current counts back from anchor (default: the latest
+    # day) while every day has a session; 0 if anchor itself has none.
+    import numpy as np
+    starts, lengths = runs(days)
+    if not lengths.size:
+        return 0, 0
+    ends = starts + lengths - 1
+    anchor = int(ends[-1]) if anchor is None else int(anchor)
+    i = int(np.searchsorted(ends, anchor))
+    current = anchor - int(starts[i]) + 1 if i < ends.size and starts[i] <= anchor else 0
+    return current, int(lengths.max())
+
+
+def longest_by_period(days, bounds):
+    # Longest streak inside each period [bounds[k], bounds[k + 1]), e.g. month
+    # starts; a run crossing a boundary counts separately on each side.
+    import numpy as np
+    bounds = np.asarray(bounds, dtype=np.int64)
+    out = np.zeros(max(0, bounds.size - 1), dtype=np.int64)
+    d = np.unique(np.asarray(days, dtype=np.int64))
+    d = d[(d >= bounds[0]) & (d < bounds[-1])] if bounds.size else d[:0]
+    if not d.size:
+        return out
+    period = np.searchsorted(bounds, d, side="right") - 1
+    breaks = (np.diff(d) != 1) | (np.diff(period) != 0)
+    run_id = np.concatenate(([0], np.cumsum(breaks)))
+    first = np.concatenate(([0], np.flatnonzero(breaks) + 1))
+    np.maximum.at(out, period[first], np.bincount(run_id))
+    return out
+
+
+class StreakTracker:
+    # Live current/longest streak for the Tk app. Runs of consecutive days are
+    # kept as start -> end and end -> start maps, so a new day joins its
+    # neighbours in O(1). Removing a day's last session splits its run, which
+    # walks that run once.
+
+    def __init__(self, days=()):
+        self._count = {}
+        self._end = {}
+        self._start = {}
+        self.longest = 0
+        for day in days:
+            self.add(day)
+
+    def __len__(self):
+        return len(self._count)
+
+    def add(self, day: int):
+        n = self._count.get(day, 0)
+        self._count[day] = n + 1
+        if n:
+            return
+        start = end = day
+        if day - 1 in self._start:
+            start = self._start.pop(day - 1)
+        if day + 1 in self._end:
+            end = self._end.pop(day + 1)
+        self._end[start] = end
+        self._start[end] = start
+        if end - start + 1 > self.longest:
+            self.longest = end - start + 1
+
+    def remove(self, day: int):
+        n = self._count.get(day, 0)
+        if n > 1:
+            self._count[day] = n - 1
+            return
+        if not n:
+            return
+        del self._count[day]
+        start = day
+        while start - 1 in self._count:
+            start -= 1
+        end = self._end.pop(start)
+        del self._start[end]
+        if start < day:
+            self._end[start] = day - 1
+            self._start[day - 1] = start
+        if day < end:
+            self._end[day + 1] = end
+            self._start[end] = day + 1
+        if end - start + 1 == self.longest:
+            self.longest = max((e - s + 1 for s, e in self._end.items()), default=0)
+
+    def current(self, today: int) -> int:
+        # Streak still alive on today: the run through today, or through
+        # yesterday while today has no session yet.
+        for day in (today, today - 1):
+            if day in self._count:
+                start = day
+                if day in self._start:
+                    start = self._start[day]
+                else:
+                    while start - 1 in self._count:
+                        start -= 1
+                return day - start + 1
+        return 0
+
+    def clear(self):
+        self._count.clear()
+        self._end.clear()
+        self._start.clear()
+        self.longest = 0
@@ -0,0 +1,84 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import analytics
+from analytics import Dataset, daily_totals, overview, streaks, title_totals, weekday_totals
+from live import LiveFrame
+from rollups import ROLLUP_COLUMNS
+from snapshot import with_days
+from storage import JournalStore
+
+FIELDS = ["date", "clock", "title", "duration", "note", "hardness", "id"]
+D = date(2026, 2, 2).toordinal()    # a Monday
+
+# (day, title, minutes, sessions, hsum, hcount)
+ROWS = [
+    (D, "Code", 50, 2, 12.0, 2),
+    (D, "Read", 35, 1, 0.0, 0),
+    (D + 1, "Code", 25, 1, 4.0, 1),
+    (D + 3, "Read", 45, 1, 7.0, 1),
+    (D + 3, "Gym", 60, 1, 8.0, 1),
+]
+
+
+def dataset(rows=ROWS, key=None):
+    return Dataset(with_days(pd.DataFrame(rows, columns=ROLLUP_COLUMNS)), key=key)
+
+
+@pytest.fixture(autouse=True)
+def empty_memo():
+    analytics.clear_memo()
+    yield
+    analytics.clear_memo()
+
+
+def test_results_match_a_hand_computed_frame():
+    ds = dataset()
+    totals = title_totals(ds)
+    assert totals.titles == ("Read", "Code", "Gym")
+    assert list(totals.minutes) == [80, 75, 60]
+    np.testing.assert_allclose(totals.avg_hardness, [7.0, 16 / 3, 8.0])
+    assert totals.total == 215
+
+    assert list(daily_totals(ds, D, D + 3).minutes) == [85, 25, 0, 105]
+    assert list(weekday_totals(ds)) == [85, 25, 0, 105, 0, 0, 0]
+    assert streaks(ds, D + 3) == (1, 2)
+
+    ov = overview(ds)
+    assert ov.latest_day == pd.Timestamp(2026, 2, 5)
+    assert ov.today.titles == ("Gym", "Read")
+    assert ov.week.titles == ("Read", "Code", "Gym")
+    assert list(ov.trend.minutes[-4:]) == [85, 25, 0, 105]
+    assert ov.stack.titles == ("Read", "Code", "Gym")
+    assert list(ov.stack.minutes[:, 1]) == [0, 0, 0, 50, 25, 0, 0]
+
+
+def test_results_are_shared_and_read_only():
+    ds = dataset()
+    first = title_totals(ds)
+    assert title_totals(dataset()) is first
+    with pytest.raises(ValueError):
+        first.minutes[0] = 0
+
+
+def test_changed_rows_are_not_served_from_the_memo():
+    before = title_totals(dataset())
+    rows = ROWS + [(D + 4, "Gym", 30, 1, 5.0, 1)]
+    after = title_totals(dataset(rows))
+    assert after is not before
+    assert dict(zip(after.titles, after.minutes))["Gym"] == 90
+
+
+def test_live_dataset_changes_key_with_the_file(tmp_path):
+    store = JournalStore(str(tmp_path / "items.csv"), FIELDS, compact_threshold=1 << 40)
+    store.reset([{"date": "02-02-26", "clock": "09:00", "title": "Code", "duration": "25",
+                  "note": "", "hardness": "5", "id": "a"}])
+    live = LiveFrame(store.path)
+    assert title_totals(live.dataset).total == 25
+    store.add({"date": "03-02-26", "clock": "09:00", "title": "Code", "duration": "40",
+               "note": "", "hardness": "5", "id": "b"})
+    assert live.poll()
+    assert title_totals(live.dataset).total == 65
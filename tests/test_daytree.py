@@ -0,0 +1,84 @@
+import random
+
+from bench import ModelTree
+from daytree import DayTree, stripe
+from entries import Entry, EntryIndex
+
+
+def entry(i, day, clock="09:00"):
+    return Entry(day, clock, f"Task {i}", "25", "", "5", id=f"e{i}")
+
+
+def assert_striped(tree, parent=""):
+    for i, iid in enumerate(tree.get_children(parent)):
+        assert tree.item(iid, "tags") == stripe(i)
+        if tree.get_children(iid):
+            assert_striped(tree, iid)
+
+
+def make(entries):
+    index = EntryIndex(entries)
+    dirty = set()
+    days = DayTree(ModelTree(), index, dirty.add)
+    for day_key in index.days():
+        days.insert_day(day_key)
+    for day_key in dirty:
+        days.update_footer(day_key)
+    return days, dirty
+
+
+def test_days_collapse_until_expanded():
+    days, _ = make([entry(0, "01-02-26"), entry(1, "02-02-26"), entry(2, "02-02-26")])
+    state = days.day_index["02-02-26"]
+    assert state["mode"] == "group" and state.get("placeholder")
+    days.expand(state["parent_id"])
+    kids = days.tree.get_children(state["parent_id"])
+    assert list(kids[:2]) == ["e1", "e2"] and len(kids) == 3
+    assert days.day_index["01-02-26"] == {"mode": "single", "item_id": "e0", "parent_id": "e0", "footer_id": "e0"}
+    assert_striped(days.tree)
+
+
+def test_second_session_turns_a_single_row_into_a_group():
+    days, dirty = make([entry(0, "01-02-26")])
+    e = entry(1, "01-02-26", "10:00")
+    days.entries.add(e)
+    days.insert_entry(e)
+    state = days.day_index["01-02-26"]
+    assert state["mode"] == "group" and state["children"] == ["e0", "e1"]
+    assert days.tree.item(state["parent_id"], "text") == "01-02-26 (2)"
+    assert "01-02-26" in dirty
+
+
+def test_filtered_and_hidden_days_stay_out():
+    days, _ = make([entry(0, "01-02-26")])
+    days.filter_ids = {"e0"}
+    e = entry(1, "03-02-26")
+    days.entries.add(e)
+    days.insert_entry(e)
+    assert "03-02-26" not in days.day_index
+    days.filter_ids = None
+    days.hidden_days = ["03-02-26"]
+    days.insert_entry(e)
+    assert "03-02-26" not in days.day_index
+    days.load_older(5)
+    assert days.tree.get_children("")[0] == "e1"
+    assert_striped(days.tree)
+
+
+def test_batched_removal_keeps_rows_and_stripes_consistent():
+    rng = random.Random(4)
+    entries = [entry(i, f"{rng.randrange(1, 15):02d}-02-26") for i in range(80)]
+    days, _ = make(entries)
+    for day_key in list(days.day_index):
+        days.materialize_day(day_key, open_row=True)
+    while len(days.entries):
+        sel = rng.sample(list(days.tree._rows), min(4, len(days.tree._rows)))
+        doomed = days.resolve(sel)
+        for e in doomed.values():
+            days.entries.remove(e)
+        days.remove(doomed.values())
+        assert set(days.day_index) == set(days.entries.days())
+        for day_key, state in days.day_index.items():
+            assert (state["mode"] == "single") == (len(days.day_ids(day_key)) == 1)
+        assert_striped(days.tree)
+    assert days.tree.get_children("") == ()
@@ -0,0 +1,232 @@
+import csv
+import os
+import random
+
+import pandas as pd
+import pytest
+
+from entries import Entry, EntryIndex
+import live as live_module
+from live import LiveFrame, LiveSessions
+from rollups import ROLLUP_COLUMNS, index_rows
+from snapshot import load_dashboard_data, parse_session_rows
+from storage import JournalStore, SqliteStore
+
+FIELDS = ["date", "clock", "title", "duration", "note", "hardness", "id"]
+TITLES = ["Deep work", "Reading", "Math", "Writing"]
+
+
+def make_rows(n, seed=1, prefix="r"):
+    rng = random.Random(seed)
+    return [{
+        "date": f"{rng.randrange(1, 29):02d}-{rng.randrange(9, 11):02d}-26",
+        "clock": f"{rng.randrange(6, 23):02d}:{rng.randrange(60):02d}",
+        "title": rng.choice(TITLES),
+        "duration": str(rng.choice((15, 25, 45, 60))),
+        "note": "",
+        "hardness": rng.choice(["", "3", "7.5", "11"]),
+        "id": f"{prefix}{i}",
+    } for i in range(n)]
+
+
+def rollup_of(rows):
+    idx = EntryIndex(Entry.from_row(r) for r in rows)
+    return pd.DataFrame(list(index_rows(idx)), columns=ROLLUP_COLUMNS)
+
+
+def normalized(df):
+    if "day_ord" in df.columns:
+        df = df.drop(columns=["day"]).rename(columns={"day_ord": "day"})
+    df = df[df["sessions"] > 0][ROLLUP_COLUMNS].astype(
+        {"day": "int64", "title": str, "minutes": "int64", "sessions": "int64", "hsum": float, "hcount": "int64"})
+    return df.sort_values(["day", "title"]).reset_index(drop=True)
+
+
+def assert_current(live, store, skip_title=None):
+    rows = [r for r in store.load() if r["title"] != skip_title]
+    pd.testing.assert_frame_equal(normalized(live.frame), normalized(rollup_of(rows)))
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = JournalStore(str(tmp_path / "items.csv"), FIELDS, compact_threshold=1 << 40)
+    s.reset(make_rows(300))
+    return s
+
+
+def test_follows_adds_removes_and_compaction(store):
+    live = LiveFrame(store.path)
+    assert_current(live, store)
+    rng = random.Random(5)
+    extra = iter(make_rows(200, seed=2, prefix="x"))
+    for _ in range(40):
+        op = rng.random()
+        if op < 0.6:
+            store.add(next(extra))
+        elif op < 0.9:
+            store.remove(rng.choice(store.load()))
+        else:
+            store.compact()
+        version = live.version
+        assert live.poll() == (live.version != version)
+        assert_current(live, store)
+    assert live.poll() is False
+
+
+def test_torn_tail_waits_for_the_rest_of_the_record(store):
+    live = LiveFrame(store.path)
+    store.add(make_rows(1, seed=3, prefix="a")[0])
+    with open(store.journal_path, "ab") as f:
+        f.write(b"add,17-10-26,10:00,Torn,30,,5,t")
+    live.poll()
+    assert_current(live, store, skip_title="Torn")
+    with open(store.journal_path, "ab") as f:
+        f.write(b"1\r\n")
+    assert live.poll()
+    assert (live.frame["title"] == "Torn").any()
+    assert_current(live, store)
+
+
+def test_rotated_journal_and_reset(store):
+    live = LiveFrame(store.path)
+    store.add(make_rows(1, seed=4, prefix="b")[0])
+    os.replace(store.journal_path, store.compacting_path)
+    assert live.poll()
+    assert_current(live, store)
+    store.add(make_rows(1, seed=5, prefix="c")[0])
+    assert live.poll()
+    assert_current(live, store)
+    store.compact()
+    live.poll()
+    assert_current(live, store)
+    store.reset(make_rows(10, seed=6))
+    assert live.poll()
+    assert_current(live, store)
+
+
+def test_rotated_journal_already_in_snapshot_is_skipped(store, monkeypatch):
+    # A compaction that published the snapshot but crashed before removing
+    # the rotated journal must not count that journal twice.
+    store.add(make_rows(1, seed=7, prefix="d")[0])
+    remove = os.remove
+
+    def crash(p):
+        if p == store.compacting_path:
+            raise KeyboardInterrupt("crash")
+        remove(p)
+
+    monkeypatch.setattr(os, "remove", crash)
+    with pytest.raises(KeyboardInterrupt):
+        store._compact()
+    monkeypatch.undo()
+    live = LiveFrame(store.path)
+    assert_current(live, store)
+
+
+def test_missing_file_then_created(tmp_path):
+    path = str(tmp_path / "items.csv")
+    live = LiveFrame(path)
+    assert live.frame.empty
+    s = JournalStore(path, FIELDS)
+    s.add(make_rows(1)[0])
+    assert live.poll()
+    assert_current(live, s)
+
+
+def test_sqlite_reloads_on_change(tmp_path):
+    db = str(tmp_path / "items.db")
+    s = SqliteStore(db, FIELDS)
+    s.reset(make_rows(100))
+    live = LiveFrame(db)
+    assert_current(live, s)
+    s.add(make_rows(1, seed=9, prefix="q")[0])
+    assert live.poll()
+    assert_current(live, s)
+    s.close()
+
+
+def sessions_of(rows):
+    raw = pd.DataFrame(rows, columns=FIELDS)
+    return parse_session_rows(raw.mask(raw == ""))
+
+
+SESSION_COLUMNS = ["date_time", "title", "duration", "hardness", "note", "id", "hour", "date"]
+
+
+def assert_sessions(live, expected):
+    a = live.frame[SESSION_COLUMNS].reset_index(drop=True).astype(str)
+    b = expected[SESSION_COLUMNS].reset_index(drop=True).astype(str)
+    pd.testing.assert_frame_equal(a, b)
+
+
+def append_to_snapshot(store, rows):
+    with open(store.path, "a", newline="", encoding="utf-8") as f:
+        csv.DictWriter(f, fieldnames=FIELDS).writerows(rows)
+
+
+def test_sessions_follow_the_journal(store):
+    live = LiveSessions(store.path)
+    assert_sessions(live, sessions_of(store.load()))
+    extra = make_rows(20, seed=2, prefix="x")
+    for r in extra[:10]:
+        store.add(r)
+    assert live.poll()
+    assert_sessions(live, sessions_of(store.load()))
+    store.remove(store.load()[5])
+    store.remove(extra[2])
+    store.remove(dict(store.load()[7], id=""))
+    assert live.poll()
+    assert_sessions(live, sessions_of(store.load()))
+    assert live.poll() is False
+    store.compact()
+    live.poll()
+    assert_sessions(live, load_dashboard_data(store.path))
+
+
+def test_sessions_read_only_the_rows_appended_to_the_snapshot(store, monkeypatch):
+    live = LiveSessions(store.path)
+    monkeypatch.setattr(LiveSessions, "reload", lambda self: pytest.fail("reloaded in full"))
+    append_to_snapshot(store, make_rows(5, seed=3, prefix="s"))
+    assert live.poll()
+    assert_sessions(live, load_dashboard_data(store.path))
+    with open(store.path, "ab") as f:
+        f.write(b"02-10-26,09:00,Half")
+    live.poll()
+    with open(store.path, "ab") as f:
+        f.write(b",45,,3,half\r\n")
+    assert live.poll()
+    assert_sessions(live, load_dashboard_data(store.path))
+
+
+def test_sessions_reload_when_the_snapshot_is_rewritten(store):
+    live = LiveSessions(store.path)
+    data = open(store.path, "rb").read()
+    with open(store.path, "r+b") as f:
+        f.write(data.replace(b"Reading", b"Rxading", 1))
+    os.utime(store.path, ns=(1, 1))
+    assert live.poll()
+    assert_sessions(live, load_dashboard_data(store.path))
+    store.reset(make_rows(10, seed=4))
+    assert live.poll()
+    assert_sessions(live, sessions_of(store.load()))
+    os.remove(store.path)
+    assert live.poll()
+    assert live.frame.empty
+
+
+def test_failed_poll_is_retried(store, monkeypatch):
+    live = LiveSessions(store.path)
+    store.add(make_rows(1, seed=5, prefix="f")[0])
+    calls = []
+
+    def flaky(raw):
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError("boom")
+        return parse_session_rows(raw)
+
+    monkeypatch.setattr(live_module, "parse_session_rows", flaky)
+    with pytest.raises(ValueError):
+        live.poll()
+    assert live.poll()
+    assert_sessions(live, sessions_of(store.load()))
@@ -0,0 +1,24 @@
+from render import render_dashboard
+from storage import JournalStore
+
+FIELDS = ["date", "clock", "title", "duration", "note", "hardness", "id"]
+
+
+def row(i, date="01-02-26"):
+    return {"date": date, "clock": "09:00", "title": f"Task {i % 2}", "duration": "25", "note": "", "hardness": "5", "id": f"id{i}"}
+
+
+def test_render_includes_journal_sessions(tmp_path):
+    # The render key is taken from the same aggregates the image is drawn
+    # from, so a session still in the journal must change it, and compacting
+    # it into the snapshot must not.
+    store = JournalStore(str(tmp_path / "items.csv"), FIELDS, compact_threshold=1 << 40)
+    store.reset([row(0), row(1)])
+    cache = tmp_path / "renders"
+    before, _ = render_dashboard(store.path, fmt="svg", cache_dir=cache)
+    store.add(row(2, date="02-02-26"))
+    journaled, hit = render_dashboard(store.path, fmt="svg", cache_dir=cache)
+    assert journaled != before and not hit
+    store.compact()
+    compacted, hit = render_dashboard(store.path, fmt="svg", cache_dir=cache)
+    assert compacted == journaled and hit
@@ -0,0 +1,65 @@
+import pytest
+
+from entries import Entry
+from search import SearchIndex
+
+ROWS = [
+    ("a", "Deep work", "Refactor the parser"),
+    ("b", "Reading", "Deep learning book"),
+    ("c", "Deep Work", "parsing notes"),
+    ("d", "Gym", ""),
+]
+
+
+def entry(eid, title, note):
+    return Entry.from_row({"date": "01-02-26", "clock": "09:00", "title": title, "duration": "25",
+                           "note": note, "hardness": "5", "id": eid})
+
+
+@pytest.fixture
+def entries():
+    return [entry(*r) for r in ROWS]
+
+
+@pytest.fixture
+def index(entries):
+    return SearchIndex(entries)
+
+
+def test_all_terms_must_match(index):
+    assert index.query("deep work") == {"a", "c"}
+    assert index.query("deep learning") == {"b"}
+    assert index.query("gym deep") == set()
+
+
+def test_only_the_last_term_matches_as_a_prefix(index):
+    assert index.query("pars") == {"a", "c"}
+    assert index.query("deep wo") == {"a", "c"}
+    assert index.query("dee work") == set()
+    # Below MIN_PREFIX the last term has to match a whole token.
+    assert index.query("p") == set()
+
+
+def test_case_is_folded(index):
+    assert index.query("DEEP Work") == index.query("deep work") == {"a", "c"}
+    assert index.query("GYM") == {"d"}
+
+
+def test_removed_entries_drop_out(index, entries):
+    index.remove(entries[0])
+    assert index.query("deep work") == {"c"}
+    assert index.query("refactor") == set()
+    assert "refactor" not in index.postings
+    index.remove(entries[2])
+    assert index.query("pars") == set()
+
+
+def test_empty_query_matches_nothing(index, entries):
+    assert index.query("") == set()
+    assert index.query("  ,. ") == set()
+    assert not index.matches(entries[0], "")
+
+
+def test_matches_agrees_with_query(index, entries):
+    for text in ("deep", "deep wo", "pars", "reading deep", "gym", "p", "work parser"):
+        assert {e.id for e in entries if index.matches(e, text)} == index.query(text), text
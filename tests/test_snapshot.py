@@ -0,0 +1,114 @@
+import csv
+import os
+
+import pandas as pd
+from dateutil import parser
+
+import snapshot
+from snapshot import cache_paths, dashboard_frame, load_rollups, load_sessions
+
+DATES = ["01-01-70", "15-03-26", "31-12-99", "2026-03-15", "5/6/24"]
+
+
+def test_dashboard_dates_match_dateutil(tmp_path):
+    # The old dashboard parsed every date with dateutil; two-digit years must
+    # land in its window whether or not the snapshot already parsed them.
+    path = tmp_path / "items.csv"
+    lines = ["date,clock,title,duration,note,hardness,id"]
+    lines += [f"{d},09:00,Task,25,,5,id{i}" for i, d in enumerate(DATES)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    df = dashboard_frame(load_sessions(str(path)))
+    expected = [pd.Timestamp(parser.parse(d, dayfirst=True).date()) for d in DATES]
+    assert list(df["date_parsed"]) == expected
+
+
+def test_rollup_days_match_dashboard_dates(tmp_path):
+    # Rollup ordinals and dashboard dates follow the same two-digit year rule.
+    path = tmp_path / "items.csv"
+    lines = ["date,clock,title,duration,note,hardness,id"]
+    lines += [f"{d},09:00,Task,25,,5,id{i}" for i, d in enumerate(["01-01-70", "31-12-75", "15-03-26", "31-12-99"])]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    days = set(load_rollups(str(path))["day"])
+    assert days == set(dashboard_frame(load_sessions(str(path)))["date_parsed"])
+
+
+FIELDS = ["date", "clock", "title", "duration", "note", "hardness", "id"]
+
+
+def session(i, note=""):
+    return ["01-02-26", "09:00", f"Task {i % 3}", str(20 + i), note, "5", f"id{i}"]
+
+
+def write_csv(path, rows, mode="w"):
+    with open(path, mode, newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        if mode == "w":
+            w.writerow(FIELDS)
+        w.writerows(rows)
+
+
+def bump_mtime(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+
+def fresh(path):
+    # What a cold parse gives, without touching the cache.
+    return snapshot._typed(snapshot._read_raw(str(path)))
+
+
+def same(a, b):
+    pd.testing.assert_frame_equal(a.astype({"title": str}).reset_index(drop=True),
+                                  b.astype({"title": str}).reset_index(drop=True))
+
+
+def test_appended_rows_are_parsed_from_the_tail(tmp_path, monkeypatch):
+    path = tmp_path / "items.csv"
+    write_csv(path, [session(i) for i in range(5)])
+    load_sessions(str(path))
+    write_csv(path, [session(5, note="line one\nline two"), session(6)], mode="a")
+    bump_mtime(path)
+    read_raw = snapshot._read_raw
+    sources = []
+
+    def recording(src, *args, **kwargs):
+        sources.append(src)
+        return read_raw(src, *args, **kwargs)
+
+    monkeypatch.setattr(snapshot, "_read_raw", recording)
+    df = load_sessions(str(path))
+    monkeypatch.undo()
+    assert len(sources) == 1 and not isinstance(sources[0], str)
+    assert list(df["id"]) == [f"id{i}" for i in range(7)]
+    assert df["note"].iloc[5] == "line one\nline two"
+    same(df, fresh(path))
+    # The grown file is now the cached one.
+    same(load_sessions(str(path)), df)
+
+
+def test_same_size_rewrite_is_parsed_again(tmp_path):
+    path = tmp_path / "items.csv"
+    write_csv(path, [session(i) for i in range(5)])
+    load_sessions(str(path))
+    size = os.path.getsize(path)
+    rows = [session(i) for i in range(5)]
+    rows[2][3] = "99"
+    write_csv(path, rows)
+    bump_mtime(path)
+    assert os.path.getsize(path) == size
+    df = load_sessions(str(path))
+    assert df["duration"].iloc[2] == 99
+    same(df, fresh(path))
+
+
+def test_corrupted_cache_is_rebuilt(tmp_path):
+    path = tmp_path / "items.csv"
+    write_csv(path, [session(i) for i in range(5)])
+    expected = load_sessions(str(path))
+    data_path, _ = cache_paths(str(path))
+    with open(data_path, "wb") as f:
+        f.write(b"not a cache")
+    same(load_sessions(str(path)), expected)
+    same(load_sessions(str(path)), expected)
+    with open(data_path, "rb") as f:
+        assert f.read() != b"not a cache"
@@ -0,0 +1,323 @@
+import os
+import random
+import time
+from datetime import datetime
+
+import pytest
+from dateutil import parser
+
+import storage
+from storage import JournalStore
+
+FIELDS = ["date", "clock", "title", "duration", "note", "hardness", "id"]
+
+
+def row(i, **kw):
+    r = {"date": "01-02-26", "clock": "09:00", "title": f"Task {i}", "duration": "25", "note": "", "hardness": "5", "id": f"id{i}"}
+    r.update(kw)
+    return r
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JournalStore(str(tmp_path / "items.csv"), FIELDS, compact_threshold=1 << 40)
+
+
+def ids(rows):
+    return [r["id"] for r in rows]
+
+
+def test_journal_replay_adds_and_removes(store):
+    store.reset([row(0), row(1), row(2)])
+    store.add(row(3))
+    store.remove(row(1))
+    store.remove(row(0, id=""))
+    assert ids(store.load()) == ["id2", "id3"]
+
+
+def test_remove_by_id_applies_to_rows_added_later(store):
+    # replay_journal collects id removals and applies them after all adds.
+    store.reset([row(0)])
+    store.remove(row(1))
+    store.add(row(1))
+    assert ids(store.load()) == ["id0"]
+
+
+def test_remove_without_id_takes_first_match_only(store):
+    store.reset([row(0, title="Same"), row(1, title="Same")])
+    store.remove(row(9, title="Same", id=""))
+    assert ids(store.load()) == ["id1"]
+
+
+def test_torn_tail_is_trimmed_before_the_next_append(store):
+    store.reset([row(0)])
+    store.add(row(1))
+    with open(store.journal_path, "ab") as f:
+        f.write(b"add,01-02-26,10:00,Torn")
+    store.add(row(2))
+    assert ids(store.load()) == ["id0", "id1", "id2"]
+    with open(store.journal_path, "rb") as f:
+        assert b"Torn" not in f.read()
+
+
+def test_torn_first_record_keeps_the_header(store):
+    store.add(row(0))
+    with open(store.journal_path, "r+b") as f:
+        f.truncate(os.path.getsize(store.journal_path) - 3)
+    store.add(row(1))
+    with open(store.journal_path, "rb") as f:
+        assert f.readline() == b"op," + ",".join(FIELDS).encode() + b"\r\n"
+    assert ids(store.load()) == ["id1"]
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(store):
+    store.reset([row(0), row(1)])
+    store.add(row(2))
+    store.remove(row(0))
+    store.compact()
+    assert not os.path.exists(store.journal_path)
+    assert not os.path.exists(store.compacting_path)
+    assert ids(storage.read_rows(store.path, FIELDS)) == ["id1", "id2"]
+    assert ids(store.load()) == ["id1", "id2"]
+
+
+def test_interrupted_compaction_is_replayed(store):
+    # Crash after rotating the journal, before the new snapshot was published.
+    store.reset([row(0)])
+    store.add(row(1))
+    os.replace(store.journal_path, store.compacting_path)
+    os.utime(store.path, ns=(1, 1))
+    store.add(row(2))
+    assert ids(store.load()) == ["id0", "id1", "id2"]
+    store.compact()
+    assert ids(storage.read_rows(store.path, FIELDS)) == ["id0", "id1", "id2"]
+    assert not os.path.exists(store.compacting_path)
+
+
+def crash_on_remove(monkeypatch, path):
+    remove = os.remove
+
+    def failing(p):
+        if p == path:
+            raise KeyboardInterrupt("crash")
+        remove(p)
+
+    monkeypatch.setattr(os, "remove", failing)
+
+
+def test_rotated_journal_already_in_snapshot_is_discarded(store, monkeypatch):
+    # Crash after publishing the snapshot, before unlinking the rotated journal:
+    # its records are already in the snapshot and must not apply twice, even
+    # when the filesystem gives both files the same mtime.
+    store.reset([row(0)])
+    store.add(row(1))
+    store.remove(row(0))
+    crash_on_remove(monkeypatch, store.compacting_path)
+    with pytest.raises(KeyboardInterrupt):
+        store._compact()
+    monkeypatch.undo()
+    assert os.path.exists(store.compacting_path)
+    os.utime(store.path, ns=(2_000_000_000, 2_000_000_000))
+    os.utime(store.compacting_path, ns=(2_000_000_000, 2_000_000_000))
+    assert ids(store.load()) == ["id1"]
+    assert not os.path.exists(store.compacting_path)
+    assert not os.path.exists(store.marker_path)
+
+
+def test_marker_for_an_unpublished_snapshot_is_ignored(store, monkeypatch):
+    # Crash after writing the marker, before the snapshot replace: the rotated
+    # journal still has to be replayed.
+    store.reset([row(0)])
+    store.add(row(1))
+    replace = os.replace
+
+    def failing(src, dst):
+        if dst == store.path:
+            raise KeyboardInterrupt("crash")
+        replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", failing)
+    with pytest.raises(KeyboardInterrupt):
+        store._compact()
+    monkeypatch.undo()
+    assert os.path.exists(store.marker_path)
+    assert ids(store.load()) == ["id0", "id1"]
+    assert not os.path.exists(store.marker_path)
+    store.compact()
+    assert ids(storage.read_rows(store.path, FIELDS)) == ["id0", "id1"]
+
+
+def test_reset_during_compaction_wins(store, monkeypatch):
+    store.reset([row(0)])
+    store.add(row(1))
+    read_rows = storage.read_rows
+
+    def reset_midway(path, fields):
+        rows = read_rows(path, fields)
+        if path == store.path:
+            store.reset([row(7)])
+        return rows
+
+    monkeypatch.setattr(storage, "read_rows", reset_midway)
+    store._compact()
+    monkeypatch.setattr(storage, "read_rows", read_rows)
+    assert ids(store.load()) == ["id7"]
+    assert not os.path.exists(store.path + ".compact.tmp")
+
+
+def test_streamed_rows_match_the_list_replay(store):
+    # iter_rows replays both journals in one pass over the snapshot; it must
+    # agree with replay_journal applied file by file.
+    rng = random.Random(7)
+    for trial in range(200):
+        pool = [row(i, title=f"Task {i % 3}") for i in range(8)]
+        store.reset(rng.sample(pool, rng.randint(0, 5)))
+        for phase in range(2):
+            for _ in range(rng.randint(0, 6)):
+                r = dict(rng.choice(pool))
+                if rng.random() < 0.5:
+                    store.add(r)
+                else:
+                    if rng.random() < 0.4:
+                        r["id"] = ""
+                    store.remove(r)
+            if phase == 0 and os.path.exists(store.journal_path) and rng.random() < 0.5:
+                os.replace(store.journal_path, store.compacting_path)
+                os.utime(store.path, ns=(1, 1))
+        expected = storage.read_rows(store.path, FIELDS)
+        expected = storage.replay_journal(expected, store.compacting_path, FIELDS)
+        expected = storage.replay_journal(expected, store.journal_path, FIELDS)
+        assert list(store.iter_rows()) == expected, trial
+        for p in (store.journal_path, store.compacting_path):
+            if os.path.exists(p):
+                os.unlink(p)
+
+
+def open_paths():
+    fds = "/proc/self/fd"
+    paths = set()
+    for fd in os.listdir(fds):
+        try:
+            paths.add(os.readlink(os.path.join(fds, fd)))
+        except OSError:
+            pass
+    return paths
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_streamed_load_does_not_hold_the_snapshot_open(store):
+    # Windows cannot replace a file that is open, so a compaction during a
+    # long load must not find the snapshot held by the reader.
+    store.reset([row(i) for i in range(5)])
+    store.add(row(5))
+    rows = store.iter_rows()
+    first = next(rows)
+    assert os.path.realpath(store.path) not in open_paths()
+    store.compact()
+    assert [first["id"]] + ids(rows) == ["id0", "id1", "id2", "id3", "id4", "id5"]
+
+
+def test_background_writer_applies_in_order(store):
+    writer = storage.BackgroundWriter(store, coalesce_ms=5)
+    writer.add(row(0))
+    writer.remove_many([row(0)])
+    writer.reset([row(1)])
+    writer.add(row(2))
+    writer.close()
+    assert writer.take_errors() == []
+    assert ids(store.load()) == ["id1", "id2"]
+
+
+def test_failed_write_is_retried_with_the_next_batch(store, monkeypatch):
+    apply = store.apply
+    calls = []
+
+    def flaky(ops):
+        calls.append(list(ops))
+        if len(calls) == 1:
+            raise OSError("disk full")
+        apply(ops)
+
+    monkeypatch.setattr(store, "apply", flaky)
+    writer = storage.BackgroundWriter(store, coalesce_ms=5)
+    writer.add(row(0))
+    writer.flush()
+    assert len(writer.take_errors()) == 1
+    writer.add(row(1))
+    writer.close()
+    assert ids(store.load()) == ["id0", "id1"]
+    assert writer.take_errors() == []
+
+
+def test_failed_write_is_retried_on_its_own(store, monkeypatch):
+    apply = store.apply
+    calls = []
+
+    def flaky(ops):
+        calls.append(list(ops))
+        if len(calls) == 1:
+            raise OSError("disk full")
+        apply(ops)
+
+    monkeypatch.setattr(store, "apply", flaky)
+    monkeypatch.setattr(storage, "RETRY_MIN_S", 0.01)
+    writer = storage.BackgroundWriter(store, coalesce_ms=5)
+    writer.add(row(0))
+    deadline = time.monotonic() + 5
+    while len(calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.close()
+    assert ids(store.load()) == ["id0"]
+
+
+def test_failed_append_leaves_no_partial_records(store, monkeypatch):
+    # The retry must not apply records that landed before the failure twice.
+    store.add(row(0))
+    fsync = os.fsync
+    failures = [OSError("io error")]
+
+    def failing_fsync(fd):
+        if failures:
+            raise failures.pop()
+        fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", failing_fsync)
+    writer = storage.BackgroundWriter(store, coalesce_ms=5)
+    writer.add(row(1))
+    writer.add(row(2))
+    writer.flush()
+    writer.add(row(3))
+    writer.close()
+    assert ids(store.load()) == ["id0", "id1", "id2", "id3"]
+
+
+@pytest.mark.parametrize("name", ["plain", "odd?name", "odd#name", "odd%20name"])
+def test_sqlite_read_only_connection_escapes_the_path(tmp_path, name):
+    folder = tmp_path / name
+    folder.mkdir()
+    db = storage.SqliteStore(str(folder / "items.db"), FIELDS)
+    db.apply([(storage.OP_ADD, row(0)), (storage.OP_ADD, row(1))])
+    assert ids(db.iter_rows()) == ["id0", "id1"]
+    db.close()
+
+
+def test_day_ordinal_uses_dateutils_two_digit_years():
+    for yy in range(100):
+        key = f"15-06-{yy:02d}"
+        assert storage.day_ordinal(key) == parser.parse(key, dayfirst=True).toordinal(), key
+
+
+def test_sqlite_days_from_the_old_pivot_are_migrated(tmp_path):
+    path = str(tmp_path / "items.db")
+    db = storage.SqliteStore(path, FIELDS)
+    db.apply([(storage.OP_ADD, row(0, date="01-01-70")), (storage.OP_ADD, row(1))])
+    old = datetime.strptime("01-01-70", "%d-%m-%y").toordinal()
+    with db._conn:
+        db._conn.execute("UPDATE sessions SET day = ? WHERE date = '01-01-70'", (old,))
+        db._conn.execute("UPDATE daily_title SET day = ? WHERE day = ?", (old, storage.day_ordinal("01-01-70")))
+        db._conn.execute("DELETE FROM meta WHERE key = 'day_rule'")
+    db.close()
+    db = storage.SqliteStore(path, FIELDS)
+    days = sorted(r[0] for r in db._conn.execute("SELECT day FROM daily_title"))
+    db.close()
+    assert days == sorted([storage.day_ordinal("01-01-70"), storage.day_ordinal("01-02-26")])
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from streaks import StreakTracker, longest_by_period, runs, streak_stats
+
+
+def brute(days, anchor=None):
+    days = set(days)
+    if not days:
+        return 0, 0
+    longest = 0
+    for s in days:
+        if s - 1 not in days:
+            n = 0
+            while s + n in days:
+                n += 1
+            longest = max(longest, n)
+    anchor = max(days) if anchor is None else anchor
+    current = 0
+    while anchor - current in days:
+        current += 1
+    return current, longest
+
+
+def brute_period(days, lo, hi):
+    return brute([d for d in days if lo <= d < hi])[1]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_vectorized_matches_brute_force(seed):
+    rng = random.Random(seed)
+    days = [rng.randrange(1000, 1200) for _ in range(rng.randrange(0, 150))]
+    assert streak_stats(days) == brute(days)
+    anchor = rng.randrange(990, 1210)
+    assert streak_stats(days, anchor) == brute(days, anchor)
+    bounds = sorted(rng.sample(range(990, 1210), 5))
+    expected = [brute_period(days, lo, hi) for lo, hi in zip(bounds, bounds[1:])]
+    assert longest_by_period(days, bounds).tolist() == expected
+
+
+def test_runs_with_duplicates():
+    starts, lengths = runs([5, 3, 4, 4, 9])
+    assert starts.tolist() == [3, 9]
+    assert lengths.tolist() == [3, 1]
+
+
+def test_empty():
+    assert streak_stats([]) == (0, 0)
+    assert longest_by_period([], [0, 10]).tolist() == [0]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_tracker_matches_brute_force_under_adds_and_removes(seed):
+    rng = random.Random(seed)
+    tracker = StreakTracker()
+    counts = {}
+    for _ in range(400):
+        day = rng.randrange(0, 60)
+        if counts.get(day) and rng.random() < 0.45:
+            tracker.remove(day)
+            counts[day] -= 1
+        else:
+            tracker.add(day)
+            counts[day] = counts.get(day, 0) + 1
+        present = [d for d, n in counts.items() if n]
+        assert tracker.longest == brute(present)[1]
+        today = rng.randrange(0, 62)
+        expected = brute(present, today)[0] or brute(present, today - 1)[0]
+        assert tracker.current(today) == expected